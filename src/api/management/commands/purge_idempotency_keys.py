@@ -0,0 +1,22 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from api.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Remove as chaves de idempotência expiradas, em lotes."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=10_000, help="Linhas por lote.")
+
+    def handle(self, *args: list, **options: Any) -> None:
+        batch_size = int(options["batch_size"])
+        total = 0
+        while True:
+            ids = list(IdempotencyKey.objects.expired().values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            total += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"{total} chaves de idempotência removidas."))
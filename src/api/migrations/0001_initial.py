@@ -0,0 +1,68 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:27
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IdempotencyKey",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        editable=False, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("key", models.CharField(max_length=255, verbose_name="Chave")),
+                (
+                    "fingerprint",
+                    models.CharField(max_length=64, verbose_name="Impressão da requisição"),
+                ),
+                (
+                    "status_code",
+                    models.PositiveSmallIntegerField(null=True, verbose_name="Status da resposta"),
+                ),
+                (
+                    "response",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        null=True,
+                        verbose_name="Resposta",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Criado em")),
+                ("expires_at", models.DateTimeField(verbose_name="Expira em")),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuário",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Chave de idempotência",
+                "verbose_name_plural": "Chaves de idempotência",
+                "indexes": [models.Index(fields=["expires_at"], name="idempotency_expires_idx")],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "key"), name="unique_idempotency_user_key"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class IdempotencyKeyQuerySet(models.QuerySet):
+    def claim(
+        self, user_id: int, key: str, fingerprint: str, ttl: timedelta
+    ) -> tuple["IdempotencyKey", bool]:
+        """
+        Reserva a chave para o usuário ou retorna o registro já existente.
+
+        Deve ser chamado dentro da transação que executa a requisição: enquanto ela não
+        termina, outra requisição com a mesma chave fica bloqueada no índice único e, depois,
+        recebe o registro confirmado (ou reserva a chave, se a primeira foi desfeita).
+        Registros expirados são substituídos.
+
+        Returns:
+            O registro e se ele foi criado agora.
+        """
+        now = timezone.now()
+        record, created = self.get_or_create(
+            user_id=user_id,
+            key=key,
+            defaults={"fingerprint": fingerprint, "expires_at": now + ttl},
+        )
+        if not created and record.expires_at <= now:
+            record.delete()
+            return self.claim(user_id=user_id, key=key, fingerprint=fingerprint, ttl=ttl)
+        return record, created
+
+    def expired(self) -> "IdempotencyKeyQuerySet":
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class IdempotencyKey(models.Model):
+    """
+    Resposta de uma requisição enviada com o cabeçalho `Idempotency-Key`, guardada para
+    responder às repetições sem executar a requisição de novo (ver
+    `shared.api.mixins.IdempotencyMixin`).
+    """
+
+    id = models.BigAutoField(primary_key=True, editable=False, verbose_name="ID")
+    # Sem índice próprio: `user` é prefixo da restrição única.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Usuário",
+        db_index=False,
+    )
+    key = models.CharField(max_length=255, verbose_name="Chave")
+    fingerprint = models.CharField(max_length=64, verbose_name="Impressão da requisição")
+    status_code = models.PositiveSmallIntegerField(null=True, verbose_name="Status da resposta")
+    response = models.JSONField(null=True, encoder=DjangoJSONEncoder, verbose_name="Resposta")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    expires_at = models.DateTimeField(verbose_name="Expira em")
+
+    objects = IdempotencyKeyQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Chave de idempotência"
+        verbose_name_plural = "Chaves de idempotência"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="unique_idempotency_user_key"),
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"], name="idempotency_expires_idx"),
+        ]
@@ -1,29 +1,294 @@
+import base64
+import binascii
+import json
+import math
+from functools import cached_property
 from typing import Any
 
-from rest_framework.pagination import PageNumberPagination
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import Q, QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    PageNumberPagination,
+    _positive_int,
+)
 from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+
+from shared.api.counting import CountResult, CountStrategy, ExactCount
+from shared.api.streaming import stream_json_array
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) sobre uma ordenação indexada.
+
+    A view declara `cursor_ordering` (ex.: `("-redeemed_at", "-id")`), cujo último campo
+    deve ser único. Cada página filtra a partir dos valores da última linha da página
+    anterior, então o custo não depende da profundidade nem exige `COUNT(*)`.
+    """
+
+    page_size = 25
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Cursor inválido."
+
+    def __init__(self) -> None:
+        self.has_next = False
+        self.has_previous = False
+        self.next_values: list | None = None
+        self.previous_values: list | None = None
+
+    def get_page_size(self, request: Any) -> int:
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, view: Any) -> list[tuple[str, bool]]:
+        return [(field.lstrip("-"), field.startswith("-")) for field in view.cursor_ordering]
+
+    def paginate_queryset(self, queryset: QuerySet, request: Any, view: Any = None) -> list:
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        self.ordering = self.get_ordering(view)
+        self.fields = {
+            name: queryset.model._meta.get_field(name) for name, _descending in self.ordering
+        }
+
+        values, reverse = self.decode_cursor(request)
+        ordering = [(name, descending != reverse) for name, descending in self.ordering]
+        queryset = queryset.order_by(
+            *[f"-{name}" if descending else name for name, descending in ordering]
+        )
+        if values is not None:
+            queryset = queryset.filter(self.build_filter(ordering, values))
+
+        results = list(queryset[: self.page_size_value + 1])
+        has_more = len(results) > self.page_size_value
+        results = results[: self.page_size_value]
+
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = values is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+
+        if results:
+            self.next_values = self.get_values(results[-1])
+            self.previous_values = self.get_values(results[0])
+        return results
+
+    @staticmethod
+    def build_filter(ordering: list[tuple[str, bool]], values: list) -> Q:
+        """
+        Monta `(a, b) < (x, y)` como `a <= x AND (a < x OR (a = x AND b < y))`.
+        O primeiro termo delimita o início do index scan; o restante desempata.
+        """
+        first_name, first_descending = ordering[0]
+        bound = Q(**{f"{first_name}__{'lte' if first_descending else 'gte'}": values[0]})
+
+        after = Q()
+        equal = Q()
+        for (name, descending), value in zip(ordering, values):
+            after |= equal & Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            equal &= Q(**{name: value})
+        return bound & after
+
+    def get_values(self, instance: Any) -> list:
+        return [self.fields[name].value_to_string(instance) for name, _descending in self.ordering]
+
+    def encode_cursor(self, values: list, reverse: bool) -> str:
+        payload = json.dumps({"v": values, "r": reverse}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request: Any) -> tuple[list | None, bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values = [
+                self.fields[name].to_python(value)
+                for (name, _descending), value in zip(self.ordering, payload["v"], strict=True)
+            ]
+            return values, bool(payload["r"])
+        except (binascii.Error, ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message) from None
+
+    def get_paginated_response(self, data: list) -> Response:
+        return Response(
+            {
+                "count": None,
+                "total_pages": None,
+                "count_exact": None,
+                "current_page": None,
+                "next_page": None,
+                "previous_page": None,
+                "next_cursor": (
+                    self.encode_cursor(self.next_values, reverse=False)
+                    if self.has_next and self.next_values
+                    else None
+                ),
+                "previous_cursor": (
+                    self.encode_cursor(self.previous_values, reverse=True)
+                    if self.has_previous and self.previous_values
+                    else None
+                ),
+                "page_size": self.page_size_value,
+                "results": data,
+            }
+        )
+
+
+class LookaheadPage(Page):
+    """
+    Página de uma paginação sem total exato: `has_next` vem da linha extra lida.
+    """
+
+    def __init__(self, object_list: list, number: int, paginator: Any, has_next: bool) -> None:
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+
+class CountingPaginator(DjangoPaginator):
+    """
+    Paginator que obtém o total pela `CountStrategy` da view. Com `ExactCount`, se comporta
+    como o paginator do Django; com as demais, lê uma linha a mais para saber se há
+    próxima página e não valida o número da página contra o total.
+    """
+
+    def __init__(self, object_list: Any, per_page: int, count_strategy: CountStrategy) -> None:
+        super().__init__(object_list, per_page)
+        self.count_strategy = count_strategy
+
+    @cached_property
+    def counted(self) -> CountResult:
+        if not isinstance(self.object_list, QuerySet):
+            # Listas já carregadas em memória (ex.: catálogo de cupons).
+            return CountResult(value=len(self.object_list), exact=True)
+        return self.count_strategy.count(self.object_list)
+
+    @cached_property
+    def count(self) -> int:
+        return self.counted.value or 0
+
+    @property
+    def total_pages(self) -> int | None:
+        if self.counted.exact:
+            return self.num_pages
+        if self.counted.value is None:
+            return None
+        return max(math.ceil(self.counted.value / self.per_page), 1)
+
+    def page(self, number: Any) -> Page:
+        # Só um total calculado nesta requisição delimita a página; um total cacheado pode
+        # estar defasado e cortaria linhas.
+        if not isinstance(self.object_list, QuerySet) or isinstance(
+            self.count_strategy, ExactCount
+        ):
+            return super().page(number)
+
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        return LookaheadPage(
+            rows[: self.per_page], number, self, has_next=len(rows) > self.per_page
+        )
 
 
 class StandardPagination(PageNumberPagination):
     page_size = 25
     page_size_query_param = "page_size"
     max_page_size = 1000
+    cursor_query_param = KeysetPagination.cursor_query_param
+    stream_chunk_size = 2000
+    count_strategy: CountStrategy = ExactCount()
+
+    keyset: KeysetPagination | None = None
+    view: Any = None
+
+    def django_paginator_class(self, object_list: Any, per_page: int) -> CountingPaginator:
+        """
+        A view pode trocar a contagem com o atributo `count_strategy`
+        (ver `shared.api.counting`).
+        """
+        strategy = getattr(self.view, "count_strategy", None) or self.count_strategy
+        return CountingPaginator(object_list, per_page, count_strategy=strategy)
+
+    def wants_stream(self, request: Any) -> bool:
+        """
+        `page_size=0` pede todos os dados sem paginação, que são enviados em streaming.
+        """
+        return request.query_params.get(self.page_size_query_param) == "0"
+
+    def get_streaming_response(
+        self, queryset: QuerySet, serializer: BaseSerializer
+    ) -> StreamingHttpResponse:
+        """
+        Responde um array JSON em streaming, lendo o queryset em blocos por um cursor do
+        banco e serializando um item por vez; a memória não cresce com o total de linhas.
+        """
+        rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+        return StreamingHttpResponse(
+            stream_json_array(rows, serializer.to_representation),
+            content_type="application/json",
+        )
 
     def paginate_queryset(self, queryset: Any, request: Any, view: Any | None = None) -> None | Any:
         """
         Se `page_size=0` for enviado na query string, retorna todos os dados sem paginação.
+        Se `cursor` for enviado (vazio para a primeira página) e a view declarar
+        `cursor_ordering`, pagina por cursor (keyset) em vez de número de página.
         """
+        self.view = view
         page_size = request.query_params.get(self.page_size_query_param)
         if page_size == "0":
             return None
 
-        return super().paginate_queryset(queryset, request, view)
+        if self.cursor_query_param in request.query_params and getattr(
+            view, "cursor_ordering", None
+        ):
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        page = super().paginate_queryset(queryset, request, view)
+        if page is not None:
+            # Conta junto com a página, antes da serialização (ver `EagerLoadingMixin`).
+            _ = self.page.paginator.counted
+        return page
 
     def get_paginated_response(self, data: list) -> Response:
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+
+        paginator = self.page.paginator
         return Response(
             {
-                "count": self.page.paginator.count,
-                "total_pages": self.page.paginator.num_pages,
+                "count": paginator.counted.value,
+                "total_pages": paginator.total_pages,
+                "count_exact": paginator.counted.exact,
                 "current_page": self.page.number,
                 "next_page": self.page.number + 1 if self.page.has_next() else None,
                 "previous_page": self.page.number - 1 if self.page.has_previous() else None,
@@ -39,13 +304,49 @@ class StandardPagination(PageNumberPagination):
             "properties": {
                 "count": {
                     "type": "integer",
+                    "nullable": True,
                     "example": 123,
                 },
-                "total_pages": {"type": "integer", "example": 4},
-                "current_page": {"type": "integer", "example": 1},
+                "total_pages": {"type": "integer", "nullable": True, "example": 4},
+                "count_exact": {
+                    "type": "boolean",
+                    "nullable": True,
+                    "description": (
+                        "Se `count` e `total_pages` são exatos; `false` quando são uma "
+                        "estimativa ou não foram calculados (`null`)."
+                    ),
+                },
+                "current_page": {"type": "integer", "nullable": True, "example": 1},
                 "next_page": {"type": "integer", "nullable": True, "example": 2},
                 "previous_page": {"type": "integer", "nullable": True, "example": None},
+                "next_cursor": {
+                    "type": "string",
+                    "nullable": True,
+                    "description": "Presente apenas na paginação por cursor (`?cursor=`).",
+                },
+                "previous_cursor": {
+                    "type": "string",
+                    "nullable": True,
+                    "description": "Presente apenas na paginação por cursor (`?cursor=`).",
+                },
                 "page_size": {"type": "integer", "example": 25},
                 "results": schema,
             },
         }
+
+    def get_schema_operation_parameters(self, view: Any) -> list[dict]:
+        parameters = super().get_schema_operation_parameters(view)
+        if getattr(view, "cursor_ordering", None):
+            parameters.append(
+                {
+                    "name": self.cursor_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": (
+                        "Cursor da paginação por keyset. Envie vazio para a primeira página e "
+                        "depois o `next_cursor`/`previous_cursor` retornado."
+                    ),
+                    "schema": {"type": "string"},
+                }
+            )
+        return parameters
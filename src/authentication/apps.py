@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "authentication"
+
+    def ready(self) -> None:
+        from shared.api.authentications import blacklist_filter, user_claims_cache
+        from shared.models import data_versions
+
+        from .models import User
+
+        data_versions.track(User)
+        user_claims_cache.track(User)
+        blacklist_filter.track()
@@ -0,0 +1,68 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from authentication.models import User
+from config.settings import DJANGO_SETT
+from shared.api.authentications import (
+    ClaimsJWTAuthentication,
+    UserClaimsRefreshToken,
+    VerifiedTokenCache,
+)
+
+
+class UncachedClaimsJWTAuthentication(ClaimsJWTAuthentication):
+    token_cache = VerifiedTokenCache(max_size=0)
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark da autenticação JWT: custo por requisição do SimpleJWT padrão, da "
+        "autenticação por claims verificando o token a cada requisição e com o cache de "
+        "tokens verificados."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--requests", type=int, default=5000, help="Requisições medidas.")
+
+    def handle(self, *args: list, **options: dict) -> None:
+        if not DJANGO_SETT.DEBUG:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Este comando só pode ser executado em ambiente de desenvolvimento!"
+                )
+            )
+            return None
+
+        requests = int(options["requests"])  # type: ignore
+        user = User.objects.create_user(
+            email=f"bench.auth.{uuid.uuid4().hex[:8]}@senfio.com",
+            works_since=timezone.now().date() - timedelta(days=1),
+        )
+        try:
+            token = str(UserClaimsRefreshToken.for_user(user).access_token)
+            request = Request(APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}"))
+            for label, authentication in (
+                ("SimpleJWT (consulta ao banco)", JWTAuthentication()),
+                ("Claims, verificando o token", UncachedClaimsJWTAuthentication()),
+                ("Claims, com cache de tokens", ClaimsJWTAuthentication()),
+            ):
+                elapsed = self._measure(authentication, request, requests)
+                self.stdout.write(f"{label}: {elapsed * 1_000_000:.1f} µs/requisição")
+        finally:
+            user.delete()
+
+    @staticmethod
+    def _measure(authentication: BaseAuthentication, request: Request, requests: int) -> float:
+        authentication.authenticate(request)  # aquece caches e conexão
+        started = time.perf_counter()
+        for _ in range(requests):
+            authentication.authenticate(request)
+        return (time.perf_counter() - started) / requests
@@ -0,0 +1,106 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+from rest_framework.serializers import Serializer
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication.models import User
+from authentication.serializers import ClaimsTokenRefreshSerializer
+from authentication.services import token_table_sizes
+from config.settings import DJANGO_SETT
+from shared.api.authentications import UserClaimsRefreshToken, blacklist_filter
+
+
+class UnfilteredClaimsRefreshToken(UserClaimsRefreshToken):
+    def check_blacklist(self) -> None:
+        RefreshToken.check_blacklist(self)
+
+
+class UnfilteredClaimsTokenRefreshSerializer(ClaimsTokenRefreshSerializer):
+    token_class = UnfilteredClaimsRefreshToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark do refresh com rotação: latência por refresh do SimpleJWT padrão e com o "
+        "filtro de Bloom na frente da blacklist, com `--seed` tokens já na blacklist."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--refreshes", type=int, default=500, help="Refreshes medidos.")
+        parser.add_argument(
+            "--seed", type=int, default=100_000, help="Tokens na blacklist antes da medição."
+        )
+
+    def handle(self, *args: list, **options: dict) -> None:
+        if not DJANGO_SETT.DEBUG:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Este comando só pode ser executado em ambiente de desenvolvimento!"
+                )
+            )
+            return None
+
+        refreshes = int(options["refreshes"])  # type: ignore
+        run_id = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(
+            email=f"bench.refresh.{run_id}@senfio.com",
+            works_since=timezone.now().date() - timedelta(days=1),
+        )
+        try:
+            self._seed(f"bench-{run_id}-", int(options["seed"]))  # type: ignore
+            blacklist_filter.clear()
+            started = time.perf_counter()
+            blacklist_filter.might_contain(run_id)
+            self.stdout.write(f"Carga do filtro: {(time.perf_counter() - started) * 1000:.0f} ms")
+            self._report_sizes()
+            for label, serializer_class, token in (
+                ("SimpleJWT (consulta à blacklist)", TokenRefreshSerializer, RefreshToken),
+                (
+                    "Claims, consultando a blacklist",
+                    UnfilteredClaimsTokenRefreshSerializer,
+                    UnfilteredClaimsRefreshToken,
+                ),
+                (
+                    "Claims, com filtro de Bloom",
+                    ClaimsTokenRefreshSerializer,
+                    UserClaimsRefreshToken,
+                ),
+            ):
+                elapsed = self._measure(serializer_class, str(token.for_user(user)), refreshes)
+                self.stdout.write(f"{label}: {elapsed * 1000:.2f} ms/refresh")
+            self._report_sizes()
+        finally:
+            OutstandingToken.objects.filter(jti__startswith=f"bench-{run_id}-").delete()
+            OutstandingToken.objects.filter(user=user).delete()
+            user.delete()
+
+    def _seed(self, prefix: str, count: int, batch_size: int = 5000) -> None:
+        expires_at = timezone.now() + timedelta(days=1)
+        for start in range(0, count, batch_size):
+            tokens = OutstandingToken.objects.bulk_create(
+                OutstandingToken(jti=f"{prefix}{index}", token="", expires_at=expires_at)
+                for index in range(start, min(start + batch_size, count))
+            )
+            BlacklistedToken.objects.bulk_create(BlacklistedToken(token=token) for token in tokens)
+
+    def _report_sizes(self) -> None:
+        for size in token_table_sizes():
+            self.stdout.write(f"{size.table}: ~{size.rows} linhas, {size.bytes / 1024 ** 2:.1f} MB")
+
+    @staticmethod
+    def _measure(serializer_class: type[Serializer], refresh: str, refreshes: int) -> float:
+        started = time.perf_counter()
+        for _ in range(refreshes):
+            serializer = serializer_class(data={"refresh": refresh})
+            serializer.is_valid(raise_exception=True)
+            refresh = serializer.validated_data["refresh"]
+        return (time.perf_counter() - started) / refreshes
@@ -0,0 +1,52 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from authentication.services import purge_expired_tokens, token_table_sizes
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga em lotes os refresh tokens expirados e as suas entradas na blacklist, "
+        "reportando o tamanho das tabelas a cada execução. Sem `--once`, repete a limpeza "
+        "a cada `--interval` segundos."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=1000, help="Tokens por lote.")
+        parser.add_argument(
+            "--pause", type=float, default=0.05, help="Espera, em segundos, entre os lotes."
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60 * 60,
+            help="Espera, em segundos, entre as execuções.",
+        )
+        parser.add_argument("--once", action="store_true", help="Executa uma vez e encerra.")
+
+    def handle(self, *args: list, **options: Any) -> None:
+        try:
+            while True:
+                self._purge(batch_size=int(options["batch_size"]), pause=float(options["pause"]))
+                if options["once"]:
+                    break
+                time.sleep(float(options["interval"]))
+        except KeyboardInterrupt:
+            self.stdout.write("Limpeza encerrada.")
+
+    def _purge(self, batch_size: int, pause: float) -> None:
+        before = token_table_sizes()
+        started = time.perf_counter()
+        result = purge_expired_tokens(batch_size=batch_size, pause=pause)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{result.outstanding} tokens e {result.blacklisted} entradas da blacklist "
+            f"apagados em {result.batches} lotes ({elapsed:.2f}s)"
+        )
+        for old, new in zip(before, token_table_sizes()):
+            self.stdout.write(
+                f"{new.table}: ~{old.rows} -> ~{new.rows} linhas, "
+                f"{old.bytes / 1024 ** 2:.1f} -> {new.bytes / 1024 ** 2:.1f} MB"
+            )
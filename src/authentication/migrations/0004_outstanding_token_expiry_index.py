@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Índices nas tabelas da blacklist (app `token_blacklist` do SimpleJWT):
+
+    - `expires_at` dos tokens emitidos, para que cada lote do `purge_expired_tokens`
+      encontre os tokens expirados sem varrer a tabela;
+    - `blacklisted_at`, para a sincronização periódica do `BlacklistFilter` de cada worker.
+
+    Os índices são criados com `CONCURRENTLY` (fora de transação, daí `atomic = False`):
+    um `CREATE INDEX` comum bloquearia logins, refreshes e logouts durante a criação.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("authentication", "0003_search_indexes"),
+        ("token_blacklist", "0013_alter_blacklistedtoken_options_and_more"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS outstanding_token_expires_idx "
+                "ON token_blacklist_outstandingtoken (expires_at, id)"
+            ),
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS outstanding_token_expires_idx",
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS blacklisted_token_blacklisted_at_idx "
+                "ON token_blacklist_blacklistedtoken (blacklisted_at)"
+            ),
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS blacklisted_token_blacklisted_at_idx",
+        ),
+    ]
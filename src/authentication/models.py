@@ -1,13 +1,15 @@
 from datetime import date
-from typing import Any, Self
+from typing import Any, ClassVar, Self
 
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin,
 )
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Upper
 
 from shared.models import BaseModel
 
@@ -53,6 +55,21 @@ class User(AbstractBaseUser, PermissionsMixin, BaseModel):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["team", "works_since"]
 
+    # Campos levados nos tokens de acesso (ver `shared.api.authentications`): bastam para
+    # as permissões e para o `UserSerializer`, sem consultar o banco a cada requisição.
+    claim_fields: ClassVar[tuple[str, ...]] = (
+        "email",
+        "team",
+        "works_since",
+        "is_active",
+        "is_staff",
+        "is_superuser",
+    )
+
+    # Instâncias montadas a partir das claims (`user_from_claims`): os valores das claims
+    # podem estar desatualizados e nunca são gravados de volta.
+    from_claims = False
+
     objects = UserManager()
 
     @property
@@ -67,6 +84,10 @@ class User(AbstractBaseUser, PermissionsMixin, BaseModel):
             raise ValidationError("A data de entrada na empresa não pode ser futura.")
 
     def save(self, *args: list, **kwargs: dict) -> Self:
+        if self.from_claims and kwargs.get("update_fields") is None:
+            raise ValueError(
+                "Usuário montado a partir das claims do token: informe `update_fields`."
+            )
         self.clean()
         return super().save(*args, **kwargs)
 
@@ -74,3 +95,7 @@ class User(AbstractBaseUser, PermissionsMixin, BaseModel):
         verbose_name = "Usuário"
         verbose_name_plural = "Usuários"
         ordering = ["-id"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="user_created_keyset_idx"),
+            GinIndex(OpClass(Upper("email"), name="gin_trgm_ops"), name="user_email_trgm_idx"),
+        ]
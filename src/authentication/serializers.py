@@ -1,6 +1,12 @@
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+
+from shared.api.authentications import UserClaimsRefreshToken
 
 from .models import User
 
@@ -64,6 +70,18 @@ class LoginSerializer(serializers.Serializer):
         return data
 
 
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Emite tokens com as claims do usuário (ver `shared.api.authentications`).
+    """
+
+    token_class = UserClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = UserClaimsRefreshToken
+
+
 class UserLogoutSerializer(serializers.Serializer):
     refresh = serializers.CharField(help_text="Token de atualização")
 
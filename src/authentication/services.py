@@ -0,0 +1,83 @@
+"""
+Manutenção das tabelas da blacklist de refresh tokens (app `token_blacklist` do SimpleJWT).
+
+Com a rotação de refresh tokens, todo refresh grava um `OutstandingToken` para o token novo
+e um `BlacklistedToken` para o antigo. Depois de expirados, esses tokens não passam mais na
+verificação e as linhas só ocupam espaço: `purge_expired_tokens` as apaga em lotes.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db import connection, transaction
+from django.db.models import Model
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+
+@dataclass
+class TableSize:
+    table: str
+    rows: int
+    bytes: int
+
+
+@dataclass
+class PurgeResult:
+    outstanding: int = 0
+    blacklisted: int = 0
+    batches: int = 0
+
+
+def token_table_sizes() -> list[TableSize]:
+    """
+    Linhas e tamanho em disco (com índices e TOAST) das tabelas de tokens. As linhas são a
+    estimativa do planejador (`pg_class.reltuples`, atualizada pelo autovacuum e pelo
+    `ANALYZE`), para não varrer tabelas com milhões de tokens; tabelas nunca analisadas
+    aparecem com zero linhas.
+    """
+    sizes = []
+    model: type[Model]
+    for model in (OutstandingToken, BlacklistedToken):
+        table = model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT GREATEST(reltuples, 0)::bigint, pg_total_relation_size(oid)
+                FROM pg_class WHERE oid = %s::regclass
+                """,
+                [table],
+            )
+            rows, size = cursor.fetchone()
+        sizes.append(TableSize(table=table, rows=rows, bytes=size))
+    return sizes
+
+
+def purge_expired_tokens(
+    batch_size: int = 1000, pause: float = 0.0, now: datetime | None = None
+) -> PurgeResult:
+    """
+    Apaga os tokens expirados até `now` e as suas entradas na blacklist, em lotes de até
+    `batch_size` tokens. Cada lote é uma transação curta, então nenhum bloqueio segura
+    mais que um lote e os refreshes e logouts concorrentes não esperam pela limpeza.
+    `pause` segundos entre os lotes dão folga ao autovacuum e às réplicas.
+    """
+    now = now or timezone.now()
+    result = PurgeResult()
+    while ids := list(
+        OutstandingToken.objects.filter(expires_at__lte=now)
+        .order_by("expires_at", "id")
+        .values_list("id", flat=True)[:batch_size]
+    ):
+        with transaction.atomic():
+            _, deleted = OutstandingToken.objects.filter(id__in=ids).only("id").delete()
+        result.outstanding += deleted.get(OutstandingToken._meta.label, 0)
+        result.blacklisted += deleted.get(BlacklistedToken._meta.label, 0)
+        result.batches += 1
+        if pause and len(ids) == batch_size:
+            time.sleep(pause)
+    return result
@@ -0,0 +1,175 @@
+import threading
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication.services import token_table_sizes
+from authentication.tests.factories import UserFactory
+from shared.api.authentications import (
+    BlacklistFilter,
+    BloomFilter,
+    UserClaimsRefreshToken,
+    blacklist_filter,
+)
+
+
+def refresh(token: str):
+    return APIClient().post(reverse("token_refresh"), {"refresh": token}, format="json")
+
+
+def blacklist_selects(ctx: CaptureQueriesContext) -> list[str]:
+    return [
+        query["sql"]
+        for query in ctx.captured_queries
+        if query["sql"].startswith("SELECT") and BlacklistedToken._meta.db_table in query["sql"]
+    ]
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [uuid.uuid4().hex for _ in range(1000)]
+
+    # Um item novo só não é contado quando já é um falso positivo.
+    added = sum(bloom.add(item) for item in items)
+    assert len(bloom) == added > 950
+    assert not bloom.add(items[0])
+    assert all(item in bloom for item in items)
+    assert sum(uuid.uuid4().hex in bloom for _ in range(10_000)) < 300
+
+
+def test_filter_queries_do_not_block_other_threads(monkeypatch):
+    blacklist = BlacklistFilter()
+    started, release = threading.Event(), threading.Event()
+
+    def slow(result):
+        started.set()
+        release.wait(5)
+        return result, timezone.now()
+
+    bloom = BloomFilter(capacity=10)
+    bloom.add("revogado")
+    monkeypatch.setattr(blacklist, "_build", lambda: slow(bloom))
+    monkeypatch.setattr(blacklist, "_recent", lambda since: slow(["novo"]))
+
+    for jti in ("revogado", "novo"):
+        started.clear()
+        release.clear()
+        thread = threading.Thread(target=blacklist.might_contain, args=("x",))
+        thread.start()
+        assert started.wait(5)
+        # Antes do primeiro filtro todos os tokens vão ao banco; depois, o filtro atual vale.
+        assert blacklist.might_contain("novo") is (jti == "revogado")
+        release.set()
+        thread.join()
+        monkeypatch.setattr(blacklist, "sync_interval", 0)
+
+    assert blacklist.might_contain("revogado") and blacklist.might_contain("novo")
+
+
+@pytest.mark.django_db
+def test_refresh_skips_blacklist_query_for_tokens_outside_filter():
+    token = str(UserClaimsRefreshToken.for_user(UserFactory()))
+    blacklist_filter.clear()
+    blacklist_filter.might_contain("")
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = refresh(token)
+
+    assert response.status_code == 200
+    assert not blacklist_selects(ctx)
+    assert BlacklistedToken.objects.get().token.jti == RefreshToken(token, verify=False)["jti"]
+
+
+@pytest.mark.django_db
+def test_rotated_token_is_refused_even_before_filter_knows_it(
+    django_capture_on_commit_callbacks,
+):
+    token = str(UserClaimsRefreshToken.for_user(UserFactory()))
+    jti = RefreshToken(token, verify=False)["jti"]
+    blacklist_filter.clear()
+
+    assert refresh(token).status_code == 200
+    assert not blacklist_filter.might_contain(jti)
+    assert refresh(token).status_code == 401
+    assert BlacklistedToken.objects.count() == 1
+
+    rotated = str(UserClaimsRefreshToken.for_user(UserFactory()))
+    with django_capture_on_commit_callbacks(execute=True):
+        assert refresh(rotated).status_code == 200
+    assert blacklist_filter.might_contain(RefreshToken(rotated, verify=False)["jti"])
+    with CaptureQueriesContext(connection) as ctx:
+        assert refresh(rotated).status_code == 401
+    assert blacklist_selects(ctx)
+
+
+@pytest.mark.django_db
+def test_filter_syncs_tokens_blacklisted_by_other_processes(monkeypatch):
+    token = UserClaimsRefreshToken.for_user(UserFactory())
+    blacklist_filter.clear()
+    assert not blacklist_filter.might_contain(token["jti"])
+
+    # `bulk_create` não dispara sinais, como uma escrita feita em outro processo.
+    BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token=OutstandingToken.objects.get(jti=token["jti"]))]
+    )
+    assert not blacklist_filter.might_contain(token["jti"])
+
+    monkeypatch.setattr(blacklist_filter, "sync_interval", 0)
+    assert blacklist_filter.might_contain(token["jti"])
+    assert refresh(str(token)).status_code == 401
+
+
+@pytest.mark.django_db
+def test_purge_expired_tokens_deletes_in_batches():
+    user = UserFactory()
+    now = timezone.now()
+    tokens = OutstandingToken.objects.bulk_create(
+        OutstandingToken(
+            user=user,
+            jti=uuid.uuid4().hex,
+            token="",
+            expires_at=now + timedelta(hours=-1 if index < 5 else 1),
+        )
+        for index in range(7)
+    )
+    BlacklistedToken.objects.bulk_create(BlacklistedToken(token=token) for token in tokens[3:])
+    out = StringIO()
+
+    call_command("purge_expired_tokens", "--once", "--batch-size", "2", "--pause", "0", stdout=out)
+
+    assert set(OutstandingToken.objects.values_list("pk", flat=True)) == {
+        token.pk for token in tokens[5:]
+    }
+    assert BlacklistedToken.objects.count() == 2
+    assert "5 tokens e 2 entradas da blacklist apagados em 3 lotes" in out.getvalue()
+    assert "token_blacklist_outstandingtoken: ~" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_token_table_sizes_use_planner_estimate():
+    OutstandingToken.objects.bulk_create(
+        OutstandingToken(jti=uuid.uuid4().hex, token="", expires_at=timezone.now())
+        for _ in range(3)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {OutstandingToken._meta.db_table}")
+
+    with CaptureQueriesContext(connection) as ctx:
+        sizes = token_table_sizes()
+
+    assert sizes[0].table == OutstandingToken._meta.db_table
+    assert sizes[0].rows == 3
+    assert not any("COUNT(" in query["sql"] for query in ctx.captured_queries)
@@ -12,15 +12,19 @@ from rest_framework_simplejwt.serializers import (
     TokenRefreshSerializer,
     TokenVerifySerializer,
 )
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
     TokenVerifyView,
 )
 
+from shared.api.authentications import UserClaimsRefreshToken
+from shared.api.counting import EstimatedCount
 from shared.api.doc import ApiDoc
+from shared.api.filters import FieldFilter
+from shared.api.mixins import EagerLoadingMixin, StreamingListMixin
 from shared.api.serializers import GenericResponseSerializer
+from shared.api.throttling import TokenBucketThrottle
 
 from .models import User
 from .serializers import (
@@ -46,6 +50,8 @@ from .serializers import (
 class LoginView(TokenObtainPairView):
     permission_classes: tuple = ()
     authentication_classes: tuple = ()
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "login"
 
 
 @extend_schema_view(
@@ -81,7 +87,7 @@ class LogoutView(APIView):
 
         data = serializer.validated_data
         try:
-            token = RefreshToken(data["refresh"])
+            token = UserClaimsRefreshToken(data["refresh"])
             token.blacklist()
         except TokenError as e:
             logging.info(f"Token já foi invalidado ou não é válido: {e}")
@@ -145,7 +151,7 @@ class ChangePasswordView(APIView):
             return Response({"detail": "Senha atual incorreta."}, status=400)
 
         request.user.set_password(serializer.validated_data["new_password"])
-        request.user.save()
+        request.user.save(update_fields=["password", "updated_at"])
         return Response({"detail": "Senha alterada com sucesso."})
 
 
@@ -178,7 +184,7 @@ class UserTokenVerifyView(TokenVerifyView):
         responses={200: UserSerializer(many=True)},
     )
 )
-class ListUsersView(ListAPIView):
+class ListUsersView(EagerLoadingMixin, StreamingListMixin, ListAPIView):
     """
     View para listar usuários.
     """
@@ -186,3 +192,9 @@ class ListUsersView(ListAPIView):
     serializer_class = UserSerializer
     queryset = User.objects.all()
     search_fields = ["email", "team"]
+    filter_fields = {
+        "email": FieldFilter("email", lookups=("exact", "in", "prefix")),
+        "created_at": FieldFilter("datetime", lookups=("range",)),
+    }
+    cursor_ordering = ("-created_at", "-id")
+    count_strategy = EstimatedCount()
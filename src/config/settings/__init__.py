@@ -2,6 +2,7 @@ from .api import *  # noqa
 from .apps import *  # noqa
 from .auth import *  # noqa
 from .base import *  # noqa
+from .cache import *  # noqa
 from .connection import *  # noqa
 from .database import *  # noqa
 from .email import *  # noqa
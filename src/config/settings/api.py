@@ -15,21 +15,49 @@ class JWTSettings(BaseSettings):
 JWT_SETTINGS = JWTSettings()
 
 
+class ApiAppsTokensSettings(BaseSettings):
+    model_config = SettingsConfigDict(case_sensitive=True, env_prefix="API_APPS_")
+    # ---------------------------------------------------------------------------#
+    # Tokens fixos das integrações (ver `shared.api.authentications`); vazios recusam tudo.
+    MESOS_TOKEN: str = Field(default="")
+    HUBSAT_TOKEN: str = Field(default="")
+
+
+API_APPS_TOKENS = ApiAppsTokensSettings()
+
+
+class ThrottleSettings(BaseSettings):
+    model_config = SettingsConfigDict(case_sensitive=True, env_prefix="THROTTLE_")
+    # ---------------------------------------------------------------------------#
+    # Formato `<requisições>/<s|min|hour|day>`; ver `shared.api.throttling`.
+    LOGIN_RATE: str = Field(default="10/min")
+    REDEMPTIONS_RATE: str = Field(default="120/min")
+    # Por IP, somando os usuários autenticados que compartilham o endereço.
+    REDEMPTIONS_IP_RATE: str = Field(default="600/min")
+
+
+THROTTLE_SETTINGS = ThrottleSettings()
+
+
 REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "api.pagination.StandardPagination",
-    "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    ),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("shared.api.authentications.ClaimsJWTAuthentication",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PARSER_CLASSES": [
         "rest_framework.parsers.JSONParser",
     ],
     "DEFAULT_FILTER_BACKENDS": [
-        "rest_framework.filters.SearchFilter",
-        "rest_framework.filters.OrderingFilter",
+        "shared.api.filters.FieldFilterBackend",
+        "shared.api.filters.PostgresSearchFilter",
+        "shared.api.filters.IndexedOrderingFilter",
     ],
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "EXCEPTION_HANDLER": "shared.api.exception_handler.api_exceptions",
+    "DEFAULT_THROTTLE_RATES": {
+        "login": THROTTLE_SETTINGS.LOGIN_RATE,
+        "redemptions": THROTTLE_SETTINGS.REDEMPTIONS_RATE,
+        "redemptions_ip": THROTTLE_SETTINGS.REDEMPTIONS_IP_RATE,
+    },
     ## FORMATTING
     "DATETIME_FORMAT": "%Y-%m-%dT%H:%M:%S-03:00",
     "DATE_FORMAT": "%Y-%m-%d",
@@ -49,6 +77,8 @@ SIMPLE_JWT = {
     "SIGNING_KEY": JWT_SETTINGS.SIGNING_KEY,
     "AUTH_HEADER_TYPES": ("Bearer",),
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
+    "TOKEN_OBTAIN_SERIALIZER": "authentication.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "authentication.serializers.ClaimsTokenRefreshSerializer",
 }
 
 
@@ -60,10 +90,15 @@ SPECTACULAR_SETTINGS = {
     ==> Parâmetros gerais de consulta:
     - `page`: Página a ser retornada.
     - `page_size`: Quantidade de itens por página.
-    - `ordering`: Campo a ser ordenado. (prefixo '-' para ordem decrescente)
+    - `ordering`: Campo a ser ordenado. (prefixo '-' para ordem decrescente) \n \
+        Apenas campos indexados são aceitos; os demais são ignorados.
     - `search`: Campo a ser pesquisado. \n \
         Por padrão a pesquisa é feita com o operador "icontains" (case-insensitive e parcial). \n \
+        Campos de texto longo indexados (ex.: descrição) são pesquisados por prefixo de palavra. \n \
         Cada View pode definir seus próprios campos de pesquisa através do atributo `search_fields`.
+    - Filtros por campo: `campo=valor`, `campo__in=a,b`, `campo__prefix=valor` e \n \
+        `campo__gte`/`__lte`/`__gt`/`__lt`, combinados com "E". Cada View declara os filtros \n \
+        aceitos no atributo `filter_fields`.
     """,
     "VERSION": BACKEND_APP_VERSION,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
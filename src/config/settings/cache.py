@@ -0,0 +1,35 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+#### Cache Settings
+class CacheSettings(BaseSettings):
+    # Em produção, com mais de um worker, use um backend compartilhado
+    # (ex.: `django.core.cache.backends.redis.RedisCache` com `CACHE_LOCATION=redis://...`).
+    CACHE_BACKEND: str = Field(
+        alias="CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+    )
+    CACHE_LOCATION: str = Field(alias="CACHE_LOCATION", default="onboard")
+    CACHE_KEY_PREFIX: str = Field(alias="CACHE_KEY_PREFIX", default="onboard")
+
+
+CACHE_SETT = CacheSettings()
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_SETT.CACHE_BACKEND,
+        "LOCATION": CACHE_SETT.CACHE_LOCATION,
+        "KEY_PREFIX": CACHE_SETT.CACHE_KEY_PREFIX,
+    },
+    # Memória do próprio worker, para dados pequenos e muito lidos (ex.: catálogo de cupons).
+    "local": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "onboard-local",
+    },
+    # Claims dos usuários autenticados (ver `shared.api.authentications.UserClaimsCache`).
+    "users": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "onboard-users",
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    },
+}
@@ -2,6 +2,7 @@ import random
 import string
 
 import pytest
+from django.core.cache import caches
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.test import APIClient
 
@@ -18,3 +19,9 @@ def mocked_file() -> SimpleUploadedFile:
 @pytest.fixture
 def api_client() -> APIClient:
     return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache() -> None:
+    for cache in caches.all():
+        cache.clear()
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CouponsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "coupons"
+
+    def ready(self) -> None:
+        from shared.models import data_versions
+
+        from . import signals  # noqa: F401
+        from .models import Coupon
+
+        data_versions.track(Coupon)
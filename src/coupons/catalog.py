@@ -0,0 +1,221 @@
+"""
+Cache versionado do catálogo de cupons.
+
+O catálogo muda apenas quando um administrador cria, altera ou remove um cupom, então as
+leituras são servidas de um snapshot em cache identificado pela versão do catálogo:
+
+- a versão fica no cache compartilhado (`default`) e é trocada pelos sinais de `Coupon`;
+- o snapshot de cada versão fica no cache compartilhado e na memória do worker (`local`);
+- busca, ordenação e paginação são feitas sobre o snapshot, sem consultar o banco.
+
+Catálogos maiores que `max_size` não são cacheados e as leituras seguem para o banco.
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, NamedTuple
+
+from django.core.cache import BaseCache, caches
+from django.db import models
+from rest_framework.filters import OrderingFilter
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from shared.api.filters import FieldFilterBackend, PostgresSearchFilter
+
+from .models import Coupon
+from .serializers import CouponSerializer
+
+
+class CatalogRow(NamedTuple):
+    values: dict
+    data: dict
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: str
+    rows: list[CatalogRow]
+    by_id: dict[int, CatalogRow] = field(default_factory=dict)
+
+
+class CouponCatalog:
+    version_key = "coupons:catalog:version"
+    max_size = 5000
+    timeout = 60 * 60
+    local_timeout = 60
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches["default"]
+
+    @property
+    def local(self) -> BaseCache:
+        return caches["local"]
+
+    def version(self) -> str:
+        """
+        Versão atual do catálogo. Versões são aleatórias para que a perda da chave no cache
+        compartilhado nunca reaproveite um snapshot antigo.
+        """
+        version = self.shared.get(self.version_key)
+        if version is None:
+            self.shared.add(self.version_key, uuid.uuid4().hex, None)
+            version = self.shared.get(self.version_key)
+        return version
+
+    def bump(self) -> None:
+        """
+        Invalida o catálogo. Deve ser chamado após o commit de qualquer escrita em `Coupon`.
+        """
+        self.shared.set(self.version_key, uuid.uuid4().hex, None)
+
+    def snapshot(self) -> CatalogSnapshot | None:
+        """
+        Snapshot da versão atual, ou `None` se o catálogo for grande demais para o cache.
+        """
+        version = self.version()
+        key = f"coupons:catalog:{version}"
+        snapshot = self.local.get(key)
+        if snapshot is None:
+            snapshot = self.shared.get(key)
+            if snapshot is None:
+                snapshot = self._load(version)
+                self.shared.set(key, snapshot, self.timeout)
+            self.local.set(key, snapshot, self.local_timeout)
+        return snapshot or None
+
+    def _load(self, version: str) -> CatalogSnapshot | bool:
+        fields = catalog_fields()
+        coupons = list(
+            Coupon.objects.only(*fields).order_by("-created_at", "-id")[: self.max_size + 1]
+        )
+        if len(coupons) > self.max_size:
+            return False
+
+        rows = [
+            CatalogRow(
+                values={name: getattr(coupon, name) for name in fields},
+                data=dict(CouponSerializer(coupon).data),
+            )
+            for coupon in coupons
+        ]
+        return CatalogSnapshot(
+            version=version, rows=rows, by_id={row.values["id"]: row for row in rows}
+        )
+
+
+coupon_catalog = CouponCatalog()
+
+
+def catalog_fields() -> list[str]:
+    """
+    Campos de `Coupon` guardados no snapshot (todos, exceto as colunas `tsvector`).
+    """
+    vector_fields = set(Coupon.search_vector_fields.values())
+    return [f.name for f in Coupon._meta.concrete_fields if f.name not in vector_fields]
+
+
+class CatalogListMixin:
+    """
+    Mixin para a listagem de cupons: responde a partir do snapshot do catálogo quando os
+    filtros da view podem ser avaliados em memória; caso contrário, consulta o banco.
+    """
+
+    def catalog_rows(self, request: Request) -> list[CatalogRow] | None:
+        paginator = self.paginator  # type: ignore[attr-defined]
+        if paginator is not None and paginator.cursor_query_param in request.query_params:
+            return None
+
+        field_filters, search, ordering = None, None, None
+        for backend_class in self.filter_backends:  # type: ignore[attr-defined]
+            backend = backend_class()
+            if isinstance(backend, FieldFilterBackend):
+                field_filters = backend
+            elif isinstance(backend, PostgresSearchFilter):
+                search = backend
+            elif isinstance(backend, OrderingFilter):
+                ordering = backend
+            else:
+                return None
+
+        snapshot = coupon_catalog.snapshot()
+        if snapshot is None:
+            return None
+
+        rows = snapshot.rows
+        if field_filters is not None:
+            rows = field_filters.filter_rows(request, rows, self, values=lambda row: row.values)
+            if rows is None:
+                return None
+        if search is not None:
+            rows = search.filter_rows(request, rows, self, Coupon, values=lambda row: row.values)
+            if rows is None:
+                return None
+        if ordering is not None:
+            fields = ordering.get_ordering(request, Coupon.objects.none(), self)
+            rows = order_rows(rows, list(fields or Coupon._meta.ordering))
+            if rows is None:
+                return None
+        return rows
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        rows = self.catalog_rows(request)
+        if rows is None:
+            return super().list(request, *args, **kwargs)  # type: ignore[misc]
+
+        data = [row.data for row in rows]
+        paginator = self.paginator  # type: ignore[attr-defined]
+        if paginator is not None and paginator.wants_stream(request):
+            return Response(data)
+
+        page = self.paginate_queryset(data)  # type: ignore[attr-defined]
+        if page is not None:
+            return self.get_paginated_response(page)  # type: ignore[attr-defined]
+        return Response(data)
+
+
+class CatalogRetrieveMixin:
+    """
+    Mixin para o detalhe de cupom: responde a partir do snapshot do catálogo.
+    As permissões da view não podem depender do objeto (`has_object_permission`).
+    """
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        snapshot = coupon_catalog.snapshot()
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]  # type: ignore[attr-defined]
+        try:
+            row = snapshot.by_id.get(int(lookup)) if snapshot is not None else None
+        except ValueError:
+            row = None
+        if row is None:
+            return super().retrieve(request, *args, **kwargs)  # type: ignore[misc]
+        return Response(row.data)
+
+
+def order_rows(rows: list[CatalogRow], ordering: list[str]) -> list[CatalogRow] | None:
+    """
+    Ordena como o Postgres (nulos por último na ordem crescente e primeiro na decrescente),
+    com `id` decrescente como desempate. Retorna `None` para campos fora do snapshot e para
+    campos de texto, que o Postgres ordena pela collation do banco (ex.: `en_US.UTF-8`),
+    não pela ordem dos codepoints do Python.
+    """
+    fields = catalog_fields()
+    for name in ordering:
+        field_name = name.lstrip("-")
+        if field_name not in fields or isinstance(
+            Coupon._meta.get_field(field_name), (models.CharField, models.TextField)
+        ):
+            return None
+
+    rows = sorted(rows, key=lambda row: row.values["id"], reverse=True)
+    for name in reversed(ordering):
+        field_name = name.lstrip("-")
+        rows.sort(
+            key=lambda row: (
+                row.values[field_name] is None,
+                row.values[field_name] if row.values[field_name] is not None else 0,
+            ),
+            reverse=name.startswith("-"),
+        )
+    return rows
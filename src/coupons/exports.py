@@ -0,0 +1,59 @@
+"""
+Exportação do histórico de resgates em CSV ou NDJSON.
+
+As linhas são lidas por um cursor do lado do servidor, como tuplas (`values_list`) com
+apenas as colunas exportadas, e escritas em streaming: a memória usada não depende do
+total de linhas.
+"""
+
+from collections.abc import Iterator
+from datetime import datetime
+
+from shared.api.streaming import gzip_stream, stream_csv, stream_ndjson
+
+from .models import Redemption
+
+# (coluna exportada, lookup do ORM)
+EXPORT_COLUMNS = (
+    ("id", "id"),
+    ("redeemed_at", "redeemed_at"),
+    ("user_id", "user_id"),
+    ("user_email", "user__email"),
+    ("coupon_id", "coupon_id"),
+    ("coupon_code", "coupon__code"),
+)
+CONTENT_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def export_redemptions(
+    format: str,
+    init_datetime: datetime | None = None,
+    end_datetime: datetime | None = None,
+    compress: bool = False,
+    chunk_size: int = 5000,
+) -> Iterator[bytes]:
+    """
+    Gera a exportação dos resgates do período, em ordem de criação.
+
+    Args:
+        format: `csv` ou `ndjson`.
+        init_datetime: Início do período (`redeemed_at`), inclusivo.
+        end_datetime: Fim do período (`redeemed_at`), inclusivo.
+        compress: Se a saída deve ser comprimida com gzip.
+        chunk_size: Linhas lidas do cursor e escritas por bloco.
+    """
+    queryset = Redemption.objects.order_by("id")
+    if init_datetime is not None:
+        queryset = queryset.filter(redeemed_at__gte=init_datetime)
+    if end_datetime is not None:
+        queryset = queryset.filter(redeemed_at__lte=end_datetime)
+
+    columns = [name for name, _lookup in EXPORT_COLUMNS]
+    rows = queryset.values_list(*(lookup for _name, lookup in EXPORT_COLUMNS)).iterator(
+        chunk_size=chunk_size
+    )
+    if format == "csv":
+        chunks = stream_csv(rows, columns, chunk_size=chunk_size)
+    else:
+        chunks = stream_ndjson(rows, columns, chunk_size=chunk_size)
+    return gzip_stream(chunks) if compress else chunks
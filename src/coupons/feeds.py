@@ -0,0 +1,136 @@
+"""
+Feed dos resgates mais recentes, mantido no cache como um buffer circular.
+
+As leituras não consultam o banco: o feed é reconstruído a partir do banco apenas quando
+não está no cache (partida a frio, expiração ou invalidação) e é atualizado pelas escritas
+de `Redemption` após o commit.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any
+
+from django.core.cache import cache
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import Redemption
+from .serializers import RedemptionSerializer
+
+
+@dataclass(frozen=True)
+class FeedSnapshot:
+    items: list[dict]
+    etag: str
+
+
+class RecentRedemptionsFeed:
+    """
+    Mantém os `size` resgates mais recentes já serializados.
+
+    Concorrência: as atualizações são feitas sob um lock no próprio cache. Quem não obtém
+    o lock invalida o feed, que é reconstruído na próxima leitura. Toda escrita incrementa
+    uma versão, e uma reconstrução só é gravada se a versão não mudou durante a consulta.
+    """
+
+    cache_key = "coupons:recent_redemptions"
+    timeout = 60 * 5
+    lock_timeout = 5
+
+    def __init__(self, size: int = 20) -> None:
+        self.size = size
+        self.lock_key = f"{self.cache_key}:lock"
+        self.version_key = f"{self.cache_key}:version"
+
+    def get(self) -> FeedSnapshot:
+        entry = cache.get(self.cache_key)
+        if entry is None:
+            entry = self.rebuild()
+        return FeedSnapshot(items=[item for _key, item in entry["entries"]], etag=entry["etag"])
+
+    def rebuild(self) -> dict:
+        version = self._version()
+        recent = Redemption.objects.select_related("coupon", "user").order_by(
+            "-redeemed_at", "-id"
+        )[: self.size]
+        entry = self._entry([(self._sort_key(r), self._serialize(r)) for r in recent])
+        if self._version() == version:
+            cache.set(self.cache_key, entry, self.timeout)
+        return entry
+
+    def push(self, redemption: Redemption) -> None:
+        """
+        Insere um resgate recém-criado na posição correta do feed.
+        """
+        self.push_many([redemption])
+
+    def push_many(self, redemptions: list[Redemption]) -> None:
+        """
+        Insere vários resgates recém-criados de uma vez, sob um único lock.
+        """
+        self._bump_version()
+        if not cache.add(self.lock_key, 1, self.lock_timeout):
+            self.invalidate()
+            return None
+
+        try:
+            entry = cache.get(self.cache_key)
+            if entry is None:
+                return None
+            # Só os `size` mais recentes do lote podem entrar no feed.
+            recent = sorted(redemptions, key=self._sort_key, reverse=True)[: self.size]
+            pushed = {redemption.pk for redemption in recent}
+            entries = [e for e in entry["entries"] if e[1]["id"] not in pushed]
+            entries.extend((self._sort_key(r), self._serialize(r)) for r in recent)
+            entries.sort(key=lambda e: e[0], reverse=True)
+            cache.set(self.cache_key, self._entry(entries[: self.size]), self.timeout)
+        finally:
+            cache.delete(self.lock_key)
+
+    def discard(self, redemption_id: int) -> None:
+        """
+        Invalida o feed se o resgate removido estiver nele.
+        """
+        self._invalidate_if(lambda item: item["id"] == redemption_id)
+
+    def discard_related(self, coupon_id: int | None = None, user_id: int | None = None) -> None:
+        """
+        Invalida o feed se ele exibir o cupom ou usuário alterado/removido.
+        """
+        self._invalidate_if(
+            lambda item: item["coupon"]["id"] == coupon_id or item["user"]["id"] == user_id
+        )
+
+    def invalidate(self) -> None:
+        self._bump_version()
+        cache.delete(self.cache_key)
+
+    def _invalidate_if(self, predicate: Any) -> None:
+        entry = cache.get(self.cache_key)
+        if entry is not None and any(predicate(item) for _key, item in entry["entries"]):
+            self.invalidate()
+
+    def _entry(self, entries: list[tuple[tuple, dict]]) -> dict:
+        payload = json.dumps([item for _key, item in entries], cls=JSONEncoder, sort_keys=True)
+        return {"entries": entries, "etag": hashlib.md5(payload.encode()).hexdigest()}  # nosec
+
+    def _version(self) -> int:
+        return cache.get(self.version_key, 0)
+
+    def _bump_version(self) -> None:
+        cache.add(self.version_key, 0, None)
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 1, None)
+
+    @staticmethod
+    def _sort_key(redemption: Redemption) -> tuple:
+        return (redemption.redeemed_at.timestamp(), redemption.pk)
+
+    @staticmethod
+    def _serialize(redemption: Redemption) -> dict:
+        return dict(RedemptionSerializer(redemption).data)
+
+
+recent_redemptions_feed = RecentRedemptionsFeed()
@@ -0,0 +1,234 @@
+"""
+Importação em massa de cupons a partir de CSV ou NDJSON.
+
+As linhas são lidas em streaming e processadas em blocos:
+
+- cada linha é validada com as regras dos campos de `Coupon` e de `Coupon.clean`;
+- códigos repetidos dentro do bloco são recusados;
+- o bloco válido é carregado com `COPY` em uma tabela temporária e inserido com
+  `ON CONFLICT (code) DO NOTHING`, de modo que colisões com cupons existentes (inclusive
+  de blocos anteriores e de escritas concorrentes) são detectadas pelo índice único de
+  `code` em uma única instrução.
+
+Linhas inválidas não interrompem a importação e são reportadas com o número da linha.
+"""
+
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from shared.models import data_versions
+
+from .catalog import coupon_catalog
+from .models import Coupon
+
+IMPORT_FIELDS = ("code", "description", "max_redemptions", "available")
+FORMATS = ("csv", "ndjson")
+TRUE_VALUES = {"1", "t", "true", "s", "sim", "y", "yes"}
+FALSE_VALUES = {"0", "f", "false", "n", "nao", "não", "no"}
+STAGING_TABLE = "coupon_import_staging"
+
+
+@dataclass
+class ImportRowError:
+    line: int
+    message: str
+    code: str | None = None
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    rejected: int = 0
+    # Apenas os primeiros `max_errors` erros são guardados; `rejected` conta todos.
+    errors: list[ImportRowError] = field(default_factory=list)
+    max_errors: int = 1000
+
+    def reject(self, line: int, message: str, code: str | None = None) -> None:
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(ImportRowError(line=line, message=message, code=code))
+
+
+def parse_rows(lines: Iterable[str], format: str) -> Iterator[tuple[int, Any]]:
+    """
+    Lê as linhas de um arquivo CSV (com cabeçalho) ou NDJSON.
+
+    Returns:
+        Iterador de `(número da linha, dados)`. Os dados são um `dict` ou, para linhas
+        NDJSON malformadas, a mensagem de erro.
+    """
+    if format == "csv":
+        reader = csv.DictReader(lines)
+        if reader.fieldnames is not None:
+            reader.fieldnames = [name.strip() for name in reader.fieldnames]
+        for row in reader:
+            yield reader.line_num, row
+        return None
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield line_number, "JSON inválido."
+            continue
+        yield line_number, data if isinstance(data, dict) else "Cada linha deve ser um objeto."
+
+
+class CouponImporter:
+    """
+    Importa cupons em blocos de `chunk_size` linhas dentro de uma única transação.
+    """
+
+    def __init__(self, chunk_size: int = 10_000) -> None:
+        self.chunk_size = chunk_size
+        self.fields = [Coupon._meta.get_field(name) for name in IMPORT_FIELDS]
+        # Instância reaproveitada na validação de todas as linhas, evitando construir um
+        # model por linha.
+        self._coupon = Coupon()
+
+    def run(self, lines: Iterable[str], format: str) -> ImportReport:
+        if format not in FORMATS:
+            raise ValueError(f"Formato não suportado: {format}")
+
+        report = ImportReport()
+        with transaction.atomic():
+            self._create_staging()
+            chunk: list[tuple[int, Any]] = []
+            for item in parse_rows(lines, format):
+                chunk.append(item)
+                if len(chunk) >= self.chunk_size:
+                    self._load_chunk(chunk, report)
+                    chunk = []
+            if chunk:
+                self._load_chunk(chunk, report)
+            if report.created:
+                transaction.on_commit(coupon_catalog.bump)
+                data_versions.bump(Coupon)
+        return report
+
+    def validate(self, data: Any) -> tuple:
+        """
+        Valida uma linha como `Model.full_clean` faria para os campos importados, sem a
+        verificação de unicidade (feita em lote pelo banco).
+
+        Returns:
+            Os valores de `IMPORT_FIELDS`, já convertidos.
+        """
+        if not isinstance(data, dict):
+            raise ValidationError(data)
+
+        coupon = self._coupon
+        errors: dict[str, list[str]] = {}
+        for model_field in self.fields:
+            raw = data.get(model_field.name)
+            if isinstance(raw, str):
+                raw = raw.strip()
+            if model_field.name == "available":
+                raw = self._boolean(raw, model_field.get_default())
+            if model_field.blank and raw in model_field.empty_values:
+                raw = None if model_field.null else ""
+            try:
+                setattr(coupon, model_field.attname, model_field.clean(raw, coupon))
+            except ValidationError as exc:
+                errors[model_field.name] = exc.messages
+        if errors:
+            raise ValidationError(errors)
+
+        coupon.clean()
+        return tuple(getattr(coupon, name) for name in IMPORT_FIELDS)
+
+    @staticmethod
+    def _boolean(raw: Any, default: bool) -> Any:
+        if raw is None or raw == "":
+            return default
+        if isinstance(raw, str) and raw.lower() in TRUE_VALUES:
+            return True
+        if isinstance(raw, str) and raw.lower() in FALSE_VALUES:
+            return False
+        return raw
+
+    def _load_chunk(self, chunk: list[tuple[int, Any]], report: ImportReport) -> None:
+        valid: dict[str, tuple] = {}
+        for line, data in chunk:
+            try:
+                row = self.validate(data)
+            except ValidationError as exc:
+                report.reject(line, self._message(exc), self._code(data))
+                continue
+            code = row[0]
+            if code in valid:
+                report.reject(line, "Código repetido no arquivo.", code)
+                continue
+            valid[code] = (line, *row)
+
+        if not valid:
+            return None
+
+        inserted = self._copy(valid.values())
+        report.created += len(inserted)
+        for code, (line, *_values) in valid.items():
+            if code not in inserted:
+                report.reject(line, "Já existe um cupom com este código.", code)
+
+    def _create_staging(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} (
+                    line bigint NOT NULL,
+                    code varchar(50) NOT NULL,
+                    description text NOT NULL,
+                    max_redemptions integer,
+                    available boolean NOT NULL
+                ) ON COMMIT DROP
+                """)
+
+    def _copy(self, rows: Iterable[tuple]) -> set[str]:
+        """
+        Carrega as linhas na tabela temporária com `COPY` e as insere em `Coupon`.
+
+        Returns:
+            Os códigos efetivamente inseridos.
+        """
+        table = Coupon._meta.db_table
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+            columns = ", ".join(("line", *IMPORT_FIELDS))
+            with cursor.cursor.copy(f"COPY {STAGING_TABLE} ({columns}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+            cursor.execute(
+                f"""
+                INSERT INTO {table}
+                    (code, description, max_redemptions, available, created_at, updated_at)
+                SELECT code, description, max_redemptions, available, %(now)s, %(now)s
+                FROM {STAGING_TABLE}
+                ORDER BY line
+                ON CONFLICT (code) DO NOTHING
+                RETURNING code
+                """,
+                {"now": now},
+            )
+            return {code for (code,) in cursor.fetchall()}
+
+    @staticmethod
+    def _message(exc: ValidationError) -> str:
+        if hasattr(exc, "error_dict"):
+            return "; ".join(
+                f"{name}: {' '.join(messages)}" for name, messages in exc.message_dict.items()
+            )
+        return " ".join(exc.messages)
+
+    @staticmethod
+    def _code(data: Any) -> str | None:
+        code = data.get("code") if isinstance(data, dict) else None
+        return str(code).strip() if code is not None else None
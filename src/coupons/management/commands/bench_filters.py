@@ -0,0 +1,142 @@
+import statistics
+import time
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection, models
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from config.settings import DJANGO_SETT
+from coupons.models import Coupon
+from coupons.views import CouponListCreateView
+from shared.api.filters import FieldFilterBackend
+from shared.patterns import DATETIME_API_FORMAT
+
+CODE_PREFIX = "BENCHFILTER"
+
+
+def legacy_filter_by_search(
+    queryset: models.QuerySet, search_params: list[tuple[str, str]], search_fields: list[str]
+) -> models.QuerySet:
+    """
+    Comportamento do antigo `BaseModel.filter_by_search`: `icontains` combinados com OU;
+    lookups como `__gte` nunca eram aplicados.
+    """
+    filters = models.Q()
+    for field, value in search_params:
+        if field in search_fields:
+            filters |= models.Q(**{f"{field}__icontains": value})
+    return queryset.filter(filters)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark dos filtros por campo: popula a tabela de cupons e compara o antigo "
+        "`filter_by_search` (icontains com OU) com o `FieldFilterBackend` (lookups tipados)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Cupons gerados.")
+        parser.add_argument("--repeat", type=int, default=5, help="Execuções por consulta.")
+        parser.add_argument("--keep", action="store_true", help="Mantém os dados gerados ao final.")
+
+    def handle(self, *args: list, **options: Any) -> None:
+        if not DJANGO_SETT.DEBUG:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Este comando só pode ser executado em ambiente de desenvolvimento!"
+                )
+            )
+            return None
+
+        rows = int(options["rows"])
+        self.stdout.write(f"Gerando {rows} cupons...")
+        started = time.perf_counter()
+        self.seed(rows)
+        self.stdout.write(f"Dados gerados em {time.perf_counter() - started:.1f}s")
+
+        since = timezone.localtime(timezone.now() - timedelta(hours=1))
+        code = f"{CODE_PREFIX}{rows // 2}"
+        # (nome, params do filtro novo, params equivalentes do antigo)
+        cases = [
+            ("código exato", {"code": code}, [("code", code)]),
+            (
+                "código em lista",
+                {"code__in": f"{code},{CODE_PREFIX}1,{CODE_PREFIX}2"},
+                [("code", code), ("code", f"{CODE_PREFIX}1"), ("code", f"{CODE_PREFIX}2")],
+            ),
+            ("prefixo", {"code__prefix": f"{CODE_PREFIX}12345"}, [("code", f"{CODE_PREFIX}12345")]),
+            (
+                "período",
+                {"created_at__gte": since.strftime(DATETIME_API_FORMAT)},
+                [("created_at__gte", since.strftime(DATETIME_API_FORMAT))],
+            ),
+        ]
+
+        factory = APIRequestFactory()
+        backend = FieldFilterBackend()
+        view = CouponListCreateView()
+        try:
+            for name, params, legacy_params in cases:
+                request = Request(factory.get("/", params))
+                runs: dict[str, Callable[[], models.QuerySet]] = {
+                    "legado": lambda legacy_params=legacy_params: legacy_filter_by_search(
+                        Coupon.objects.all(), legacy_params, ["code"]
+                    ),
+                    "tipado": lambda request=request: backend.filter_queryset(
+                        request, Coupon.objects.all(), view
+                    ),
+                }
+                for label, build in runs.items():
+                    page_ms, count_ms, total = self.measure(build, int(options["repeat"]))
+                    self.stdout.write(
+                        f"{name:>16} | {label:<6} | página: {page_ms:8.2f} ms | "
+                        f"count: {count_ms:8.2f} ms | resultados: {total}"
+                    )
+        finally:
+            if not options["keep"]:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"DELETE FROM {Coupon._meta.db_table} WHERE code LIKE %s",
+                        [f"{CODE_PREFIX}%"],
+                    )
+
+    @staticmethod
+    def seed(rows: int) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Coupon._meta.db_table}
+                    (code, description, max_redemptions, available, created_at, updated_at)
+                SELECT
+                    '{CODE_PREFIX}' || n,
+                    'Cupom de benchmark ' || n,
+                    NULL,
+                    true,
+                    now() - (n || ' seconds')::interval,
+                    now()
+                FROM generate_series(1, %s) AS n
+                """,
+                [rows],
+            )
+            cursor.execute(f"ANALYZE {Coupon._meta.db_table}")
+
+    @staticmethod
+    def measure(build: Callable[[], models.QuerySet], repeat: int) -> tuple[float, float, int]:
+        page_times, count_times = [], []
+        total = 0
+        for _ in range(repeat):
+            queryset = build()
+
+            started = time.perf_counter()
+            list(queryset.order_by("-created_at", "-id")[:25])
+            page_times.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            total = queryset.count()
+            count_times.append((time.perf_counter() - started) * 1000)
+        return statistics.median(page_times), statistics.median(count_times), total
@@ -0,0 +1,107 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connections
+from django.db.models import Count
+from django.utils import timezone
+
+from authentication.models import User
+from config.settings import DJANGO_SETT
+from coupons.models import Coupon, Redemption
+from coupons.services import redeem_coupon
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de resgates concorrentes: N clientes disputam a mesma cota e o comando "
+        "reporta resgates/s e a quantidade de resgates acima do limite (deve ser zero)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--clients", type=int, default=16, help="Clientes paralelos.")
+        parser.add_argument(
+            "--attempts", type=int, default=50, help="Tentativas de resgate por cliente."
+        )
+        parser.add_argument("--users", type=int, default=4, help="Usuários disputados.")
+        parser.add_argument(
+            "--max-redemptions", type=int, default=10, help="Cota de resgates por usuário."
+        )
+        parser.add_argument("--keep", action="store_true", help="Mantém os dados gerados ao final.")
+
+    def handle(self, *args: list, **options: dict) -> None:
+        if not DJANGO_SETT.DEBUG:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Este comando só pode ser executado em ambiente de desenvolvimento!"
+                )
+            )
+            return None
+
+        clients = int(options["clients"])  # type: ignore
+        attempts = int(options["attempts"])  # type: ignore
+        max_redemptions = int(options["max_redemptions"])  # type: ignore
+        run_id = uuid.uuid4().hex[:8]
+
+        coupon = Coupon.objects.create(
+            code=f"BENCH{run_id.upper()}",
+            description="Cupom de benchmark de resgates concorrentes",
+            max_redemptions=max_redemptions,
+            available=True,
+        )
+        users = [
+            User.objects.create_user(
+                email=f"bench.{run_id}.{index}@senfio.com",
+                works_since=timezone.now().date() - timedelta(days=1),
+            )
+            for index in range(int(options["users"]))  # type: ignore
+        ]
+
+        barrier = threading.Barrier(clients)
+
+        def client(index: int) -> tuple[int, int]:
+            user = users[index % len(users)]
+            accepted = rejected = 0
+            try:
+                barrier.wait()
+                for _ in range(attempts):
+                    try:
+                        redeem_coupon(user=user, coupon=coupon)
+                        accepted += 1
+                    except ValidationError:
+                        rejected += 1
+            finally:
+                connections.close_all()
+            return accepted, rejected
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            results = list(executor.map(client, range(clients)))
+        elapsed = time.perf_counter() - started
+
+        accepted = sum(result[0] for result in results)
+        rejected = sum(result[1] for result in results)
+        per_user = (
+            Redemption.objects.filter(coupon=coupon)
+            .values("user")
+            .annotate(total=Count("id"))
+            .values_list("total", flat=True)
+        )
+        over_redemptions = sum(max(0, total - max_redemptions) for total in per_user)
+
+        self.stdout.write(f"Clientes: {clients} | Tentativas: {clients * attempts}")
+        self.stdout.write(f"Aceitos: {accepted} | Rejeitados: {rejected}")
+        self.stdout.write(
+            f"Tempo: {elapsed:.3f}s | Vazão: {(clients * attempts) / elapsed:.1f} req/s"
+        )
+        self.stdout.write(f"Resgates/s efetivados: {accepted / elapsed:.1f}")
+        style = self.style.SUCCESS if over_redemptions == 0 else self.style.ERROR
+        self.stdout.write(style(f"Resgates acima do limite: {over_redemptions}"))
+
+        if not options["keep"]:
+            coupon.delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
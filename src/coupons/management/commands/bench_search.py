@@ -0,0 +1,109 @@
+import statistics
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from config.settings import DJANGO_SETT
+from coupons.models import Coupon
+from shared.api.filters import PostgresSearchFilter
+
+CODE_PREFIX = "BENCHSEARCH"
+WORDS = ["cafe", "livro", "viagem", "cinema", "academia", "mercado", "farmacia", "restaurante"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark da busca de cupons: popula a tabela com muitas linhas e compara o "
+        "`SearchFilter` padrão (icontains) com o `PostgresSearchFilter` (tsvector/trigram)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Cupons gerados.")
+        parser.add_argument("--repeat", type=int, default=5, help="Execuções por termo.")
+        parser.add_argument(
+            "--terms",
+            nargs="+",
+            default=["CH4", "restaurante", "viag", "cinema 77"],
+            help="Termos pesquisados.",
+        )
+        parser.add_argument("--keep", action="store_true", help="Mantém os dados gerados ao final.")
+
+    def handle(self, *args: list, **options: Any) -> None:
+        if not DJANGO_SETT.DEBUG:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Este comando só pode ser executado em ambiente de desenvolvimento!"
+                )
+            )
+            return None
+
+        rows = int(options["rows"])
+        self.stdout.write(f"Gerando {rows} cupons...")
+        started = time.perf_counter()
+        self.seed(rows)
+        self.stdout.write(f"Dados gerados em {time.perf_counter() - started:.1f}s")
+
+        class BenchView:
+            search_fields = ["code", "description"]
+
+        factory = APIRequestFactory()
+        backends = {"icontains": SearchFilter(), "postgres": PostgresSearchFilter()}
+        try:
+            for term in options["terms"]:
+                request = Request(factory.get("/", {"search": term}))
+                for name, backend in backends.items():
+                    page_ms, count_ms, total = self.measure(
+                        backend, request, BenchView(), int(options["repeat"])
+                    )
+                    self.stdout.write(
+                        f"{term!r:>16} | {name:<9} | página: {page_ms:8.2f} ms | "
+                        f"count: {count_ms:8.2f} ms | resultados: {total}"
+                    )
+        finally:
+            if not options["keep"]:
+                Coupon.objects.filter(code__startswith=CODE_PREFIX).delete()
+
+    @staticmethod
+    def seed(rows: int) -> None:
+        words = "ARRAY[" + ", ".join(f"'{word}'" for word in WORDS) + "]"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Coupon._meta.db_table}
+                    (code, description, max_redemptions, available, created_at, updated_at)
+                SELECT
+                    '{CODE_PREFIX}' || upper(to_hex(n * 2654435761 %% 4294967296)) || n,
+                    'Desconto em ' || ({words})[1 + n %% {len(WORDS)}]
+                        || ' e ' || ({words})[1 + (n / 7) %% {len(WORDS)}] || ' ' || (n %% 100),
+                    NULL,
+                    true,
+                    now() - (n || ' seconds')::interval,
+                    now()
+                FROM generate_series(1, %s) AS n
+                """,
+                [rows],
+            )
+            cursor.execute(f"ANALYZE {Coupon._meta.db_table}")
+
+    @staticmethod
+    def measure(
+        backend: SearchFilter, request: Request, view: Any, repeat: int
+    ) -> tuple[float, float, int]:
+        page_times, count_times = [], []
+        total = 0
+        for _ in range(repeat):
+            queryset = backend.filter_queryset(request, Coupon.objects.all(), view)
+
+            started = time.perf_counter()
+            list(queryset.order_by("-created_at", "-id")[:25])
+            page_times.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            total = queryset.count()
+            count_times.append((time.perf_counter() - started) * 1000)
+        return statistics.median(page_times), statistics.median(count_times), total
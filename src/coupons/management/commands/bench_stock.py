@@ -0,0 +1,126 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connections, transaction
+from django.utils import timezone
+
+from authentication.models import User
+from config.settings import DJANGO_SETT
+from coupons.models import Coupon, CouponStockShard, Redemption
+from coupons.services import redeem_coupon
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark do estoque total: N clientes (um usuário cada) disputam o estoque de um "
+        "mesmo cupom, primeiro com um único contador e depois com o estoque em fatias. "
+        "Reporta resgates/s e os resgates além do estoque (deve ser zero)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--clients", type=int, default=16, help="Clientes paralelos.")
+        parser.add_argument(
+            "--attempts", type=int, default=100, help="Tentativas de resgate por cliente."
+        )
+        parser.add_argument("--stock", type=int, default=1000, help="Estoque total do cupom.")
+        parser.add_argument("--shards", type=int, default=8, help="Fatias do estoque.")
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=5.0,
+            help=(
+                "Latência simulada entre a aplicação e o banco, somada ao tempo em que a "
+                "transação do resgate mantém o estoque bloqueado."
+            ),
+        )
+        parser.add_argument("--keep", action="store_true", help="Mantém os dados gerados ao final.")
+
+    def handle(self, *args: list, **options: dict) -> None:
+        if not DJANGO_SETT.DEBUG:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Este comando só pode ser executado em ambiente de desenvolvimento!"
+                )
+            )
+            return None
+
+        clients = int(options["clients"])  # type: ignore
+        run_id = uuid.uuid4().hex[:8]
+        users = [
+            User.objects.create_user(
+                email=f"bench.stock.{run_id}.{index}@senfio.com",
+                works_since=timezone.now().date() - timedelta(days=1),
+            )
+            for index in range(clients)
+        ]
+
+        coupons = []
+        try:
+            for shards in (1, int(options["shards"])):  # type: ignore
+                coupon = Coupon.objects.create(
+                    code=f"STOCK{shards}X{run_id.upper()}",
+                    description="Cupom de benchmark do estoque total",
+                    max_redemptions=int(options["attempts"]),  # type: ignore
+                    max_total_redemptions=int(options["stock"]),  # type: ignore
+                    stock_shards=shards,
+                    available=True,
+                )
+                coupons.append(coupon)
+                self._run(
+                    coupon,
+                    users,
+                    attempts=int(options["attempts"]),  # type: ignore
+                    latency=float(options["latency_ms"]) / 1000,  # type: ignore
+                )
+        finally:
+            if not options["keep"]:
+                Coupon.objects.filter(pk__in=[coupon.pk for coupon in coupons]).delete()
+                User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def _run(self, coupon: Coupon, users: list[User], attempts: int, latency: float) -> None:
+        barrier = threading.Barrier(len(users))
+
+        def client(user: User) -> int:
+            accepted = 0
+            try:
+                barrier.wait()
+                for _ in range(attempts):
+                    with transaction.atomic():
+                        try:
+                            redeem_coupon(user=user, coupon=Coupon.objects.get(pk=coupon.pk))
+                        except ValidationError:
+                            continue
+                        accepted += 1
+                        time.sleep(latency)
+            finally:
+                connections.close_all()
+            return accepted
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(users)) as executor:
+            accepted = sum(executor.map(client, users))
+        elapsed = time.perf_counter() - started
+
+        redeemed = Redemption.objects.filter(coupon=coupon).count()
+        over_stock = max(0, redeemed - coupon.max_total_redemptions)
+        coupon.refresh_from_db(fields=["available"])
+
+        self.stdout.write(
+            f"Fatias: {coupon.stock_shard_count} | Clientes: {len(users)} | "
+            f"Tentativas: {len(users) * attempts}"
+        )
+        self.stdout.write(
+            f"Aceitos: {accepted} | Tempo: {elapsed:.3f}s | "
+            f"Resgates/s efetivados: {accepted / elapsed:.1f}"
+        )
+        self.stdout.write(
+            f"Estoque restante: {CouponStockShard.objects.remaining(coupon.pk)} | "
+            f"Disponível: {coupon.available}"
+        )
+        style = self.style.SUCCESS if over_stock == 0 else self.style.ERROR
+        self.stdout.write(style(f"Resgates além do estoque: {over_stock}"))
@@ -0,0 +1,52 @@
+import time
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from coupons.imports import FORMATS, CouponImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa cupons em massa de um arquivo CSV (com cabeçalho) ou NDJSON, com as colunas "
+        "`code`, `description`, `max_redemptions` e `available`."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path", type=Path, help="Arquivo a importar.")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Formato do arquivo (padrão: deduzido da extensão).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10_000,
+            help="Linhas validadas e carregadas por bloco.",
+        )
+
+    def handle(self, *args: list, **options: Any) -> None:
+        path: Path = options["path"]
+        format = options["format"] or path.suffix.lstrip(".").lower()
+        if format not in FORMATS:
+            raise CommandError("Informe --format csv ou --format ndjson.")
+        if not path.is_file():
+            raise CommandError(f"Arquivo não encontrado: {path}")
+
+        started = time.perf_counter()
+        with path.open(encoding="utf-8-sig", newline="") as lines:
+            report = CouponImporter(chunk_size=options["chunk_size"]).run(lines, format=format)
+        elapsed = time.perf_counter() - started
+
+        for error in report.errors:
+            self.stdout.write(f"  linha {error.line} ({error.code or '-'}): {error.message}")
+        if report.rejected > len(report.errors):
+            self.stdout.write(f"  ... e mais {report.rejected - len(report.errors)} linha(s).")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report.created} cupom(ns) importado(s) e {report.rejected} linha(s) "
+                f"recusada(s) em {elapsed:.1f}s."
+            )
+        )
@@ -0,0 +1,52 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import DatabaseError, close_old_connections
+
+from coupons.services import process_redemption_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker da fila de resgates assíncronos: grava os pedidos pendentes em lotes. "
+        "Vários workers podem rodar ao mesmo tempo (os lotes são reservados com SKIP LOCKED)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=500, help="Pedidos por lote.")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.5,
+            help="Espera, em segundos, quando a fila está vazia.",
+        )
+        parser.add_argument("--once", action="store_true", help="Esvazia a fila uma vez e encerra.")
+
+    def handle(self, *args: list, **options: Any) -> None:
+        batch_size = int(options["batch_size"])
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    result = process_redemption_queue(batch_size=batch_size)
+                except DatabaseError as exc:
+                    # Ex.: deadlock ou banco fora do ar: o lote não foi gravado e volta à fila.
+                    if options["once"]:
+                        raise
+                    self.stderr.write(f"Falha ao processar a fila: {exc}")
+                    close_old_connections()
+                    time.sleep(float(options["interval"]))
+                    continue
+                if result.processed:
+                    elapsed = (time.perf_counter() - started) * 1000
+                    self.stdout.write(
+                        f"{result.processed} pedidos em {elapsed:.1f} ms "
+                        f"({result.redeemed} resgatados, {result.rejected} recusados)"
+                    )
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(float(options["interval"]))
+        except KeyboardInterrupt:
+            self.stdout.write("Worker encerrado.")
@@ -0,0 +1,94 @@
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Least
+
+from coupons.models import Coupon, Redemption, RedemptionCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói e reconcilia os contadores de resgates (RedemptionCounter) e as fatias do "
+        "estoque total dos cupons (CouponStockShard) a partir do histórico de resgates "
+        "(Redemption)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas reporta as divergências, sem corrigir.",
+        )
+
+    def handle(self, *args: list, **options: dict) -> None:
+        ledger_total = (
+            Redemption.objects.filter(user=OuterRef("user"), coupon=OuterRef("coupon"))
+            .order_by()
+            .values("coupon")
+            .annotate(total=Count("id"))
+            .values("total")[:1]
+        )
+        drifted = (
+            RedemptionCounter.objects.annotate(actual=Coalesce(Subquery(ledger_total), Value(0)))
+            .exclude(redeemed=F("actual"))
+            .values_list("user_id", "coupon_id")
+        )
+        missing = (
+            Redemption.objects.order_by()
+            .values("user_id", "coupon_id")
+            .annotate(total=Count("id"))
+            .filter(
+                ~Exists(
+                    RedemptionCounter.objects.filter(
+                        user=OuterRef("user_id"), coupon=OuterRef("coupon_id")
+                    )
+                )
+            )
+            .values_list("user_id", "coupon_id")
+        )
+
+        ledger_coupon_total = (
+            Redemption.objects.filter(coupon=OuterRef("pk"))
+            .order_by()
+            .values("coupon")
+            .annotate(total=Count("id"))
+            .values("total")[:1]
+        )
+        stocks = list(
+            Coupon.objects.filter(max_total_redemptions__isnull=False)
+            .with_stock()
+            .annotate(actual=Coalesce(Subquery(ledger_coupon_total), Value(0)))
+            .exclude(stock_redeemed=Least(F("actual"), F("max_total_redemptions")))
+            .defer("search_vector")
+        )
+
+        pairs = list(drifted.iterator()) + list(missing.iterator())
+        self.stdout.write(f"Contadores divergentes ou ausentes: {len(pairs)}")
+        self.stdout.write(f"Estoques divergentes: {len(stocks)}")
+        if options["dry_run"]:
+            for user_id, coupon_id in pairs:
+                self.stdout.write(f"  usuário={user_id} cupom={coupon_id}")
+            for coupon in stocks:
+                self.stdout.write(f"  estoque do cupom={coupon.pk}")
+            return None
+
+        for user_id, coupon_id in pairs:
+            self._reconcile(user_id=user_id, coupon_id=coupon_id)
+        for coupon in stocks:
+            coupon.rebuild_stock()
+
+        self.stdout.write(self.style.SUCCESS(f"{len(pairs)} contador(es) reconciliado(s)."))
+        self.stdout.write(self.style.SUCCESS(f"{len(stocks)} estoque(s) reconciliado(s)."))
+
+    @staticmethod
+    def _reconcile(user_id: int, coupon_id: int) -> None:
+        """
+        Recalcula um contador sob o mesmo lock usado no resgate, para não competir com
+        resgates concorrentes do mesmo par (usuário, cupom).
+        """
+        with transaction.atomic():
+            counter = RedemptionCounter.objects.lock(user_id=user_id, coupon_id=coupon_id)
+            counter.redeemed = Redemption.objects.filter(
+                user_id=user_id, coupon_id=coupon_id
+            ).count()
+            counter.save(update_fields=["redeemed", "updated_at"])
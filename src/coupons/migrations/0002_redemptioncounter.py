@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    Redemption = apps.get_model("coupons", "Redemption")
+    RedemptionCounter = apps.get_model("coupons", "RedemptionCounter")
+
+    totals = (
+        Redemption.objects.order_by()
+        .values("user_id", "coupon_id")
+        .annotate(total=Count("id"))
+        .iterator(chunk_size=5000)
+    )
+    batch = []
+    for row in totals:
+        batch.append(
+            RedemptionCounter(
+                user_id=row["user_id"], coupon_id=row["coupon_id"], redeemed=row["total"]
+            )
+        )
+        if len(batch) >= 5000:
+            RedemptionCounter.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        RedemptionCounter.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("coupons", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RedemptionCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        editable=False, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Criado em")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Atualizado em")),
+                ("redeemed", models.PositiveIntegerField(default=0, verbose_name="Resgates")),
+                (
+                    "coupon",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="redemption_counters",
+                        to="coupons.coupon",
+                        verbose_name="Cupom",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="redemption_counters",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuário",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Contador de resgates",
+                "verbose_name_plural": "Contadores de resgates",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "coupon"), name="unique_redemption_counter_user_coupon"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("coupons", "0002_redemptioncounter"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="coupon",
+            index=models.Index(fields=["-created_at", "-id"], name="coupon_created_keyset_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="redemption",
+            index=models.Index(
+                fields=["user", "-redeemed_at", "-id"], name="redemption_user_keyset_idx"
+            ),
+        ),
+    ]
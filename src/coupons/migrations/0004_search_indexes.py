@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:19
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("coupons", "0003_keyset_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="coupon",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector(
+                    "description", config="simple"
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+                verbose_name="Vetor de busca",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="coupon",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="coupon_search_vector_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="coupon",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("code"), name="gin_trgm_ops"
+                ),
+                name="coupon_code_trgm_idx",
+            ),
+        ),
+    ]
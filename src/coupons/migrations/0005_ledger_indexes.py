@@ -0,0 +1,58 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:23
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("coupons", "0004_search_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="redemption",
+            index=models.Index(fields=["-redeemed_at", "-id"], name="redemption_recent_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="redemption",
+            index=models.Index(
+                fields=["coupon", "user"],
+                include=("redeemed_at",),
+                name="redemption_coupon_user_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="redemption",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                autosummarize=True, fields=["redeemed_at"], name="redemption_redeemed_brin"
+            ),
+        ),
+        # Os índices novos são criados antes de remover os índices implícitos das FKs.
+        migrations.AlterField(
+            model_name="redemption",
+            name="coupon",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="redemptions",
+                to="coupons.coupon",
+                verbose_name="Cupom",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="redemption",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="redemptions",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Usuário",
+            ),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("coupons", "0005_ledger_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RedemptionRequest",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        editable=False, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Na fila"),
+                            ("REDEEMED", "Resgatado"),
+                            ("REJECTED", "Recusado"),
+                        ],
+                        default="PENDING",
+                        max_length=10,
+                        verbose_name="Situação",
+                    ),
+                ),
+                (
+                    "error",
+                    models.TextField(blank=True, default="", verbose_name="Motivo da recusa"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Criado em")),
+                ("processed_at", models.DateTimeField(null=True, verbose_name="Processado em")),
+                (
+                    "coupon",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="coupons.coupon",
+                        verbose_name="Cupom",
+                    ),
+                ),
+                (
+                    "redemption",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="coupons.redemption",
+                        verbose_name="Resgate",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="redemption_requests",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuário",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Pedido de resgate",
+                "verbose_name_plural": "Pedidos de resgate",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "PENDING")),
+                        fields=["id"],
+                        name="redemption_request_pending_idx",
+                    )
+                ],
+            },
+        ),
+    ]
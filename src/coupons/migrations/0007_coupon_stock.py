@@ -0,0 +1,77 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:46
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("coupons", "0006_redemption_requests"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="coupon",
+            name="max_total_redemptions",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Limite de resgates somando todos os usuários (nulo para ilimitado).",
+                null=True,
+                validators=[django.core.validators.MinValueValidator(1)],
+                verbose_name="Estoque total de resgates",
+            ),
+        ),
+        migrations.AddField(
+            model_name="coupon",
+            name="stock_shards",
+            field=models.PositiveSmallIntegerField(
+                db_default=8,
+                default=8,
+                help_text="Linhas em que o estoque total é dividido, para resgates concorrentes.",
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(64),
+                ],
+                verbose_name="Fatias do estoque",
+            ),
+        ),
+        migrations.CreateModel(
+            name="CouponStockShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        editable=False, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("shard", models.PositiveSmallIntegerField(verbose_name="Fatia")),
+                ("capacity", models.PositiveIntegerField(verbose_name="Capacidade")),
+                ("redeemed", models.PositiveIntegerField(default=0, verbose_name="Resgates")),
+                (
+                    "coupon",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_counters",
+                        to="coupons.coupon",
+                        verbose_name="Cupom",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Fatia de estoque",
+                "verbose_name_plural": "Fatias de estoque",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("coupon", "shard"), name="unique_coupon_stock_shard"
+                    ),
+                    models.CheckConstraint(
+                        condition=models.Q(("redeemed__lte", models.F("capacity"))),
+                        name="coupon_stock_shard_capacity",
+                    ),
+                ],
+            },
+        ),
+    ]
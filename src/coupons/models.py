@@ -1,10 +1,62 @@
-from typing import Self
+import random
+from typing import Any, ClassVar, Self
 
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, OpClass
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import connections, models, transaction
+from django.db.models import Case, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest, Now, Upper
 
 from authentication.models import User
-from shared.models import BaseModel
+from shared.models import BaseModel, data_versions, search_vector_field
+
+
+class CouponQuerySet(models.QuerySet):
+    def with_balance(self, user: Any) -> Self:
+        """
+        Anota cada cupom com o saldo do usuário em uma única consulta.
+            Anotações:\n
+            - redeemed: quantidade de resgates do usuário no cupom
+            - remaining: quantidade de resgates ainda disponíveis para o usuário
+        """
+        redeemed = RedemptionCounter.objects.filter(user=user, coupon=OuterRef("pk")).values(
+            "redeemed"
+        )[:1]
+        return self.annotate(
+            redeemed=Coalesce(Subquery(redeemed), Value(0)),
+        ).annotate(
+            remaining=Case(
+                When(
+                    max_redemptions__isnull=True,
+                    then=Greatest(Value(1) - F("redeemed"), Value(0)),
+                ),
+                default=Greatest(F("max_redemptions") - F("redeemed"), Value(0)),
+                output_field=models.IntegerField(),
+            )
+        )
+
+    def with_stock(self) -> Self:
+        """
+        Anota cada cupom com o estoque total, somando as fatias de `CouponStockShard`.
+            Anotações:\n
+            - stock_redeemed: unidades do estoque já consumidas
+            - stock_remaining: unidades restantes (nulo para cupons sem estoque total)
+        """
+        redeemed = (
+            CouponStockShard.objects.filter(coupon=OuterRef("pk"))
+            .order_by()
+            .values("coupon")
+            .annotate(total=Sum("redeemed"))
+            .values("total")
+        )
+        return self.annotate(stock_redeemed=Coalesce(Subquery(redeemed), Value(0))).annotate(
+            stock_remaining=Case(
+                When(max_total_redemptions__isnull=True, then=Value(None)),
+                default=Greatest(F("max_total_redemptions") - F("stock_redeemed"), Value(0)),
+                output_field=models.IntegerField(),
+            )
+        )
 
 
 class Coupon(BaseModel):
@@ -13,8 +65,40 @@ class Coupon(BaseModel):
     max_redemptions = models.PositiveIntegerField(
         null=True, blank=True, verbose_name="Número máximo de resgates"
     )
+    max_total_redemptions = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1)],
+        verbose_name="Estoque total de resgates",
+        help_text="Limite de resgates somando todos os usuários (nulo para ilimitado).",
+    )
+    # `db_default` para as inserções em SQL puro (ex.: importação de cupons).
+    stock_shards = models.PositiveSmallIntegerField(
+        default=8,
+        db_default=8,
+        validators=[MinValueValidator(1), MaxValueValidator(64)],
+        verbose_name="Fatias do estoque",
+        help_text="Linhas em que o estoque total é dividido, para resgates concorrentes.",
+    )
     available = models.BooleanField(default=True, verbose_name="Disponível")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    search_vector = search_vector_field("description")
+
+    # Campos de busca atendidos pela coluna tsvector (ver `shared.api.filters`).
+    search_vector_fields: ClassVar[dict[str, str]] = {"description": "search_vector"}
+    stock_fields: ClassVar[tuple[str, str]] = ("max_total_redemptions", "stock_shards")
+
+    objects = CouponQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db: str, field_names: list[str], values: list[Any]) -> Self:
+        instance = super().from_db(db, field_names, values)
+        instance._saved_stock = instance._stock_config()
+        return instance
+
+    def _stock_config(self) -> tuple[Any, ...]:
+        # Campos adiados não são carregados só para a comparação.
+        return tuple(self.__dict__.get(name) for name in self.stock_fields)
 
     def clean(self) -> None:
         super().clean()
@@ -23,49 +107,558 @@ class Coupon(BaseModel):
                 "O número máximo de resgates deve ser maior que zero ou nulo (para uso único)."
             )
 
-    def save(self, *args: list, **kwargs: dict) -> Self:
-        self.clean()
-        return super().save(*args, **kwargs)
+    def save(self, *args: list, **kwargs: Any) -> Self:
+        """
+        Salva o cupom e, se o estoque total ou o número de fatias mudou, redistribui o
+        estoque entre as fatias (`CouponStockShard.objects.rebuild`).
+        """
+        update_fields = kwargs.get("update_fields")
+        config = self._stock_config()
+        rebuild = config != getattr(self, "_saved_stock", (None, None))
+        if self._state.adding and self.max_total_redemptions is None:
+            rebuild = False
+        if update_fields is not None and not set(self.stock_fields) & set(update_fields):
+            rebuild = False
+
+        with transaction.atomic(savepoint=False):
+            saved = super().save(*args, **kwargs)
+            self._saved_stock = config
+            if rebuild:
+                self.rebuild_stock()
+        return saved
+
+    def rebuild_stock(self) -> None:
+        """
+        Recria as fatias do estoque total a partir dos resgates gravados e marca o cupom
+        como indisponível se o estoque já estiver esgotado.
+        """
+        with transaction.atomic(savepoint=False):
+            if CouponStockShard.objects.rebuild(self) == 0 and self.available:
+                self.available = False
+                self.save(clean=False, update_fields=["available", "updated_at"])
+
+    @property
+    def stock_shard_count(self) -> int:
+        """
+        Quantidade de fatias do estoque: nenhuma fatia fica com capacidade zero.
+        """
+        if self.max_total_redemptions is None:
+            return 0
+        return min(self.stock_shards, self.max_total_redemptions)
+
+    def take_stock(self, quantity: int = 1) -> int:
+        """
+        Consome até `quantity` unidades do estoque total, na transação corrente, e marca o
+        cupom como indisponível quando o estoque acaba. Cupons sem estoque total não
+        consultam o banco.
+
+        Returns:
+            Unidades consumidas (menos que `quantity` se o estoque não bastou).
+        """
+        if self.max_total_redemptions is None:
+            return quantity
+        taken, filled = CouponStockShard.objects.take(self, quantity)
+        if filled and self.available and CouponStockShard.objects.remaining(self.pk) == 0:
+            self.available = False
+            self.save(clean=False, update_fields=["available", "updated_at"])
+        return taken
+
+    def release_stock(self) -> None:
+        """
+        Devolve uma unidade ao estoque total, na transação corrente, e reabre o cupom se o
+        estoque estava esgotado. Cupons indisponíveis com estoque sobrando foram desativados
+        por outro motivo e continuam indisponíveis.
+        """
+        if self.max_total_redemptions is None:
+            return
+        CouponStockShard.objects.release(self.pk)
+        if not self.available and CouponStockShard.objects.remaining(self.pk) == 1:
+            self.available = True
+            self.save(clean=False, update_fields=["available", "updated_at"])
 
     class Meta:
         verbose_name = "Cupom"
         verbose_name_plural = "Cupons"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="coupon_created_keyset_idx"),
+            GinIndex(fields=["search_vector"], name="coupon_search_vector_idx"),
+            GinIndex(OpClass(Upper("code"), name="gin_trgm_ops"), name="coupon_code_trgm_idx"),
+        ]
 
 
 class Redemption(BaseModel):
+    # Os índices implícitos das FKs ficam desligados: `user` é prefixo do `unique_together`
+    # e do `redemption_user_keyset_idx`, e `coupon` do `redemption_coupon_user_idx`.
     user = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name="redemptions", verbose_name="Usuário"
+        User,
+        on_delete=models.CASCADE,
+        related_name="redemptions",
+        verbose_name="Usuário",
+        db_index=False,
     )
     coupon = models.ForeignKey(
-        Coupon, on_delete=models.CASCADE, related_name="redemptions", verbose_name="Cupom"
+        Coupon,
+        on_delete=models.CASCADE,
+        related_name="redemptions",
+        verbose_name="Cupom",
+        db_index=False,
     )
     redeemed_at = models.DateTimeField(auto_now_add=True, verbose_name="Resgatado em")
 
     def clean(self) -> None:
         super().clean()
+        self.validate_quota(
+            redeemed=RedemptionCounter.objects.redeemed(
+                user_id=self.user_id, coupon_id=self.coupon_id
+            )
+        )
+
+    def validate_quota(self, redeemed: int) -> None:
+        """
+        Valida o resgate dado o número de resgates que o usuário já fez neste cupom.
+        Não consulta o banco: quem chama fornece a contagem (ex.: do contador bloqueado).
+        """
         if not self.coupon.available:
             raise ValidationError("Este cupom não está disponível para resgate.")
-
-        resgate_count = Redemption.objects.filter(user=self.user, coupon=self.coupon).count()
-
-        if self.coupon.max_redemptions is None and resgate_count > 0:
+        if self.coupon.max_redemptions is None and redeemed > 0:
             raise ValidationError("Este cupom só pode ser resgatado uma vez por usuário.")
-        elif (
-            self.coupon.max_redemptions is not None and resgate_count >= self.coupon.max_redemptions
-        ):
+        elif self.coupon.max_redemptions is not None and redeemed >= self.coupon.max_redemptions:
             raise ValidationError("Você atingiu o limite de resgates para este cupom.")
 
-    def save(self, *args: list, **kwargs: dict) -> Self:
-        self.clean()
-        return super().save(*args, **kwargs)
+    def save(self, *args: list, **kwargs: Any) -> Self:
+        creating = self._state.adding
+        # Sem savepoint: dentro de uma transação externa (ex.: `redeem_coupon`), uma falha
+        # no contador já invalida a transação inteira.
+        with transaction.atomic(savepoint=False):
+            saved = super().save(*args, **kwargs)
+            if creating:
+                RedemptionCounter.objects.increment(user_id=self.user_id, coupon_id=self.coupon_id)
+                transaction.on_commit(lambda: recent_redemptions_feed().push(self))
+                data_versions.bump(
+                    Redemption, RedemptionCounter, scopes={"user_id": [self.user_id]}
+                )
+        return saved
+
+    def delete(self, *args: Any, **kwargs: Any) -> tuple[int, dict[str, int]]:
+        redemption_id = self.pk
+        with transaction.atomic(savepoint=False):
+            deleted = super().delete(*args, **kwargs)
+            RedemptionCounter.objects.decrement(user_id=self.user_id, coupon_id=self.coupon_id)
+            self.coupon.release_stock()
+            transaction.on_commit(lambda: recent_redemptions_feed().discard(redemption_id))
+            data_versions.bump(Redemption, RedemptionCounter, scopes={"user_id": [self.user_id]})
+        return deleted
 
     class Meta:
         verbose_name = "Resgate"
         verbose_name_plural = "Resgates"
         ordering = ["-redeemed_at"]
+        indexes = [
+            # Resgates do usuário (listagem e paginação por cursor).
+            models.Index(fields=["user", "-redeemed_at", "-id"], name="redemption_user_keyset_idx"),
+            # Resgates recentes de todos os usuários.
+            models.Index(fields=["-redeemed_at", "-id"], name="redemption_recent_idx"),
+            # Contagens por cupom e por (cupom, usuário) respondidas só pelo índice.
+            models.Index(
+                fields=["coupon", "user"],
+                include=["redeemed_at"],
+                name="redemption_coupon_user_idx",
+            ),
+            # Filtros por período; pequeno e barato de manter, já que `redeemed_at` só cresce.
+            BrinIndex(fields=["redeemed_at"], autosummarize=True, name="redemption_redeemed_brin"),
+        ]
         unique_together = [
             "user",
             "coupon",
             "redeemed_at",
         ]  # Permite múltiplos resgates se permitido no cupom
+
+
+class RedemptionCounterQuerySet(models.QuerySet):
+    def redeemed(self, user_id: int, coupon_id: int) -> int:
+        """
+        Retorna a quantidade de resgates do usuário no cupom (0 se não houver contador).
+        """
+        value = (
+            self.filter(user_id=user_id, coupon_id=coupon_id)
+            .values_list("redeemed", flat=True)
+            .first()
+        )
+        return value or 0
+
+    def lock(self, user_id: int, coupon_id: int) -> "RedemptionCounter":
+        """
+        Garante a existência do contador e o bloqueia (SELECT ... FOR UPDATE) até o fim
+        da transação corrente. Deve ser chamado dentro de `transaction.atomic()`.
+        """
+        self.bulk_create(
+            [RedemptionCounter(user_id=user_id, coupon_id=coupon_id)], ignore_conflicts=True
+        )
+        return self.select_for_update().get(user_id=user_id, coupon_id=coupon_id)
+
+    def lock_many(self, user_id: int, coupon_ids: list[int]) -> dict[int, "RedemptionCounter"]:
+        """
+        Versão em lote de `lock`: garante e bloqueia os contadores do usuário nos cupons, em
+        ordem de `coupon_id` para que lotes concorrentes não entrem em deadlock.
+
+        Returns:
+            Contadores bloqueados indexados por `coupon_id`.
+        """
+        coupon_ids = sorted(set(coupon_ids))
+        self.bulk_create(
+            [RedemptionCounter(user_id=user_id, coupon_id=coupon_id) for coupon_id in coupon_ids],
+            ignore_conflicts=True,
+        )
+        counters = (
+            self.select_for_update()
+            .filter(user_id=user_id, coupon_id__in=coupon_ids)
+            .order_by("coupon_id")
+        )
+        return {counter.coupon_id: counter for counter in counters}
+
+    def lock_pairs(self, pairs: set[tuple[int, int]]) -> dict[tuple[int, int], "RedemptionCounter"]:
+        """
+        Versão de `lock_many` para vários usuários: garante e bloqueia os contadores dos
+        pares (usuário, cupom), em ordem de (`user_id`, `coupon_id`).
+
+        Returns:
+            Contadores bloqueados indexados por `(user_id, coupon_id)`.
+        """
+        pairs = sorted(pairs)
+        if not pairs:
+            return {}
+        self.bulk_create(
+            [
+                RedemptionCounter(user_id=user_id, coupon_id=coupon_id)
+                for user_id, coupon_id in pairs
+            ],
+            ignore_conflicts=True,
+        )
+        condition = Q()
+        for user_id, coupon_id in pairs:
+            condition |= Q(user_id=user_id, coupon_id=coupon_id)
+        counters = self.select_for_update().filter(condition).order_by("user_id", "coupon_id")
+        return {(counter.user_id, counter.coupon_id): counter for counter in counters}
+
+    def add_redeemed(self, deltas: dict[int, int]) -> None:
+        """
+        Soma `deltas[id]` ao contador de cada `id` em um único UPDATE (sem o `CASE` por
+        linha do `bulk_update`, caro para lotes grandes).
+        """
+        if not deltas:
+            return None
+        table = self.model._meta.db_table
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table} SET redeemed = {table}.redeemed + v.delta, updated_at = now()
+                FROM unnest(%s::bigint[], %s::integer[]) AS v(id, delta)
+                WHERE {table}.id = v.id
+                """,
+                [list(deltas), list(deltas.values())],
+            )
+
+    def increment(self, user_id: int, coupon_id: int) -> None:
+        counters = self.filter(user_id=user_id, coupon_id=coupon_id)
+        if not counters.update(redeemed=F("redeemed") + 1, updated_at=Now()):
+            self.bulk_create(
+                [RedemptionCounter(user_id=user_id, coupon_id=coupon_id)], ignore_conflicts=True
+            )
+            counters.update(redeemed=F("redeemed") + 1, updated_at=Now())
+
+    def decrement(self, user_id: int, coupon_id: int) -> None:
+        self.filter(user_id=user_id, coupon_id=coupon_id, redeemed__gt=0).update(
+            redeemed=F("redeemed") - 1, updated_at=Now()
+        )
+
+
+class RedemptionCounter(BaseModel):
+    """
+    Contador desnormalizado de resgates por (usuário, cupom).
+
+    Atualizado na mesma transação de cada resgate criado (`Redemption.save`) ou removido
+    (`Redemption.delete`), tornando a verificação de cota e o saldo consultas O(1).
+    Operações em massa que não passam por esses métodos (ex.: `QuerySet.delete`) devem ser
+    seguidas de `manage.py reconcile_redemption_counters`.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="redemption_counters",
+        verbose_name="Usuário",
+    )
+    coupon = models.ForeignKey(
+        Coupon,
+        on_delete=models.CASCADE,
+        related_name="redemption_counters",
+        verbose_name="Cupom",
+    )
+    redeemed = models.PositiveIntegerField(default=0, verbose_name="Resgates")
+
+    objects = RedemptionCounterQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Contador de resgates"
+        verbose_name_plural = "Contadores de resgates"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "coupon"], name="unique_redemption_counter_user_coupon"
+            ),
+        ]
+
+
+class CouponStockShardQuerySet(models.QuerySet):
+    def rebuild(self, coupon: Coupon) -> int | None:
+        """
+        Recria as fatias do estoque do cupom a partir de `max_total_redemptions`,
+        `stock_shards` e dos resgates já gravados. A remoção das fatias antigas aguarda os
+        resgates em andamento, que as mantêm bloqueadas até o commit.
+
+        Returns:
+            Unidades restantes no estoque, ou `None` se o cupom não tiver estoque total.
+        """
+        self.filter(coupon=coupon).delete()
+        count = coupon.stock_shard_count
+        if not count:
+            return None
+
+        total = coupon.max_total_redemptions
+        redeemed = Redemption.objects.filter(coupon=coupon).count()
+        shards = []
+        for index in range(count):
+            capacity = total // count + (index < total % count)
+            used = min(capacity, redeemed)
+            redeemed -= used
+            shards.append(
+                CouponStockShard(coupon=coupon, shard=index, capacity=capacity, redeemed=used)
+            )
+        self.bulk_create(shards)
+        return sum(shard.capacity - shard.redeemed for shard in shards)
+
+    def take(self, coupon: Coupon, quantity: int = 1) -> tuple[int, bool]:
+        """
+        Consome até `quantity` unidades das fatias do cupom, bloqueando uma fatia por vez
+        até o fim da transação corrente. Um resgate começa por uma fatia sorteada e só passa
+        para a seguinte se ela estiver cheia; lotes percorrem as fatias em ordem crescente,
+        para que lotes concorrentes não entrem em deadlock.
+
+        Returns:
+            Unidades consumidas e se alguma fatia visitada terminou cheia.
+        """
+        count = coupon.stock_shard_count
+        if quantity == 1:
+            start = random.randrange(count)
+            order = [(start + offset) % count for offset in range(count)]
+        else:
+            order = list(range(count))
+
+        table = self.model._meta.db_table
+        taken = 0
+        filled = False
+        with connections[self.db].cursor() as cursor:
+            for shard in order:
+                cursor.execute(
+                    f"""
+                    WITH picked AS (
+                        SELECT id, LEAST(capacity - redeemed, %s) AS taken
+                        FROM {table}
+                        WHERE coupon_id = %s AND shard = %s AND redeemed < capacity
+                        FOR UPDATE
+                    )
+                    UPDATE {table} SET redeemed = {table}.redeemed + picked.taken
+                    FROM picked
+                    WHERE {table}.id = picked.id
+                    RETURNING picked.taken, {table}.capacity - {table}.redeemed
+                    """,
+                    [quantity - taken, coupon.pk, shard],
+                )
+                row = cursor.fetchone()
+                if row is None:
+                    filled = True
+                    continue
+                taken += row[0]
+                filled = filled or row[1] == 0
+                if taken == quantity:
+                    break
+        return taken, filled
+
+    def release(self, coupon_id: int) -> None:
+        """
+        Devolve uma unidade ao estoque do cupom (ex.: resgate removido).
+        """
+        table = self.model._meta.db_table
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table} SET redeemed = redeemed - 1
+                WHERE id = (
+                    SELECT id FROM {table}
+                    WHERE coupon_id = %s AND redeemed > 0
+                    ORDER BY shard DESC
+                    LIMIT 1
+                    FOR UPDATE
+                )
+                """,
+                [coupon_id],
+            )
+
+    def remaining(self, coupon_id: int) -> int:
+        """
+        Unidades restantes no estoque do cupom, somando as fatias.
+        """
+        remaining = self.filter(coupon_id=coupon_id).aggregate(
+            total=Sum(F("capacity") - F("redeemed"))
+        )["total"]
+        return remaining or 0
+
+
+class CouponStockShard(models.Model):
+    """
+    Fatia do estoque total de um cupom (`Coupon.max_total_redemptions`).
+
+    O estoque é dividido em até `Coupon.stock_shards` linhas, cada uma com parte da
+    capacidade; cada resgate consome uma unidade de uma fatia sorteada, de modo que
+    resgates simultâneos de usuários diferentes disputam linhas diferentes em vez de
+    enfileirar no lock de um único contador. O estoque restante é a soma das fatias.
+    Resgates gravados fora de `coupons.services` não consomem estoque; depois deles, rode
+    `manage.py reconcile_redemption_counters`.
+    """
+
+    id = models.BigAutoField(primary_key=True, editable=False, verbose_name="ID")
+    # Sem índice próprio: `coupon` é prefixo da restrição única.
+    coupon = models.ForeignKey(
+        Coupon,
+        on_delete=models.CASCADE,
+        related_name="stock_counters",
+        verbose_name="Cupom",
+        db_index=False,
+    )
+    shard = models.PositiveSmallIntegerField(verbose_name="Fatia")
+    capacity = models.PositiveIntegerField(verbose_name="Capacidade")
+    redeemed = models.PositiveIntegerField(default=0, verbose_name="Resgates")
+
+    objects = CouponStockShardQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Fatia de estoque"
+        verbose_name_plural = "Fatias de estoque"
+        constraints = [
+            models.UniqueConstraint(fields=["coupon", "shard"], name="unique_coupon_stock_shard"),
+            models.CheckConstraint(
+                condition=Q(redeemed__lte=F("capacity")), name="coupon_stock_shard_capacity"
+            ),
+        ]
+
+
+class RedemptionRequestStatus(models.TextChoices):
+    PENDING = "PENDING", "Na fila"
+    REDEEMED = "REDEEMED", "Resgatado"
+    REJECTED = "REJECTED", "Recusado"
+
+
+class RedemptionRequestQuerySet(models.QuerySet):
+    def claim(self, batch_size: int) -> list["RedemptionRequest"]:
+        """
+        Bloqueia os próximos pedidos pendentes, em ordem de chegada, pulando os que outro
+        worker já bloqueou (`SKIP LOCKED`). Deve ser chamado dentro de `transaction.atomic()`.
+        O usuário vem junto (sem bloqueio), para os resgates gravados a partir do lote.
+        """
+        return list(
+            self.select_related("user")
+            .select_for_update(skip_locked=True, of=("self",))
+            .filter(status=RedemptionRequestStatus.PENDING)
+            .order_by("id")[:batch_size]
+        )
+
+    def mark_processed(self, requests: list["RedemptionRequest"]) -> None:
+        """
+        Grava situação, resgate, motivo e horário de processamento dos pedidos em um único
+        UPDATE.
+        """
+        if not requests:
+            return None
+        table = self.model._meta.db_table
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table}
+                SET status = v.status, redemption_id = v.redemption_id, error = v.error,
+                    processed_at = v.processed_at
+                FROM unnest(
+                    %s::bigint[], %s::varchar[], %s::bigint[], %s::text[], %s::timestamptz[]
+                ) AS v(id, status, redemption_id, error, processed_at)
+                WHERE {table}.id = v.id
+                """,
+                [
+                    [request.pk for request in requests],
+                    [request.status for request in requests],
+                    # O resgate pode ter sido gravado depois de atribuído ao pedido.
+                    [getattr(request.redemption, "pk", None) for request in requests],
+                    [request.error for request in requests],
+                    [request.processed_at for request in requests],
+                ],
+            )
+
+
+class RedemptionRequest(models.Model):
+    """
+    Pedido de resgate aceito pela API e ainda não gravado (modo assíncrono, ver
+    `coupons.services.enqueue_redemption`). O `id` é o ticket devolvido ao cliente.
+    """
+
+    id = models.BigAutoField(primary_key=True, editable=False, verbose_name="ID")
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="redemption_requests",
+        verbose_name="Usuário",
+    )
+    coupon = models.ForeignKey(
+        Coupon,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name="Cupom",
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=RedemptionRequestStatus.choices,
+        default=RedemptionRequestStatus.PENDING,
+        verbose_name="Situação",
+    )
+    redemption = models.ForeignKey(
+        Redemption,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name="Resgate",
+    )
+    error = models.TextField(blank=True, default="", verbose_name="Motivo da recusa")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    processed_at = models.DateTimeField(null=True, verbose_name="Processado em")
+
+    objects = RedemptionRequestQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Pedido de resgate"
+        verbose_name_plural = "Pedidos de resgate"
+        indexes = [
+            # Só os pendentes: o índice fica pequeno mesmo com o histórico crescendo.
+            models.Index(
+                fields=["id"],
+                condition=Q(status="PENDING"),
+                name="redemption_request_pending_idx",
+            ),
+        ]
+
+
+def recent_redemptions_feed() -> Any:
+    """
+    Feed de resgates recentes (`coupons.feeds`), importado sob demanda porque depende dos
+    serializers, que dependem deste módulo.
+    """
+    from .feeds import recent_redemptions_feed as feed
+
+    return feed
@@ -1,8 +1,14 @@
+from typing import Any
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from authentication.serializers import UserSerializer
+from shared.api.serializers import PeriodInputSerializer
 
-from .models import Coupon, Redemption
+from .models import Coupon, Redemption, RedemptionRequest
+from .services import CouponRef, redeem_coupon
 
 # ---------------------
 # COUPON SERIALIZER
@@ -12,10 +18,65 @@ from .models import Coupon, Redemption
 class CouponSerializer(serializers.ModelSerializer):
     class Meta:
         model = Coupon
-        fields = ["id", "code", "description", "max_redemptions", "available", "created_at"]
+        fields = [
+            "id",
+            "code",
+            "description",
+            "max_redemptions",
+            "max_total_redemptions",
+            "stock_shards",
+            "available",
+            "created_at",
+        ]
         read_only_fields = ["id", "created_at"]
 
 
+class CouponStockSerializer(serializers.ModelSerializer):
+    """
+    Estoque total de um cupom.
+    Espera um cupom anotado por `Coupon.objects.with_stock()`.
+    """
+
+    redeemed = serializers.IntegerField(
+        source="stock_redeemed", read_only=True, help_text="Unidades já resgatadas"
+    )
+    remaining = serializers.IntegerField(
+        source="stock_remaining",
+        read_only=True,
+        allow_null=True,
+        help_text="Unidades restantes (nulo para cupons sem estoque total)",
+    )
+
+    class Meta:
+        model = Coupon
+        fields = ["id", "max_total_redemptions", "redeemed", "remaining", "available"]
+        read_only_fields = fields
+
+
+class CouponBalanceSerializer(serializers.Serializer):
+    """
+    Saldo de um cupom para o usuário autenticado.
+    Espera um cupom anotado por `Coupon.objects.with_balance(user)`.
+    """
+
+    coupon = CouponSerializer(source="*", read_only=True)
+    remaining = serializers.IntegerField(read_only=True, help_text="Resgates restantes")
+
+
+class CouponImportErrorSerializer(serializers.Serializer):
+    line = serializers.IntegerField(help_text="Linha do arquivo")
+    code = serializers.CharField(allow_null=True, help_text="Código do cupom, se informado")
+    message = serializers.CharField(help_text="Motivo da recusa")
+
+
+class CouponImportReportSerializer(serializers.Serializer):
+    created = serializers.IntegerField(help_text="Cupons criados")
+    rejected = serializers.IntegerField(help_text="Linhas recusadas")
+    errors = CouponImportErrorSerializer(
+        many=True, help_text="Primeiras linhas recusadas, com o motivo"
+    )
+
+
 # ---------------------
 # REDEMPTION SERIALIZER
 # ---------------------
@@ -35,14 +96,95 @@ class CreateRedemptionSerializer(serializers.ModelSerializer):
         model = Redemption
         fields = ["coupon"]
 
-    def validate(self, data: dict) -> dict:
+    def create(self, validated_data: dict) -> Redemption:
+        """
+        A validação de disponibilidade e cota é feita uma única vez por `redeem_coupon`,
+        na mesma transação da gravação.
+        """
         user = self.context["request"].user
-        coupon = data["coupon"]
-        redemption = Redemption(user=user, coupon=coupon)
-        redemption.clean()  # Chama a lógica do model
+        try:
+            return redeem_coupon(user=user, coupon=validated_data["coupon"])
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(detail=serializers.as_serializer_error(exc))
+
+
+@extend_schema_field({"oneOf": [{"type": "integer"}, {"type": "string"}]})
+class CouponRefField(serializers.Field):
+    """
+    Referência a um cupom: `id` (número) ou `code` (texto).
+    """
+
+    default_error_messages = {"invalid": "Informe o id (número) ou o código (texto) do cupom."}
+
+    def to_internal_value(self, data: Any) -> CouponRef:
+        if isinstance(data, bool) or not isinstance(data, int | str):
+            self.fail("invalid")
+        if isinstance(data, str):
+            data = data.strip()
+            if not data:
+                self.fail("invalid")
         return data
 
-    def create(self, validated_data: dict) -> Redemption:
-        user = self.context["request"].user
-        validated_data["user"] = user
-        return Redemption.objects.create(**validated_data)
+    def to_representation(self, value: CouponRef) -> CouponRef:
+        return value
+
+
+class BulkRedemptionSerializer(serializers.Serializer):
+    max_items = 100
+
+    coupons = serializers.ListField(
+        child=CouponRefField(),
+        min_length=1,
+        max_length=max_items,
+        help_text="Cupons a resgatar, por id (número) ou código (texto).",
+    )
+
+
+class BulkRedemptionResultSerializer(serializers.Serializer):
+    coupon = CouponRefField(source="ref", help_text="Referência recebida no lote")
+    created = serializers.SerializerMethodField(help_text="Se o resgate foi criado")
+    redemption = RedemptionSerializer(allow_null=True, help_text="Resgate criado")
+    detail = serializers.CharField(
+        source="error", allow_null=True, help_text="Motivo da recusa do item"
+    )
+
+    def get_created(self, result: Any) -> bool:
+        return result.redemption is not None
+
+
+class RedemptionRequestSerializer(serializers.ModelSerializer):
+    """
+    Situação de um pedido de resgate assíncrono (ticket).
+    """
+
+    redemption = RedemptionSerializer(
+        read_only=True, allow_null=True, help_text="Resgate criado, se aceito"
+    )
+    detail = serializers.CharField(source="error", read_only=True, help_text="Motivo da recusa")
+
+    class Meta:
+        model = RedemptionRequest
+        fields = ["id", "coupon", "status", "redemption", "detail", "created_at", "processed_at"]
+
+
+class RedemptionExportSerializer(PeriodInputSerializer):
+    """
+    Parâmetros da exportação de resgates; o período é opcional e pode ser aberto.
+    """
+
+    init_datetime = serializers.DateTimeField(
+        required=False, help_text="Resgates a partir desta data e hora"
+    )
+    end_datetime = serializers.DateTimeField(
+        required=False, help_text="Resgates até esta data e hora"
+    )
+    # `format` é reservado pelo DRF para a negociação de conteúdo.
+    output = serializers.ChoiceField(
+        choices=["csv", "ndjson"], default="csv", help_text="Formato do arquivo"
+    )
+    gzip = serializers.BooleanField(default=False, help_text="Comprimir o arquivo com gzip")
+
+    def validate(self, data: dict) -> dict:
+        if "init_datetime" in data and "end_datetime" in data:
+            return super().validate(data)
+        return data
@@ -0,0 +1,284 @@
+"""
+Regras de negócio de resgate de cupons.
+
+Toda escrita de resgate feita pela API deve passar por aqui, para que a verificação
+da cota do usuário e a gravação aconteçam na mesma transação e sob o mesmo lock.
+"""
+
+import logging
+from collections import Counter
+from dataclasses import dataclass
+
+from django.core.exceptions import ValidationError
+from django.db import DataError, IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from authentication.models import User
+from shared.models import data_versions
+
+from .models import (
+    Coupon,
+    Redemption,
+    RedemptionCounter,
+    RedemptionRequest,
+    RedemptionRequestQuerySet,
+    RedemptionRequestStatus,
+    recent_redemptions_feed,
+)
+
+# Referência a um cupom em um lote: `id` (int) ou `code` (str).
+CouponRef = int | str
+
+SOLD_OUT = "O estoque deste cupom esgotou."
+
+
+@dataclass
+class BulkRedemptionResult:
+    ref: CouponRef
+    redemption: Redemption | None = None
+    error: str | None = None
+
+
+def redeem_coupon(user: User, coupon: Coupon) -> Redemption:
+    """
+    Resgata um cupom para o usuário, garantindo a cota dentro da transação.
+
+    Requisições concorrentes para o mesmo par (usuário, cupom) são serializadas pelo lock
+    de linha do `RedemptionCounter`, e a cota é verificada uma única vez com a contagem
+    lida junto com o lock, que sempre enxerga os resgates já confirmados pelas demais.
+    Cupons com estoque total consomem uma unidade de uma fatia do estoque depois da cota.
+
+    Args:
+        user: Usuário que está resgatando o cupom.
+        coupon: Cupom a ser resgatado.
+
+    Returns:
+        O resgate criado.
+
+    Raises:
+        ValidationError: Se o cupom estiver indisponível, esgotado ou a cota do usuário foi
+            atingida.
+    """
+    with transaction.atomic():
+        counter = RedemptionCounter.objects.lock(user_id=user.pk, coupon_id=coupon.pk)
+        redemption = Redemption(user=user, coupon=coupon)
+        redemption.validate_quota(redeemed=counter.redeemed)
+        if coupon.take_stock():
+            redemption.save(clean=False)
+            return redemption
+    # Fora da transação: o cupom marcado como indisponível por `take_stock` é confirmado.
+    raise ValidationError(SOLD_OUT)
+
+
+def redeem_coupons(user: User, refs: list[CouponRef]) -> list[BulkRedemptionResult]:
+    """
+    Resgata vários cupons para o usuário em uma única transação, com número fixo de
+    consultas: uma para os cupons, duas para garantir e bloquear os contadores (que trazem
+    as contagens de todos os cupons do lote), uma para os resgates e uma para os contadores.
+
+    Cupons com estoque total somam uma consulta cada, para consumir o estoque.
+
+    Cada item é validado como em `redeem_coupon`; itens recusados não impedem os demais.
+    Um cupom repetido no lote é recusado a partir da segunda ocorrência, pois resgates
+    gravados juntos poderiam colidir em `(user, coupon, redeemed_at)`.
+
+    Args:
+        user: Usuário que está resgatando os cupons.
+        refs: Cupons a resgatar, por `id` (int) ou `code` (str).
+
+    Returns:
+        Um resultado por item, na ordem recebida.
+    """
+    ids = [ref for ref in refs if isinstance(ref, int)]
+    codes = [ref for ref in refs if isinstance(ref, str)]
+    coupons = list(Coupon.objects.defer("search_vector").filter(Q(pk__in=ids) | Q(code__in=codes)))
+    by_ref: dict[CouponRef, Coupon] = {c.pk: c for c in coupons} | {c.code: c for c in coupons}
+
+    results = [BulkRedemptionResult(ref=ref) for ref in refs]
+    with transaction.atomic():
+        counters = RedemptionCounter.objects.lock_many(
+            user_id=user.pk, coupon_ids=[coupon.pk for coupon in coupons]
+        )
+        seen: set[int] = set()
+        for result in results:
+            coupon = by_ref.get(result.ref)
+            if coupon is None:
+                result.error = "Cupom não encontrado."
+                continue
+            if coupon.pk in seen:
+                result.error = "Cupom repetido no lote."
+                continue
+            seen.add(coupon.pk)
+
+            redemption = Redemption(user=user, coupon=coupon)
+            try:
+                redemption.validate_quota(redeemed=counters[coupon.pk].redeemed)
+            except ValidationError as exc:
+                result.error = " ".join(exc.messages)
+                continue
+            result.redemption = redemption
+
+        # Em ordem de cupom, como os contadores, para não entrar em deadlock com outros lotes.
+        accepted = [result for result in results if result.redemption is not None]
+        for result in sorted(accepted, key=lambda result: result.redemption.coupon_id):
+            if not result.redemption.coupon.take_stock():
+                result.redemption = None
+                result.error = SOLD_OUT
+
+        redemptions = [result.redemption for result in results if result.redemption is not None]
+        if redemptions:
+            Redemption.objects.bulk_create(redemptions)
+            now = timezone.now()
+            touched = [counters[redemption.coupon_id] for redemption in redemptions]
+            for counter in touched:
+                counter.redeemed += 1
+                counter.updated_at = now
+            RedemptionCounter.objects.bulk_update(touched, ["redeemed", "updated_at"])
+            transaction.on_commit(lambda: recent_redemptions_feed().push_many(redemptions))
+            data_versions.bump(Redemption, RedemptionCounter, scopes={"user_id": [user.pk]})
+    return results
+
+
+def enqueue_redemption(user: User, coupon: Coupon) -> RedemptionRequest:
+    """
+    Aceita um pedido de resgate para gravação assíncrona: apenas a disponibilidade do cupom
+    é verificada agora; a cota é verificada pelo worker (`process_redemption_queue`).
+
+    Raises:
+        ValidationError: Se o cupom estiver indisponível.
+    """
+    if not coupon.available:
+        raise ValidationError("Este cupom não está disponível para resgate.")
+    return RedemptionRequest.objects.create(user=user, coupon=coupon)
+
+
+@dataclass
+class QueueBatchResult:
+    redeemed: int = 0
+    rejected: int = 0
+
+    @property
+    def processed(self) -> int:
+        return self.redeemed + self.rejected
+
+
+def process_redemption_queue(batch_size: int = 500) -> QueueBatchResult:
+    """
+    Processa um lote de pedidos pendentes em uma única transação, com número fixo de
+    consultas: os pedidos são reservados com `SKIP LOCKED` (workers concorrentes pegam lotes
+    diferentes) e os contadores de todos os pares (usuário, cupom) do lote são bloqueados de
+    uma vez. Cada par é resgatado no máximo uma vez por lote: os resgates de um lote têm o
+    mesmo horário e colidiriam em `(user, coupon, redeemed_at)`, então os pedidos repetidos
+    do par ficam pendentes para o próximo lote.
+    O estoque total é consumido de uma vez por cupom; os pedidos aceitos que não couberem
+    no estoque, os últimos a chegar, são recusados. Resgates, contadores e pedidos são
+    gravados em massa.
+
+    Se a gravação do lote falhar por um erro determinístico (`IntegrityError` ou
+    `DataError`), o lote é refeito pedido a pedido, cada um na sua transação, e só os
+    pedidos que voltarem a falhar são recusados. Erros transitórios (`OperationalError`,
+    ex.: deadlock ou timeout) são relançados e os pedidos continuam pendentes.
+
+    Returns:
+        Quantos pedidos foram resgatados e recusados (zero quando a fila está vazia).
+    """
+    claimed: list[int] = []
+    try:
+        return _process_redemption_batch(RedemptionRequest.objects.all(), batch_size, claimed)
+    except (IntegrityError, DataError):
+        if not claimed:
+            raise
+        logging.exception(f"Falha ao gravar o lote de resgates {claimed[0]}..{claimed[-1]}")
+
+    result = QueueBatchResult()
+    for request_id in claimed:
+        requests = RedemptionRequest.objects.filter(pk=request_id)
+        try:
+            single = _process_redemption_batch(requests, 1, [])
+        except (IntegrityError, DataError):
+            logging.exception(f"Pedido de resgate {request_id} recusado por falha na gravação")
+            single = QueueBatchResult(
+                rejected=requests.filter(status=RedemptionRequestStatus.PENDING).update(
+                    status=RedemptionRequestStatus.REJECTED,
+                    error="Não foi possível processar o pedido.",
+                    processed_at=timezone.now(),
+                )
+            )
+        result.redeemed += single.redeemed
+        result.rejected += single.rejected
+    return result
+
+
+def _process_redemption_batch(
+    requests: RedemptionRequestQuerySet, batch_size: int, claimed: list[int]
+) -> QueueBatchResult:
+    result = QueueBatchResult()
+    with transaction.atomic():
+        requests = requests.claim(batch_size)
+        if not requests:
+            return result
+        claimed.extend(request.pk for request in requests)
+
+        coupon_ids = {request.coupon_id for request in requests if request.coupon_id is not None}
+        coupons = Coupon.objects.defer("search_vector").in_bulk(coupon_ids)
+        counters = RedemptionCounter.objects.lock_pairs(
+            {(request.user_id, request.coupon_id) for request in requests if request.coupon_id}
+        )
+
+        now = timezone.now()
+        accepted_pairs: set[tuple[int, int]] = set()
+        processed: list[RedemptionRequest] = []
+        for request in requests:
+            pair = (request.user_id, request.coupon_id)
+            if pair in accepted_pairs:
+                continue
+            processed.append(request)
+            request.processed_at = now
+            request.status = RedemptionRequestStatus.REJECTED
+            coupon = coupons.get(request.coupon_id)
+            if coupon is None:
+                request.error = "Cupom não encontrado."
+                continue
+
+            redemption = Redemption(user=request.user, coupon=coupon)
+            try:
+                redemption.validate_quota(redeemed=counters[pair].redeemed)
+            except ValidationError as exc:
+                request.error = " ".join(exc.messages)
+                continue
+
+            accepted_pairs.add(pair)
+            request.status = RedemptionRequestStatus.REDEEMED
+            request.redemption = redemption
+
+        accepted: dict[int, list[RedemptionRequest]] = {}
+        for request in processed:
+            if request.redemption is not None:
+                accepted.setdefault(request.coupon_id, []).append(request)
+        for coupon_id in sorted(accepted):
+            taken = coupons[coupon_id].take_stock(len(accepted[coupon_id]))
+            for request in accepted[coupon_id][taken:]:
+                request.status = RedemptionRequestStatus.REJECTED
+                request.redemption = None
+                request.error = SOLD_OUT
+        redemptions = [
+            request.redemption for request in processed if request.redemption is not None
+        ]
+
+        if redemptions:
+            Redemption.objects.bulk_create(redemptions)
+            RedemptionCounter.objects.add_redeemed(
+                Counter(counters[(r.user_id, r.coupon_id)].pk for r in redemptions)
+            )
+            transaction.on_commit(lambda: recent_redemptions_feed().push_many(redemptions))
+            data_versions.bump(
+                Redemption,
+                RedemptionCounter,
+                scopes={"user_id": [redemption.user_id for redemption in redemptions]},
+            )
+        RedemptionRequest.objects.mark_processed(processed)
+
+    result.redeemed = len(redemptions)
+    result.rejected = len(processed) - len(redemptions)
+    return result
@@ -0,0 +1,50 @@
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from authentication.models import User
+from shared.models import data_versions
+
+from .catalog import coupon_catalog
+from .feeds import recent_redemptions_feed
+from .models import Coupon, Redemption, RedemptionCounter
+
+
+@receiver(post_save, sender=Coupon, dispatch_uid="coupons.feed.coupon_saved")
+@receiver(post_delete, sender=Coupon, dispatch_uid="coupons.feed.coupon_deleted")
+def refresh_feed_on_coupon_change(sender: type[Coupon], instance: Coupon, **kwargs: Any) -> None:
+    """
+    O feed de resgates recentes guarda os dados do cupom já serializados.
+    """
+    coupon_id = instance.pk
+    transaction.on_commit(lambda: recent_redemptions_feed.discard_related(coupon_id=coupon_id))
+
+
+@receiver(post_save, sender=Coupon, dispatch_uid="coupons.catalog.coupon_saved")
+@receiver(post_delete, sender=Coupon, dispatch_uid="coupons.catalog.coupon_deleted")
+def bump_catalog_version(sender: type[Coupon], instance: Coupon, **kwargs: Any) -> None:
+    """
+    Toda escrita em `Coupon` gera uma nova versão do catálogo em cache.
+    """
+    transaction.on_commit(coupon_catalog.bump)
+
+
+@receiver(post_save, sender=User, dispatch_uid="coupons.feed.user_saved")
+@receiver(post_delete, sender=User, dispatch_uid="coupons.feed.user_deleted")
+def refresh_feed_on_user_change(sender: type[User], instance: User, **kwargs: Any) -> None:
+    """
+    O feed de resgates recentes guarda os dados do usuário já serializados.
+    """
+    user_id = instance.pk
+    transaction.on_commit(lambda: recent_redemptions_feed.discard_related(user_id=user_id))
+
+
+@receiver(post_delete, sender=Coupon, dispatch_uid="coupons.versions.coupon_deleted")
+@receiver(post_delete, sender=User, dispatch_uid="coupons.versions.user_deleted")
+def bump_ledger_versions(sender: type[Coupon | User], **kwargs: Any) -> None:
+    """
+    Resgates e contadores removidos em cascata não disparam sinais nem `Redemption.delete`.
+    """
+    data_versions.bump(Redemption, RedemptionCounter)
@@ -1,7 +1,15 @@
+import base64
+import json
+from datetime import timedelta
+
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APIClient
 
+from coupons.models import Redemption, RedemptionCounter
 from coupons.tests.factories import CouponFactory, RedemptionFactory, UserFactory
 
 
@@ -16,7 +24,7 @@ def test_balance_endpoint_usage_limited_coupon():
 
     response = client.get(reverse("balance"))
     assert response.status_code == 200
-    for c in response.data:
+    for c in response.data.get("results"):
         if c["coupon"]["code"] == coupon.code:
             assert c["remaining"] == 2
 
@@ -32,11 +40,126 @@ def test_balance_endpoint_usage_unique_coupon():
 
     response = client.get(reverse("balance"))
     assert response.status_code == 200
-    for c in response.data:
+    for c in response.data.get("results"):
         if c["coupon"]["code"] == coupon.code:
             assert c["remaining"] == 0
 
 
+@pytest.mark.django_db
+def test_balance_endpoint_query_count_does_not_grow_with_coupons(
+    django_capture_on_commit_callbacks,
+):
+    user = UserFactory()
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    def balance_queries():
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse("balance"))
+        assert response.status_code == 200
+        return len(ctx.captured_queries), response.data["count"]
+
+    for code in ("SALDO01", "SALDO02"):
+        coupon = CouponFactory(code=code, description=f"Cupom {code}", available=True)
+        RedemptionFactory(user=user, coupon=coupon)
+    few_queries, few_count = balance_queries()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        for index in range(10):
+            code = f"SALDO1{index}"
+            coupon = CouponFactory(code=code, description=f"Cupom {code}", available=True)
+            RedemptionFactory(user=user, coupon=coupon)
+    many_queries, many_count = balance_queries()
+
+    assert many_count == few_count + 10
+    assert many_queries == few_queries
+
+
+@pytest.mark.django_db
+def test_balance_endpoint_search():
+    user = UserFactory()
+    CouponFactory(code="PIZZAFREE", description="Pizza grátis", available=True)
+    CouponFactory(code="CAFEFREE", description="Café grátis", available=True)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    response = client.get(reverse("balance"), {"search": "pizza"})
+    assert response.status_code == 200
+    assert [c["coupon"]["code"] for c in response.data["results"]] == ["PIZZAFREE"]
+    assert response.data["results"][0]["remaining"] >= 1
+
+
+@pytest.mark.django_db
+def test_coupon_list_search_partial_code_and_description_word_prefix():
+    user = UserFactory()
+    CouponFactory(code="XPTO2025VIP", description="Desconto em restaurantes parceiros")
+    CouponFactory(code="CAFE10", description="Café da manhã com desconto")
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    def search(term: str) -> list[str]:
+        response = client.get(reverse("coupon-list-create"), {"search": term})
+        assert response.status_code == 200
+        return sorted(c["code"] for c in response.data["results"])
+
+    assert search("o2025v") == ["XPTO2025VIP"]
+    assert search("restaur") == ["XPTO2025VIP"]
+    assert search("desconto") == ["CAFE10", "XPTO2025VIP"]
+    assert search("café manh") == ["CAFE10"]
+    assert search("café restaur") == []
+
+
+@pytest.mark.django_db
+def test_redemption_list_search_follows_coupon_description():
+    user = UserFactory()
+    pizza = CouponFactory(
+        code="PIZZA10", description="Pizza grande grátis", max_redemptions=2, available=True
+    )
+    cafe = CouponFactory(
+        code="CAFE10", description="Café expresso grátis", max_redemptions=2, available=True
+    )
+    RedemptionFactory(user=user, coupon=pizza)
+    RedemptionFactory(user=user, coupon=cafe)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    response = client.get(reverse("redemption-list-create"), {"search": "expres"})
+    assert response.status_code == 200
+    assert [r["coupon"]["code"] for r in response.data["results"]] == ["CAFE10"]
+
+
+@pytest.mark.django_db
+def test_redemption_list_field_filters():
+    user = UserFactory()
+    pizza = CouponFactory(code="PIZZA10", description="Pizza", max_redemptions=2, available=True)
+    cafe = CouponFactory(code="CAFE10", description="Café", max_redemptions=2, available=True)
+    old = RedemptionFactory(user=user, coupon=pizza)
+    Redemption.objects.filter(pk=old.pk).update(redeemed_at=timezone.now() - timedelta(days=3))
+    RedemptionFactory(user=user, coupon=pizza)
+    RedemptionFactory(user=user, coupon=cafe)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    def coupons(query: dict) -> list[str]:
+        response = client.get(reverse("redemption-list-create"), query)
+        assert response.status_code == 200
+        return sorted(r["coupon"]["code"] for r in response.data["results"])
+
+    since = timezone.localtime(timezone.now() - timedelta(days=1))
+    assert coupons({"coupon": pizza.id}) == ["PIZZA10", "PIZZA10"]
+    assert coupons({"coupon__in": f"{pizza.id},{cafe.id}"}) == ["CAFE10", "PIZZA10", "PIZZA10"]
+    assert coupons(
+        {"coupon": pizza.id, "redeemed_at__gte": since.strftime("%Y-%m-%dT%H:%M:%S-03:00")}
+    ) == ["PIZZA10"]
+
+    response = client.get(reverse("redemption-list-create"), {"coupon__gte": 1, "coupon": "x"})
+    assert response.status_code == 400
+
+
 @pytest.mark.django_db
 def test_coupon_list_authenticated():
     user = UserFactory()
@@ -141,3 +264,560 @@ def test_redemption_detail_retrieve_and_delete():
 
     response = client.delete(url)
     assert response.status_code == 204
+
+
+@pytest.mark.django_db
+def test_redemption_list_cursor_pagination_walks_all_pages():
+    user = UserFactory()
+    redemptions = RedemptionFactory.create_batch(5, user=user)
+    # Empate no primeiro campo da ordenação: o desempate é feito pelo id.
+    Redemption.objects.filter(pk__in=[r.pk for r in redemptions[:3]]).update(
+        redeemed_at=redemptions[0].redeemed_at
+    )
+    expected = list(
+        Redemption.objects.filter(user=user)
+        .order_by("-redeemed_at", "-id")
+        .values_list("id", flat=True)
+    )
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("redemption-list-create")
+
+    seen, cursors, cursor = [], [], ""
+    while cursor is not None:
+        response = client.get(url, {"cursor": cursor, "page_size": 2})
+        assert response.status_code == 200
+        assert response.data["count"] is None
+        seen.extend(item["id"] for item in response.data["results"])
+        cursors.append(response.data["previous_cursor"])
+        cursor = response.data["next_cursor"]
+
+    assert seen == expected
+    assert cursors[0] is None
+
+    response = client.get(url, {"cursor": cursors[-1], "page_size": 2})
+    assert [item["id"] for item in response.data["results"]] == expected[2:4]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "invalido",
+        base64.urlsafe_b64encode(b"[1]").decode(),
+        base64.urlsafe_b64encode(b'{"v": []}').decode(),
+        base64.urlsafe_b64encode(b'{"v": ["ontem", "x"], "r": false}').decode(),
+    ],
+)
+def test_redemption_list_invalid_cursor(cursor):
+    user = UserFactory()
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    response = client.get(reverse("redemption-list-create"), {"cursor": cursor})
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_redemption_list_page_size_zero_streams_all_rows():
+    user = UserFactory()
+    redemptions = RedemptionFactory.create_batch(3, user=user)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    response = client.get(reverse("redemption-list-create"), {"page_size": 0})
+    assert response.status_code == 200
+    assert response.streaming
+    data = json.loads(b"".join(response.streaming_content))
+    assert sorted(item["id"] for item in data) == sorted(r.id for r in redemptions)
+    assert data[0]["coupon"]["code"]
+    assert data[0]["user"]["email"] == user.email
+
+
+@pytest.mark.django_db
+def test_recent_redemptions_feed_served_from_cache(django_capture_on_commit_callbacks):
+    user = UserFactory()
+    coupon = CouponFactory(max_redemptions=5, available=True)
+    RedemptionFactory.create_batch(2, user=user, coupon=coupon)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    # Partida a frio: reconstrói o feed com uma única consulta (cupom e usuário no JOIN).
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse("recent_redemptions"))
+    assert response.status_code == 200
+    assert len(response.data) == 2
+    assert len(ctx.captured_queries) == 1
+
+    with CaptureQueriesContext(connection) as ctx:
+        cached = client.get(reverse("recent_redemptions"))
+    assert len(ctx.captured_queries) == 0
+    assert cached.data == response.data
+    assert cached["ETag"] == response["ETag"]
+
+    with CaptureQueriesContext(connection) as ctx:
+        not_modified = client.get(
+            reverse("recent_redemptions"), HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+    assert not_modified.status_code == 304
+    assert len(ctx.captured_queries) == 0
+
+    # Um novo resgate entra no topo do feed sem invalidar o cache.
+    with django_capture_on_commit_callbacks(execute=True):
+        created = client.post(
+            reverse("redemption-list-create"), {"coupon": coupon.id}, format="json"
+        )
+    assert created.status_code == 201
+    with CaptureQueriesContext(connection) as ctx:
+        updated = client.get(reverse("recent_redemptions"), HTTP_IF_NONE_MATCH=response["ETag"])
+    assert updated.status_code == 200
+    assert len(ctx.captured_queries) == 0
+    assert len(updated.data) == 3
+    assert updated.data[0]["id"] == Redemption.objects.latest("redeemed_at", "id").id
+    assert updated["ETag"] != response["ETag"]
+
+
+@pytest.mark.django_db
+def test_recent_redemptions_feed_follows_deletes_and_coupon_updates(
+    django_capture_on_commit_callbacks,
+):
+    user = UserFactory()
+    coupon = CouponFactory(max_redemptions=5, available=True)
+    first, second = RedemptionFactory.create_batch(2, user=user, coupon=coupon)
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    client.get(reverse("recent_redemptions"))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    response = client.get(reverse("recent_redemptions"))
+    assert [r["id"] for r in response.data] == [second.id]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        coupon.description = "Descrição atualizada"
+        coupon.save()
+    response = client.get(reverse("recent_redemptions"))
+    assert response.data[0]["coupon"]["description"] == "Descrição atualizada"
+
+
+@pytest.mark.django_db
+def test_redemption_list_query_count_does_not_grow_with_rows(
+    caplog, django_capture_on_commit_callbacks
+):
+    user = UserFactory()
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    def list_queries():
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse("redemption-list-create"))
+        assert response.status_code == 200
+        return len(ctx.captured_queries), len(response.data["results"])
+
+    RedemptionFactory(
+        user=user, coupon=CouponFactory(code="LISTA00", description="Cupom", available=True)
+    )
+    few_queries, few_rows = list_queries()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        for index in range(1, 10):
+            coupon = CouponFactory(code=f"LISTA0{index}", description="Cupom", available=True)
+            RedemptionFactory(user=user, coupon=coupon)
+    with caplog.at_level("WARNING"):
+        many_queries, many_rows = list_queries()
+
+    assert (few_rows, many_rows) == (1, 10)
+    assert many_queries == few_queries
+    assert "Carregamento preguiçoso" not in caplog.text
+
+
+@pytest.mark.django_db
+def test_cached_count_miss_is_not_logged_as_lazy_load(caplog):
+    user = UserFactory()
+    RedemptionFactory(user=user)
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    with caplog.at_level("WARNING"):
+        response = client.get(reverse("redemption-list-create"))
+
+    assert response.data["count"] == 1
+    assert "Carregamento preguiçoso" not in caplog.text
+
+
+@pytest.mark.django_db
+def test_lazy_load_during_serialization_is_logged_in_debug(caplog, monkeypatch):
+    user = UserFactory()
+    RedemptionFactory(user=user)
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    from coupons.views import RedemptionListCreateView
+
+    # Sem o plano de carregamento, cupom e usuário são carregados um a um.
+    monkeypatch.setattr(
+        RedemptionListCreateView,
+        "filter_queryset",
+        lambda self, queryset: queryset,
+    )
+    with caplog.at_level("WARNING"):
+        response = client.get(reverse("redemption-list-create"))
+
+    assert response.status_code == 200
+    assert "Carregamento preguiçoso durante a serialização em RedemptionListCreateView" in (
+        caplog.text
+    )
+
+
+@pytest.mark.django_db
+def test_coupon_catalog_reads_are_served_from_cache():
+    user = UserFactory()
+    coupons = [
+        CouponFactory(code=f"CATALOGO{index}", description=f"Cupom de catálogo {index}")
+        for index in range(3)
+    ]
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    first = client.get(reverse("coupon-list-create"))
+    assert first.status_code == 200
+    with CaptureQueriesContext(connection) as ctx:
+        cached = client.get(reverse("coupon-list-create"))
+        detail = client.get(reverse("coupon-detail", kwargs={"pk": coupons[1].id}))
+    assert len(ctx.captured_queries) == 0
+    assert cached.data == first.data
+    assert detail.status_code == 200
+    assert detail.data["code"] == "CATALOGO1"
+
+
+@pytest.mark.django_db
+def test_coupon_catalog_matches_database_results(monkeypatch):
+    from coupons.catalog import coupon_catalog
+
+    user = UserFactory()
+    CouponFactory(code="XPTO2025VIP", description="Desconto em restaurantes", max_redemptions=3)
+    CouponFactory(code="CAFE10", description="Café da manhã com desconto", max_redemptions=None)
+    CouponFactory(code="PIZZA5", description="Pizza grande", max_redemptions=1)
+    CouponFactory(code="BURGER", description="Desconto no burger", max_redemptions=None)
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    params = [
+        {},
+        {"search": "desconto"},
+        {"search": "o2025v"},
+        {"search": "café manh"},
+        {"ordering": "code"},
+        {"ordering": "created_at"},
+        {"ordering": "-created_at,-id"},
+        {"ordering": "max_redemptions"},
+        {"search": "desconto", "ordering": "-code", "page_size": 1, "page": 2},
+        {"page_size": 0},
+        {"code": "CAFE10"},
+        {"code__in": "PIZZA5,BURGER,NAOEXISTE"},
+        {"code__prefix": "XPTO", "search": "restaurante"},
+    ]
+
+    def fetch(query: dict) -> list | dict:
+        response = client.get(reverse("coupon-list-create"), query)
+        assert response.status_code == 200
+        if response.streaming:
+            return json.loads(b"".join(response.streaming_content))
+        return json.loads(response.content)
+
+    cached = [fetch(p) for p in params]
+
+    # Sem cache: catálogo "grande demais", lido do banco.
+    monkeypatch.setattr(coupon_catalog, "max_size", 0)
+    monkeypatch.setattr(coupon_catalog, "version", lambda: "sem-cache")
+    from_database = [fetch(p) for p in params]
+
+    for p, cached_content, database_content in zip(params, cached, from_database):
+        assert cached_content == database_content, p
+
+
+@pytest.mark.django_db
+def test_coupon_catalog_falls_back_to_database_for_text_ordering():
+    CouponFactory(code="BETA", description="Beta", available=True)
+    CouponFactory(code="ALFA", description="Alfa", available=True)
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    client.get(reverse("coupon-list-create"))
+
+    # Texto segue a collation do banco: o catálogo em memória não responde.
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse("coupon-list-create"), {"ordering": "code"})
+    assert response.status_code == 200
+    assert [coupon["code"] for coupon in response.data["results"]] == ["ALFA", "BETA"]
+    assert any("ORDER BY" in query["sql"] for query in ctx.captured_queries)
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse("coupon-list-create"), {"ordering": "-created_at"})
+    assert [coupon["code"] for coupon in response.data["results"]] == ["ALFA", "BETA"]
+    assert not any("ORDER BY" in query["sql"] for query in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_coupon_catalog_version_changes_on_coupon_writes(django_capture_on_commit_callbacks):
+    admin = UserFactory(is_staff=True)
+    coupon = CouponFactory(code="VERSAO1", description="Primeira versão")
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    assert client.get(reverse("coupon-list-create")).data["count"] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.patch(
+            reverse("coupon-detail", kwargs={"pk": coupon.id}),
+            {"description": "Segunda versão"},
+            format="json",
+        )
+        CouponFactory(code="VERSAO2", description="Outro cupom")
+    response = client.get(reverse("coupon-list-create"), {"ordering": "code"})
+    assert [c["description"] for c in response.data["results"]] == [
+        "Segunda versão",
+        "Outro cupom",
+    ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        coupon.delete()
+    response = client.get(reverse("coupon-list-create"))
+    assert [c["code"] for c in response.data["results"]] == ["VERSAO2"]
+
+
+@pytest.mark.django_db
+def test_coupon_list_conditional_get_uses_catalog_version(django_capture_on_commit_callbacks):
+    admin = UserFactory(is_staff=True)
+    coupon = CouponFactory(code="ETAG01", description="Cupom com ETag")
+    client = APIClient()
+    client.force_authenticate(user=admin)
+
+    response = client.get(reverse("coupon-list-create"))
+    etag = response["ETag"]
+    with CaptureQueriesContext(connection) as ctx:
+        not_modified = client.get(reverse("coupon-list-create"), HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert len(ctx.captured_queries) == 0
+
+    # Outra query string é outra representação.
+    other = client.get(reverse("coupon-list-create"), {"page_size": 1}, HTTP_IF_NONE_MATCH=etag)
+    assert other.status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.patch(
+            reverse("coupon-detail", kwargs={"pk": coupon.id}),
+            {"description": "Alterado"},
+            format="json",
+        )
+    changed = client.get(reverse("coupon-list-create"), HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert changed["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_redemption_list_conditional_get_is_per_user():
+    user, other_user = UserFactory(), UserFactory()
+    coupon = CouponFactory(code="ETAG02", description="Cupom", max_redemptions=5, available=True)
+    RedemptionFactory(user=user, coupon=coupon)
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    response = client.get(reverse("redemption-list-create"))
+    etag = response["ETag"]
+    assert "Authorization" in response["Vary"]
+    assert "private" in response["Cache-Control"]
+
+    with CaptureQueriesContext(connection) as ctx:
+        not_modified = client.get(reverse("redemption-list-create"), HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304
+    assert len(ctx.captured_queries) == 1  # apenas o agregado MAX(updated_at)/COUNT(*)
+
+    client.force_authenticate(user=other_user)
+    assert client.get(reverse("redemption-list-create"), HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    client.force_authenticate(user=user)
+    RedemptionFactory(user=user, coupon=coupon)
+    changed = client.get(reverse("redemption-list-create"), HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert len(changed.data["results"]) == 2
+
+
+@pytest.mark.django_db
+def test_redemption_detail_honours_if_modified_since():
+    user = UserFactory()
+    redemption = RedemptionFactory(user=user)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("redemption-detail", kwargs={"pk": redemption.id})
+
+    response = client.get(url)
+    assert response.status_code == 200
+    not_modified = client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+    assert not_modified.status_code == 304
+
+
+@pytest.mark.django_db
+def test_balance_conditional_get_changes_with_user_redemptions():
+    user = UserFactory()
+    coupon = CouponFactory(code="ETAG03", description="Cupom", max_redemptions=5, available=True)
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    etag = client.get(reverse("balance"))["ETag"]
+    assert client.get(reverse("balance"), HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    RedemptionFactory(user=user, coupon=coupon)
+    changed = client.get(reverse("balance"), HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert changed.data["results"][0]["remaining"] == 4
+
+
+@pytest.mark.django_db
+def test_redemption_create_validates_in_a_single_pass():
+    user = UserFactory()
+    coupon = CouponFactory(code="UMAVEZ", description="Cupom", max_redemptions=2, available=True)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    counter_table = RedemptionCounter._meta.db_table
+
+    def create():
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.post(
+                reverse("redemption-list-create"), {"coupon": coupon.id}, format="json"
+            )
+        return response, [q["sql"] for q in ctx.captured_queries]
+
+    for _ in range(2):
+        response, queries = create()
+        assert response.status_code == 201
+        assert not [sql for sql in queries if "COUNT(" in sql.upper()]
+        counter_reads = [
+            sql for sql in queries if sql.startswith("SELECT") and counter_table in sql
+        ]
+        coupon_reads = [
+            sql for sql in queries if sql.startswith("SELECT") and "coupons_coupon" in sql
+        ]
+        assert len(counter_reads) == 1  # SELECT ... FOR UPDATE do contador
+        assert len(coupon_reads) == 1  # lookup do cupom pelo serializer
+        assert len(queries) <= 7
+
+    response, queries = create()
+    assert response.status_code == 400
+    assert response.data["message"]
+    assert not [sql for sql in queries if sql.startswith('INSERT INTO "coupons_redemption"')]
+
+
+@pytest.mark.django_db
+def test_redemption_bulk_create_returns_per_item_results(django_capture_on_commit_callbacks):
+    user = UserFactory()
+    single = CouponFactory(code="LOTE1", description="Cupom", max_redemptions=None, available=True)
+    multi = CouponFactory(code="LOTE2", description="Cupom", max_redemptions=2, available=True)
+    closed = CouponFactory(code="LOTE3", description="Cupom", available=False)
+    used = CouponFactory(code="LOTE4", description="Cupom", max_redemptions=None, available=True)
+    Redemption.objects.create(user=user, coupon=used)
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    refs = [single.id, "LOTE2", closed.id, used.code, "NAOEXISTE", multi.id]
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(reverse("redemption-bulk-create"), {"coupons": refs}, format="json")
+
+    assert response.status_code == 200
+    assert [item["coupon"] for item in response.data] == refs
+    assert [item["created"] for item in response.data] == [True, True, False, False, False, False]
+    assert response.data[0]["redemption"]["coupon"]["id"] == single.id
+    assert response.data[2]["detail"] == "Este cupom não está disponível para resgate."
+    assert response.data[3]["detail"] == "Este cupom só pode ser resgatado uma vez por usuário."
+    assert response.data[4]["detail"] == "Cupom não encontrado."
+    assert response.data[5]["detail"] == "Cupom repetido no lote."
+
+    assert Redemption.objects.filter(user=user).count() == 3
+    counters = dict(
+        RedemptionCounter.objects.filter(user=user).values_list("coupon_id", "redeemed")
+    )
+    assert counters[single.id] == 1 and counters[multi.id] == 1 and counters[used.id] == 1
+    assert counters.get(closed.id, 0) == 0
+
+    feed = client.get(reverse("recent_redemptions"))
+    created_ids = {item["redemption"]["id"] for item in response.data if item["created"]}
+    assert created_ids <= {item["id"] for item in feed.data}
+
+
+@pytest.mark.django_db
+def test_redemption_bulk_create_uses_constant_queries():
+    user = UserFactory()
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    def bulk(size: int) -> tuple[int, int]:
+        coupons = [
+            CouponFactory(code=f"CONST{size}-{i}", description="Cupom", available=True)
+            for i in range(size)
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.post(
+                reverse("redemption-bulk-create"),
+                {"coupons": [coupon.id for coupon in coupons]},
+                format="json",
+            )
+        assert response.status_code == 200
+        assert all(item["created"] for item in response.data)
+        return len(ctx.captured_queries)
+
+    assert bulk(2) == bulk(30)
+
+
+@pytest.mark.django_db
+def test_redemption_bulk_create_validates_payload():
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    url = reverse("redemption-bulk-create")
+
+    assert client.post(url, {"coupons": []}, format="json").status_code == 400
+    assert client.post(url, {"coupons": [1.5]}, format="json").status_code == 400
+    assert client.post(url, {"coupons": [True]}, format="json").status_code == 400
+    assert client.post(url, {"coupons": list(range(101))}, format="json").status_code == 400
+
+
+@pytest.mark.django_db
+def test_redemption_list_reports_whether_count_is_exact(monkeypatch):
+    from coupons.views import RedemptionListCreateView
+    from shared.api.counting import SkipCount
+
+    user = UserFactory()
+    for index in range(3):
+        coupon = CouponFactory(code=f"CONTA{index}", description="Cupom", available=True)
+        RedemptionFactory(user=user, coupon=coupon)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse("redemption-list-create")
+
+    exact = client.get(url, {"page_size": 2})
+    assert (exact.data["count"], exact.data["total_pages"], exact.data["count_exact"]) == (
+        3,
+        2,
+        True,
+    )
+
+    monkeypatch.setattr(RedemptionListCreateView, "count_strategy", SkipCount())
+    with CaptureQueriesContext(connection) as ctx:
+        first = client.get(url, {"page_size": 2})
+    # Só o agregado do ETag (`ConditionalGetMixin`) conta linhas; a paginação não.
+    counts = [q["sql"] for q in ctx.captured_queries if "COUNT(" in q["sql"].upper()]
+    assert len(counts) == 1 and "MAX(" in counts[0].upper()
+    assert (first.data["count"], first.data["total_pages"], first.data["count_exact"]) == (
+        None,
+        None,
+        False,
+    )
+    assert len(first.data["results"]) == 2
+    assert first.data["next_page"] == 2
+
+    last = client.get(url, {"page_size": 2, "page": 2})
+    assert len(last.data["results"]) == 1
+    assert last.data["next_page"] is None
+    assert client.get(url, {"page_size": 2, "page": 3}).status_code == 404
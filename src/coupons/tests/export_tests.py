@@ -0,0 +1,106 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from coupons.exports import export_redemptions
+from coupons.models import Redemption
+from coupons.tests.factories import CouponFactory, RedemptionFactory, UserFactory
+
+
+@pytest.fixture
+def redemptions() -> list[Redemption]:
+    coupon = CouponFactory(code="EXPORTA", description="Cupom", max_redemptions=10, available=True)
+    created = [RedemptionFactory(user=UserFactory(), coupon=coupon) for _ in range(5)]
+    # Espalha os resgates em dias diferentes para testar o filtro por período.
+    for days, redemption in enumerate(reversed(created)):
+        redemption.redeemed_at = timezone.now() - timedelta(days=days)
+    Redemption.objects.bulk_update(created, ["redeemed_at"])
+    return created
+
+
+@pytest.fixture
+def admin_client() -> APIClient:
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(is_staff=True))
+    return client
+
+
+def local(value: datetime) -> str:
+    return timezone.localtime(value).strftime("%Y-%m-%dT%H:%M:%S-03:00")
+
+
+def read(response) -> bytes:
+    return b"".join(response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_export_redemptions_csv(admin_client, redemptions):
+    response = admin_client.get(reverse("redemption-export"))
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/csv")
+    assert response["Content-Disposition"] == 'attachment; filename="resgates.csv"'
+    rows = list(csv.DictReader(io.StringIO(read(response).decode())))
+    assert [int(row["id"]) for row in rows] == sorted(r.id for r in redemptions)
+    first = redemptions[0]
+    assert rows[0]["coupon_code"] == "EXPORTA"
+    assert rows[0]["user_email"] == first.user.email
+    assert rows[0]["redeemed_at"] == first.redeemed_at.isoformat()
+
+
+@pytest.mark.django_db
+def test_export_redemptions_ndjson_gzip_with_period(admin_client, redemptions):
+    now = timezone.now()
+    response = admin_client.get(
+        reverse("redemption-export"),
+        {
+            "output": "ndjson",
+            "gzip": "true",
+            "init_datetime": local(now - timedelta(days=2, hours=1)),
+            "end_datetime": local(now + timedelta(minutes=1)),
+        },
+    )
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/gzip"
+    assert response["Content-Disposition"] == 'attachment; filename="resgates.ndjson.gz"'
+    lines = gzip.decompress(read(response)).decode().splitlines()
+    items = [json.loads(line) for line in lines]
+    assert [item["id"] for item in items] == [r.id for r in redemptions[2:]]
+    assert set(items[0]) == {
+        "id",
+        "redeemed_at",
+        "user_id",
+        "user_email",
+        "coupon_id",
+        "coupon_code",
+    }
+
+
+@pytest.mark.django_db
+def test_export_redemptions_validates_request(admin_client):
+    now = timezone.now()
+    response = admin_client.get(
+        reverse("redemption-export"),
+        {"init_datetime": local(now), "end_datetime": local(now - timedelta(days=1))},
+    )
+    assert response.status_code == 400
+    assert admin_client.get(reverse("redemption-export"), {"output": "xml"}).status_code == 400
+
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(is_staff=False))
+    assert client.get(reverse("redemption-export")).status_code == 403
+
+
+@pytest.mark.django_db
+def test_export_redemptions_streams_in_chunks(redemptions):
+    chunks = list(export_redemptions(format="ndjson", chunk_size=2))
+
+    assert [len(chunk.splitlines()) for chunk in chunks] == [2, 2, 1]
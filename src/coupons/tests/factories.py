@@ -1,7 +1,7 @@
 import random
 
 import factory
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from factory.django import DjangoModelFactory
 
 from authentication.tests.factories import UserFactory
@@ -88,7 +88,8 @@ class CouponFactory(DjangoModelFactory):
         max_attempts = 10
         for attempt in range(max_attempts):
             try:
-                instance = super()._create(model_class, *args, **kwargs)
+                with transaction.atomic():
+                    instance = super()._create(model_class, *args, **kwargs)
                 return instance
             except IntegrityError:
                 if attempt == max_attempts - 1:
@@ -0,0 +1,116 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from coupons.catalog import coupon_catalog
+from coupons.imports import CouponImporter
+from coupons.models import Coupon
+from coupons.tests.factories import CouponFactory, UserFactory
+
+CSV = (
+    "code,description,max_redemptions,available\n"
+    "IMPORT1,Desconto em café,,true\n"
+    'IMPORT2,"Desconto, com vírgula",3,não\n'
+    "IMPORT3,Cota zerada,0,true\n"
+    ",Sem código,,true\n"
+    "EXISTENTE,Já cadastrado,,true\n"
+    "IMPORT1,Repetido,,true\n"
+    "IMPORT4,Disponibilidade inválida,,talvez\n"
+)
+
+
+@pytest.mark.django_db
+def test_import_coupons_csv_endpoint(django_capture_on_commit_callbacks):
+    CouponFactory(code="EXISTENTE", description="Cupom")
+    version = coupon_catalog.version()
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(is_staff=True))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(reverse("coupon-import"), CSV, content_type="text/csv")
+
+    assert response.status_code == 200
+    assert response.data["created"] == 2
+    assert response.data["rejected"] == 5
+    errors = {error["line"]: error for error in response.data["errors"]}
+    assert set(errors) == {4, 5, 6, 7, 8}
+    assert "maior que zero" in errors[4]["message"]
+    assert "code" in errors[5]["message"]
+    assert errors[6]["message"] == "Já existe um cupom com este código."
+    assert errors[7]["message"] == "Código repetido no arquivo."
+    assert errors[8]["code"] == "IMPORT4"
+
+    imported = Coupon.objects.get(code="IMPORT2")
+    assert imported.description == "Desconto, com vírgula"
+    assert imported.max_redemptions == 3
+    assert imported.available is False
+    assert Coupon.objects.get(code="IMPORT1").max_redemptions is None
+    assert Coupon.objects.get(code="EXISTENTE").description == "Cupom"
+    assert coupon_catalog.version() != version
+
+
+@pytest.mark.django_db
+def test_import_coupons_ndjson_endpoint():
+    body = "\n".join(
+        [
+            json.dumps({"code": "NDJSON1", "description": "Cupom", "max_redemptions": 2}),
+            "{quebrado",
+            json.dumps(["não", "é", "objeto"]),
+            "",
+            json.dumps({"code": "NDJSON2", "description": "Cupom", "available": False}),
+        ]
+    )
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(is_staff=True))
+
+    response = client.post(reverse("coupon-import"), body, content_type="application/x-ndjson")
+
+    assert response.status_code == 200
+    assert response.data["created"] == 2
+    assert [error["line"] for error in response.data["errors"]] == [2, 3]
+    assert Coupon.objects.get(code="NDJSON2").available is False
+    assert Coupon.objects.get(code="NDJSON1").search_vector is not None
+
+
+@pytest.mark.django_db
+def test_import_coupons_requires_staff_and_body():
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(is_staff=False))
+    response = client.post(reverse("coupon-import"), CSV, content_type="text/csv")
+    assert response.status_code == 403
+    assert not Coupon.objects.filter(code="IMPORT1").exists()
+
+    client.force_authenticate(user=UserFactory(is_staff=True))
+    assert client.post(reverse("coupon-import")).status_code in (400, 415)
+    assert (
+        client.post(reverse("coupon-import"), "{}", content_type="application/json").status_code
+        == 415
+    )
+
+
+@pytest.mark.django_db
+def test_import_coupons_detects_collisions_across_chunks():
+    lines = ["code,description"] + [f"CHUNK{i % 5},Cupom {i}" for i in range(12)]
+
+    report = CouponImporter(chunk_size=3).run(io.StringIO("\n".join(lines)), format="csv")
+
+    assert report.created == 5
+    assert report.rejected == 7
+    assert Coupon.objects.filter(code__startswith="CHUNK").count() == 5
+    assert Coupon.objects.get(code="CHUNK0").description == "Cupom 0"
+
+
+@pytest.mark.django_db
+def test_import_coupons_command(tmp_path):
+    path = tmp_path / "cupons.csv"
+    path.write_text(CSV, encoding="utf-8")
+    out = io.StringIO()
+
+    call_command("import_coupons", str(path), stdout=out)
+
+    assert set(Coupon.objects.values_list("code", flat=True)) == {"IMPORT1", "IMPORT2", "EXISTENTE"}
+    assert "3 cupom(ns) importado(s) e 4 linha(s) recusada(s)" in out.getvalue()
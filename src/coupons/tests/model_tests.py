@@ -1,7 +1,10 @@
+from io import StringIO
+
 import pytest
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 
-from coupons.models import Redemption
+from coupons.models import Redemption, RedemptionCounter
 from coupons.tests.factories import CouponFactory, RedemptionFactory, UserFactory
 
 
@@ -14,3 +17,32 @@ def test_limite_resgates():
     redemption = Redemption(user=user, coupon=coupon)
     with pytest.raises(ValidationError):
         redemption.clean()
+
+
+@pytest.mark.django_db
+def test_redemption_counter_follows_creates_and_deletes():
+    user = UserFactory()
+    coupon = CouponFactory(max_redemptions=5, available=True)
+    redemptions = RedemptionFactory.create_batch(3, user=user, coupon=coupon)
+
+    assert RedemptionCounter.objects.redeemed(user_id=user.id, coupon_id=coupon.id) == 3
+
+    redemptions[0].delete()
+    assert RedemptionCounter.objects.redeemed(user_id=user.id, coupon_id=coupon.id) == 2
+
+
+@pytest.mark.django_db
+def test_reconcile_redemption_counters_rebuilds_from_ledger():
+    user = UserFactory()
+    coupon = CouponFactory(max_redemptions=5, available=True)
+    other_coupon = CouponFactory(max_redemptions=5, available=True)
+    RedemptionFactory.create_batch(2, user=user, coupon=coupon)
+    RedemptionFactory(user=user, coupon=other_coupon)
+
+    RedemptionCounter.objects.filter(coupon=coupon).update(redeemed=7)
+    RedemptionCounter.objects.filter(coupon=other_coupon).delete()
+
+    call_command("reconcile_redemption_counters", stdout=StringIO())
+
+    assert RedemptionCounter.objects.redeemed(user_id=user.id, coupon_id=coupon.id) == 2
+    assert RedemptionCounter.objects.redeemed(user_id=user.id, coupon_id=other_coupon.id) == 1
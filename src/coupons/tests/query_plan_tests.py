@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from coupons.models import Coupon, Redemption, RedemptionCounter
+
+USERS = 200
+COUPONS = 50
+REDEMPTIONS = 200_000
+LEDGER_TABLES = (Redemption._meta.db_table, RedemptionCounter._meta.db_table)
+
+
+@pytest.fixture
+def large_ledger() -> User:
+    """
+    Popula o histórico de resgates com volume suficiente para o planner preferir índices,
+    com `redeemed_at` crescente como em produção, e retorna um dos usuários.
+    """
+    users = User.objects.bulk_create(
+        User(email=f"plano.{index}@senfio.com", works_since=timezone.now().date(), password="!")
+        for index in range(USERS)
+    )
+    coupons = Coupon.objects.bulk_create(
+        Coupon(code=f"PLANO{index}", description=f"Cupom {index}", max_redemptions=None)
+        for index in range(COUPONS)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {Redemption._meta.db_table}
+                (user_id, coupon_id, redeemed_at, created_at, updated_at)
+            SELECT
+                (%(users)s::bigint[])[1 + n %% %(user_count)s],
+                (%(coupons)s::bigint[])[1 + (n / %(user_count)s) %% %(coupon_count)s],
+                now() - ((%(total)s - n) || ' seconds')::interval,
+                now(),
+                now()
+            FROM generate_series(1, %(total)s) AS n
+            """,
+            {
+                "users": [user.pk for user in users],
+                "coupons": [coupon.pk for coupon in coupons],
+                "user_count": USERS,
+                "coupon_count": COUPONS,
+                "total": REDEMPTIONS,
+            },
+        )
+        cursor.execute(f"""
+            INSERT INTO {RedemptionCounter._meta.db_table}
+                (user_id, coupon_id, redeemed, created_at, updated_at)
+            SELECT user_id, coupon_id, count(*), now(), now()
+            FROM {Redemption._meta.db_table}
+            GROUP BY user_id, coupon_id
+            """)
+        for table in (User._meta.db_table, Coupon._meta.db_table, *LEDGER_TABLES):
+            cursor.execute(f"ANALYZE {table}")
+    return users[0]
+
+
+def ledger_seq_scans(queries: list[dict]) -> list[str]:
+    """
+    Retorna os planos das consultas capturadas que fazem sequential scan nas tabelas
+    de resgates.
+    """
+    offending = []
+    with connection.cursor() as cursor:
+        for query in queries:
+            if not query["sql"].lstrip().upper().startswith("SELECT"):
+                continue
+            cursor.execute(f"EXPLAIN {query['sql']}")
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            if any(f"Seq Scan on {table}" in plan for table in LEDGER_TABLES):
+                offending.append(f"{query['sql']}\n{plan}")
+    return offending
+
+
+@pytest.mark.slow
+@pytest.mark.django_db
+def test_ledger_endpoints_do_not_sequential_scan(large_ledger):
+    client = APIClient()
+    client.force_authenticate(user=large_ledger)
+
+    with CaptureQueriesContext(connection) as ctx:
+        first_page = client.get(reverse("redemption-list-create"))
+        cursor_page = client.get(reverse("redemption-list-create"), {"cursor": ""})
+        next_page = client.get(
+            reverse("redemption-list-create"), {"cursor": cursor_page.data["next_cursor"]}
+        )
+        recent = client.get(reverse("recent_redemptions"))
+        balance = client.get(reverse("balance"))
+        detail = client.get(
+            reverse("redemption-detail", kwargs={"pk": first_page.data["results"][0]["id"]})
+        )
+
+    for response in (first_page, cursor_page, next_page, recent, balance, detail):
+        assert response.status_code == 200
+    assert first_page.data["count"] == REDEMPTIONS // USERS
+
+    offending = ledger_seq_scans(ctx.captured_queries)
+    assert not offending, "\n\n".join(offending)
+
+
+@pytest.mark.slow
+@pytest.mark.django_db
+def test_ledger_range_and_coupon_queries_do_not_sequential_scan(large_ledger):
+    coupon = Coupon.objects.filter(code="PLANO0").get()
+    until = timezone.now() - timedelta(hours=12)
+
+    with CaptureQueriesContext(connection) as ctx:
+        Redemption.objects.filter(redeemed_at__range=(until - timedelta(hours=1), until)).count()
+        Redemption.objects.filter(coupon=coupon).count()
+        Redemption.objects.filter(coupon=coupon, user=large_ledger).count()
+
+    offending = ledger_seq_scans(ctx.captured_queries)
+    assert not offending, "\n\n".join(offending)
@@ -0,0 +1,213 @@
+import threading
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from coupons.models import Redemption, RedemptionCounter, RedemptionRequest
+from coupons.services import SOLD_OUT, process_redemption_queue
+from coupons.tests.factories import CouponFactory, UserFactory
+
+
+def client_for(user) -> APIClient:
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def enqueue(client: APIClient, coupon_id: int):
+    return client.post(
+        reverse("redemption-list-create"),
+        {"coupon": coupon_id},
+        format="json",
+        headers={"Prefer": "respond-async"},
+    )
+
+
+@pytest.mark.django_db
+def test_async_redemption_returns_ticket_and_status():
+    user = UserFactory()
+    coupon = CouponFactory(code="FILA10", description="Fila", max_redemptions=2, available=True)
+    client = client_for(user)
+
+    response = enqueue(client, coupon.id)
+    assert response.status_code == 202
+    assert response["Preference-Applied"] == "respond-async"
+    assert response.data["status"] == "PENDING"
+    assert not Redemption.objects.exists()
+
+    status_url = response["Location"]
+    assert client.get(status_url).data["status"] == "PENDING"
+    assert client_for(UserFactory()).get(status_url).status_code == 404
+
+    result = process_redemption_queue()
+    assert (result.redeemed, result.rejected) == (1, 0)
+
+    ticket = client.get(status_url).data
+    assert ticket["status"] == "REDEEMED"
+    assert ticket["redemption"]["coupon"]["code"] == "FILA10"
+    assert RedemptionCounter.objects.get(user=user, coupon=coupon).redeemed == 1
+
+
+@pytest.mark.django_db
+def test_async_redemption_enforces_quota_per_batch():
+    first, second = UserFactory(), UserFactory()
+    coupon = CouponFactory(max_redemptions=2, available=True)
+    closed = CouponFactory(max_redemptions=2, available=True)
+    for _ in range(3):
+        assert enqueue(client_for(first), coupon.id).status_code == 202
+    assert enqueue(client_for(second), coupon.id).status_code == 202
+    assert enqueue(client_for(second), closed.id).status_code == 202
+    closed.available = False
+    closed.save()
+
+    # Pedidos repetidos de um par ficam para o lote seguinte.
+    batches = []
+    while (result := process_redemption_queue()).processed:
+        batches.append((result.redeemed, result.rejected))
+
+    assert batches == [(2, 1), (1, 0), (0, 1)]
+    assert Redemption.objects.filter(user=first, coupon=coupon).count() == 2
+    assert RedemptionCounter.objects.get(user=first, coupon=coupon).redeemed == 2
+    rejected = RedemptionRequest.objects.filter(status="REJECTED").order_by("id")
+    assert [request.error for request in rejected] == [
+        "Você atingiu o limite de resgates para este cupom.",
+        "Este cupom não está disponível para resgate.",
+    ]
+
+
+@pytest.mark.django_db
+def test_async_redemption_rejects_unavailable_coupon_on_enqueue():
+    coupon = CouponFactory(available=False)
+    assert enqueue(client_for(UserFactory()), coupon.id).status_code == 400
+    assert not RedemptionRequest.objects.exists()
+
+
+@pytest.mark.django_db
+def test_queue_batch_query_count_does_not_grow_with_batch():
+    coupons = CouponFactory.create_batch(3, max_redemptions=5, available=True)
+
+    def measure(requests: int) -> int:
+        users = UserFactory.create_batch(4)
+        RedemptionRequest.objects.bulk_create(
+            RedemptionRequest(user=users[i % 4], coupon=coupons[i % 3]) for i in range(requests)
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            assert process_redemption_queue().redeemed == requests
+        return len(ctx.captured_queries)
+
+    assert measure(3) == measure(12)
+
+
+@pytest.mark.django_db
+def test_stock_rejections_do_not_use_quota():
+    coupon = CouponFactory(max_redemptions=1, max_total_redemptions=1, available=True)
+    first, second = UserFactory(), UserFactory()
+    RedemptionRequest.objects.bulk_create(
+        RedemptionRequest(user=user, coupon=coupon) for user in (first, second, second)
+    )
+
+    while process_redemption_queue().processed:
+        pass
+
+    errors = RedemptionRequest.objects.filter(user=second).order_by("id")
+    assert [request.error for request in errors] == [
+        SOLD_OUT,
+        "Este cupom não está disponível para resgate.",
+    ]
+    assert not RedemptionCounter.objects.filter(user=second, redeemed__gt=0).exists()
+
+
+@pytest.mark.django_db
+def test_failed_batch_is_retried_per_request_to_reject_only_the_failing_one(monkeypatch):
+    coupon = CouponFactory(max_redemptions=None, available=True)
+    users = UserFactory.create_batch(3)
+    RedemptionRequest.objects.bulk_create(
+        RedemptionRequest(user=user, coupon=coupon) for user in users
+    )
+    bulk_create = Redemption.objects.bulk_create
+
+    def fail_for_poison(redemptions, *args, **kwargs):
+        if any(redemption.user_id == users[1].pk for redemption in redemptions):
+            raise IntegrityError("duplicate key value violates unique constraint")
+        return bulk_create(redemptions, *args, **kwargs)
+
+    monkeypatch.setattr(Redemption.objects, "bulk_create", fail_for_poison)
+    out = StringIO()
+    call_command("process_redemption_queue", "--once", stdout=out)
+
+    assert "3 pedidos" in out.getvalue()
+    assert "(2 resgatados, 1 recusados)" in out.getvalue()
+    rejected = RedemptionRequest.objects.get(status="REJECTED")
+    assert (rejected.user_id, rejected.error) == (
+        users[1].pk,
+        "Não foi possível processar o pedido.",
+    )
+    assert set(Redemption.objects.values_list("user_id", flat=True)) == {users[0].pk, users[2].pk}
+
+
+@pytest.mark.django_db
+def test_transient_failure_keeps_batch_pending(monkeypatch):
+    coupon = CouponFactory(max_redemptions=None, available=True)
+    RedemptionRequest.objects.bulk_create(
+        RedemptionRequest(user=user, coupon=coupon) for user in UserFactory.create_batch(3)
+    )
+
+    def fail(*args, **kwargs):
+        raise OperationalError("deadlock detected")
+
+    monkeypatch.setattr(Redemption.objects, "bulk_create", fail)
+    with pytest.raises(OperationalError):
+        process_redemption_queue()
+
+    assert RedemptionRequest.objects.filter(status="PENDING").count() == 3
+    monkeypatch.undo()
+    assert process_redemption_queue().redeemed == 3
+
+
+@pytest.mark.django_db
+def test_process_redemption_queue_command_drains_queue():
+    coupon = CouponFactory(max_redemptions=None, available=True)
+    RedemptionRequest.objects.bulk_create(
+        RedemptionRequest(user=user, coupon=coupon) for user in UserFactory.create_batch(5)
+    )
+    out = StringIO()
+
+    call_command("process_redemption_queue", "--once", "--batch-size", "2", stdout=out)
+
+    assert not RedemptionRequest.objects.filter(status="PENDING").exists()
+    assert Redemption.objects.filter(coupon=coupon).count() == 5
+    assert out.getvalue().count("pedidos em") == 3
+
+
+@pytest.mark.slow
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_workers_claim_disjoint_batches():
+    coupon = CouponFactory(max_redemptions=None, available=True)
+    RedemptionRequest.objects.bulk_create(
+        RedemptionRequest(user=user, coupon=coupon) for user in UserFactory.create_batch(12)
+    )
+    workers = 3
+    barrier = threading.Barrier(workers)
+    processed = []
+
+    def worker():
+        try:
+            barrier.wait()
+            while result := process_redemption_queue(batch_size=2).processed:
+                processed.append(result)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(processed) == 12
+    assert Redemption.objects.filter(coupon=coupon).count() == 12
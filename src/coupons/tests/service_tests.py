@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import connections
+
+from coupons.models import Redemption
+from coupons.services import redeem_coupon
+from coupons.tests.factories import CouponFactory, UserFactory
+
+
+@pytest.mark.django_db
+def test_redeem_coupon_respects_limit():
+    user = UserFactory()
+    coupon = CouponFactory(max_redemptions=2, available=True)
+
+    redeem_coupon(user=user, coupon=coupon)
+    redeem_coupon(user=user, coupon=coupon)
+    with pytest.raises(ValidationError):
+        redeem_coupon(user=user, coupon=coupon)
+
+    assert Redemption.objects.filter(user=user, coupon=coupon).count() == 2
+
+
+@pytest.mark.slow
+@pytest.mark.django_db(transaction=True)
+def test_redeem_coupon_concurrent_clients_never_exceed_limit():
+    user = UserFactory()
+    coupon = CouponFactory(max_redemptions=3, available=True)
+    clients = 8
+    barrier = threading.Barrier(clients)
+    accepted = []
+
+    def client():
+        try:
+            barrier.wait()
+            for _ in range(3):
+                try:
+                    redeem_coupon(user=user, coupon=coupon)
+                    accepted.append(1)
+                except ValidationError:
+                    pass
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(accepted) == 3
+    assert Redemption.objects.filter(user=user, coupon=coupon).count() == 3
@@ -0,0 +1,188 @@
+import threading
+from io import StringIO
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connections
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from coupons.models import Coupon, CouponStockShard, Redemption, RedemptionRequest
+from coupons.services import (
+    SOLD_OUT,
+    process_redemption_queue,
+    redeem_coupon,
+    redeem_coupons,
+)
+from coupons.tests.factories import CouponFactory, UserFactory
+
+
+def stocked_coupon(stock: int, shards: int = 4, **kwargs) -> Coupon:
+    return CouponFactory(
+        max_redemptions=10,
+        max_total_redemptions=stock,
+        stock_shards=shards,
+        available=True,
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+def test_stock_is_split_across_shards_and_summed_on_read():
+    coupon = stocked_coupon(stock=10, shards=4)
+
+    shards = CouponStockShard.objects.filter(coupon=coupon).order_by("shard")
+    assert [shard.capacity for shard in shards] == [3, 3, 2, 2]
+    assert stocked_coupon(stock=2, shards=8).stock_shard_count == 2
+    assert not CouponStockShard.objects.filter(coupon=CouponFactory(available=True)).exists()
+
+    user = UserFactory()
+    for _ in range(3):
+        redeem_coupon(user=user, coupon=coupon)
+    annotated = Coupon.objects.with_stock().get(pk=coupon.pk)
+    assert (annotated.stock_redeemed, annotated.stock_remaining) == (3, 7)
+
+
+@pytest.mark.django_db
+def test_redeem_marks_coupon_unavailable_when_stock_runs_out(
+    django_capture_on_commit_callbacks,
+):
+    coupon = stocked_coupon(stock=3, shards=3)
+    users = UserFactory.create_batch(2)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        for user in [*users, users[0]]:
+            redeem_coupon(user=user, coupon=coupon)
+
+    coupon.refresh_from_db()
+    assert not coupon.available
+    assert CouponStockShard.objects.remaining(coupon.pk) == 0
+    with pytest.raises(ValidationError, match="não está disponível"):
+        redeem_coupon(user=users[1], coupon=coupon)
+
+
+@pytest.mark.django_db
+def test_redeem_on_empty_stock_keeps_coupon_unavailable():
+    coupon = stocked_coupon(stock=1, shards=1)
+    redeem_coupon(user=UserFactory(), coupon=coupon)
+    # Simula o cupom reaberto por engano com o estoque esgotado.
+    Coupon.objects.filter(pk=coupon.pk).update(available=True)
+    coupon.refresh_from_db()
+
+    with pytest.raises(ValidationError, match=SOLD_OUT):
+        redeem_coupon(user=UserFactory(), coupon=coupon)
+    assert not Coupon.objects.get(pk=coupon.pk).available
+    assert Redemption.objects.filter(coupon=coupon).count() == 1
+
+
+@pytest.mark.django_db
+def test_deleting_redemption_reopens_sold_out_coupon():
+    coupon = stocked_coupon(stock=2, shards=2)
+    for user in UserFactory.create_batch(2):
+        redeem_coupon(user=user, coupon=coupon)
+    assert not Coupon.objects.get(pk=coupon.pk).available
+
+    Redemption.objects.filter(coupon=coupon).first().delete()
+    coupon.refresh_from_db()
+    assert coupon.available
+    assert CouponStockShard.objects.remaining(coupon.pk) == 1
+
+    # Cupom desativado à mão, com estoque sobrando, continua indisponível.
+    Coupon.objects.filter(pk=coupon.pk).update(available=False)
+    Redemption.objects.get(coupon=coupon).delete()
+    assert not Coupon.objects.get(pk=coupon.pk).available
+    assert CouponStockShard.objects.remaining(coupon.pk) == 2
+
+
+@pytest.mark.django_db
+def test_stock_changes_rebuild_shards_from_ledger():
+    coupon = stocked_coupon(stock=5, shards=2)
+    user = UserFactory()
+    redemptions = [redeem_coupon(user=user, coupon=coupon) for _ in range(2)]
+
+    redemptions[0].delete()
+    assert CouponStockShard.objects.remaining(coupon.pk) == 4
+
+    coupon.stock_shards = 4
+    coupon.save()
+    assert CouponStockShard.objects.filter(coupon=coupon).count() == 4
+    assert CouponStockShard.objects.remaining(coupon.pk) == 4
+
+    coupon.max_total_redemptions = 1
+    coupon.save()
+    assert CouponStockShard.objects.remaining(coupon.pk) == 0
+    assert not Coupon.objects.get(pk=coupon.pk).available
+
+    coupon.max_total_redemptions = None
+    coupon.available = True
+    coupon.save()
+    assert not CouponStockShard.objects.filter(coupon=coupon).exists()
+    redeem_coupon(user=user, coupon=coupon)
+
+
+@pytest.mark.django_db
+def test_bulk_and_queued_redemptions_respect_stock():
+    coupon = stocked_coupon(stock=3, shards=2)
+    other = CouponFactory(max_redemptions=5, available=True)
+    user = UserFactory()
+
+    results = redeem_coupons(user=user, refs=[coupon.pk, other.pk])
+    assert [result.error for result in results] == [None, None]
+
+    RedemptionRequest.objects.bulk_create(
+        RedemptionRequest(user=requester, coupon=coupon)
+        for requester in [user, *UserFactory.create_batch(2)]
+    )
+    assert (process_redemption_queue().redeemed, Redemption.objects.count()) == (2, 4)
+    assert RedemptionRequest.objects.order_by("-id").first().error == SOLD_OUT
+    assert not Coupon.objects.get(pk=coupon.pk).available
+
+
+@pytest.mark.django_db
+def test_coupon_stock_endpoint_and_reconcile_command():
+    client = APIClient()
+    client.force_authenticate(user=UserFactory(is_staff=True))
+    response = client.post(
+        reverse("coupon-list-create"),
+        {"code": "PIZZA10K", "description": "Pizzas", "max_total_redemptions": 4},
+        format="json",
+    )
+    assert response.status_code == 201
+    coupon = Coupon.objects.get(code="PIZZA10K")
+    redeem_coupon(user=UserFactory(), coupon=coupon)
+
+    stock = client.get(reverse("coupon-stock", kwargs={"pk": coupon.pk})).data
+    assert (stock["max_total_redemptions"], stock["redeemed"], stock["remaining"]) == (4, 1, 3)
+
+    CouponStockShard.objects.filter(coupon=coupon).update(redeemed=0)
+    call_command("reconcile_redemption_counters", stdout=StringIO())
+    assert CouponStockShard.objects.remaining(coupon.pk) == 3
+
+
+@pytest.mark.slow
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_redemptions_never_exceed_stock():
+    coupon = stocked_coupon(stock=4, shards=2)
+    users = UserFactory.create_batch(6)
+    barrier = threading.Barrier(len(users))
+    errors = []
+
+    def redeem(user):
+        try:
+            barrier.wait()
+            redeem_coupon(user=user, coupon=Coupon.objects.get(pk=coupon.pk))
+        except ValidationError as exc:
+            errors.append(exc.messages[0])
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=redeem, args=(user,)) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert Redemption.objects.filter(coupon=coupon).count() == 4
+    assert len(errors) == 2
+    assert not Coupon.objects.get(pk=coupon.pk).available
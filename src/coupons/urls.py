@@ -3,20 +3,41 @@ from django.urls import path
 from .views import (
     BalanceView,
     CouponDetailView,
+    CouponImportView,
     CouponListCreateView,
+    CouponStockView,
     RecentRedemptionsView,
+    RedemptionBulkCreateView,
     RedemptionDetailView,
+    RedemptionExportView,
     RedemptionListCreateView,
+    RedemptionRequestDetailView,
 )
 
 urlpatterns = [
     path("/balance", BalanceView.as_view(), name="balance"),
+    path("/import", CouponImportView.as_view(), name="coupon-import"),
     path("/recent-redemptions", RecentRedemptionsView.as_view(), name="recent_redemptions"),
     path(
         "/redemptions",
         RedemptionListCreateView.as_view(),
         name="redemption-list-create",
     ),
+    path(
+        "/redemptions/bulk",
+        RedemptionBulkCreateView.as_view(),
+        name="redemption-bulk-create",
+    ),
+    path(
+        "/redemptions/export",
+        RedemptionExportView.as_view(),
+        name="redemption-export",
+    ),
+    path(
+        "/redemptions/requests/<int:pk>",
+        RedemptionRequestDetailView.as_view(),
+        name="redemption-request-detail",
+    ),
     path(
         "/redemptions/<int:pk>",
         RedemptionDetailView.as_view(),
@@ -32,4 +53,9 @@ urlpatterns = [
         CouponDetailView.as_view(),
         name="coupon-detail",
     ),
+    path(
+        "/<int:pk>/stock",
+        CouponStockView.as_view(),
+        name="coupon-stock",
+    ),
 ]
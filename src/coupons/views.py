@@ -1,22 +1,52 @@
 from typing import Any
 
 from django.core.exceptions import PermissionDenied
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max, Sum
 from django.db.models.manager import BaseManager
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import parse_etags, quote_etag
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_view
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.serializers import as_serializer_error
 from rest_framework.views import APIView
 
-from shared.api.doc import ApiDoc
+from shared.api.counting import CachedCount
+from shared.api.doc import IDEMPOTENCY_KEY_PARAMETER, NOT_MODIFIED_RESPONSE, ApiDoc
+from shared.api.filters import FieldFilter
+from shared.api.mixins import (
+    ConditionalGetMixin,
+    EagerLoadingMixin,
+    IdempotencyMixin,
+    StreamingListMixin,
+)
+from shared.api.parsers import CsvStreamParser, LineStream, NdjsonStreamParser
 from shared.api.serializers import GenericResponseSerializer
+from shared.api.throttling import TokenBucketThrottle
 
-from .models import Coupon, Redemption
+from .catalog import CatalogListMixin, CatalogRetrieveMixin, coupon_catalog
+from .exports import CONTENT_TYPES, export_redemptions
+from .feeds import recent_redemptions_feed
+from .imports import CouponImporter
+from .models import Coupon, Redemption, RedemptionCounter, RedemptionRequest
 from .serializers import (
+    BulkRedemptionResultSerializer,
+    BulkRedemptionSerializer,
+    CouponBalanceSerializer,
+    CouponImportReportSerializer,
     CouponSerializer,
+    CouponStockSerializer,
     CreateRedemptionSerializer,
+    RedemptionExportSerializer,
+    RedemptionRequestSerializer,
     RedemptionSerializer,
 )
+from .services import enqueue_redemption, redeem_coupons
 
 
 @extend_schema_view(
@@ -26,22 +56,39 @@ from .serializers import (
         title="Listar Cupons",
         desc="Lista todos os cupons disponíveis.",
         search_fields=["code", "description"],
-        responses={200: CouponSerializer(many=True)},
+        responses={200: CouponSerializer(many=True), 304: NOT_MODIFIED_RESPONSE},
     ),
     post=ApiDoc(
         op="create_coupon",
         tag="Coupons",
         title="Criar Cupom",
         desc="Cria um novo cupom.",
+        query_params=[IDEMPOTENCY_KEY_PARAMETER],
         body_payload=CouponSerializer,
         responses={201: GenericResponseSerializer},
     ),
 )
-class CouponListCreateView(generics.ListCreateAPIView):
+class CouponListCreateView(
+    IdempotencyMixin,
+    ConditionalGetMixin,
+    CatalogListMixin,
+    EagerLoadingMixin,
+    StreamingListMixin,
+    generics.ListCreateAPIView,
+):
     queryset = Coupon.objects.all()
     serializer_class = CouponSerializer
     permission_classes = [permissions.IsAuthenticated]
     search_fields = ["code", "description"]
+    filter_fields = {
+        "code": FieldFilter("str", lookups=("exact", "in", "prefix")),
+        "created_at": FieldFilter("datetime", lookups=("range",)),
+    }
+    cursor_ordering = ("-created_at", "-id")
+    count_strategy = CachedCount()
+
+    def get_conditional_state(self, request: Request, many: bool) -> tuple[str, None]:
+        return coupon_catalog.version(), None
 
     def perform_create(self, serializer: Any) -> None:
         if not self.request.user.is_staff:
@@ -55,7 +102,7 @@ class CouponListCreateView(generics.ListCreateAPIView):
         tag="Coupons",
         title="Detalhes do Cupom",
         desc="Obtém, atualiza ou remove um cupom específico.",
-        responses={200: CouponSerializer},
+        responses={200: CouponSerializer, 304: NOT_MODIFIED_RESPONSE},
     ),
     put=ApiDoc(
         op="update_coupon",
@@ -81,11 +128,19 @@ class CouponListCreateView(generics.ListCreateAPIView):
         responses={204: GenericResponseSerializer},
     ),
 )
-class CouponDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CouponDetailView(
+    ConditionalGetMixin,
+    CatalogRetrieveMixin,
+    EagerLoadingMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
     queryset = Coupon.objects.all()
     serializer_class = CouponSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_conditional_state(self, request: Request, many: bool) -> tuple[str, None]:
+        return coupon_catalog.version(), None
+
     def perform_update(self, serializer: Any) -> None:
         if not self.request.user.is_staff:
             raise PermissionDenied("Apenas administradores podem editar cupons.")
@@ -97,6 +152,59 @@ class CouponDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
 
 
+@extend_schema_view(
+    get=ApiDoc(
+        op="retrieve_coupon_stock",
+        tag="Coupons",
+        title="Estoque do Cupom",
+        desc=(
+            "Obtém o estoque total do cupom (`max_total_redemptions`): unidades resgatadas "
+            "por todos os usuários e unidades restantes. Consultado direto no banco, fora do "
+            "cache do catálogo."
+        ),
+        responses={200: CouponStockSerializer},
+    )
+)
+class CouponStockView(generics.RetrieveAPIView):
+    queryset = Coupon.objects.with_stock()
+    serializer_class = CouponStockSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+
+@extend_schema_view(
+    post=ApiDoc(
+        op="import_coupons",
+        tag="Coupons",
+        title="Importar Cupons",
+        desc=(
+            "Importa cupons em massa a partir de um arquivo CSV (`text/csv`, com cabeçalho) "
+            "ou NDJSON (`application/x-ndjson`, um objeto por linha) enviado como corpo da "
+            "requisição. Colunas: `code`, `description`, `max_redemptions` e `available`. "
+            "Linhas inválidas ou com código já existente são recusadas e reportadas, sem "
+            "interromper a importação. Apenas administradores."
+        ),
+        body_payload={
+            CsvStreamParser.media_type: OpenApiTypes.STR,
+            NdjsonStreamParser.media_type: OpenApiTypes.STR,
+        },
+        responses={200: CouponImportReportSerializer},
+    )
+)
+class CouponImportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [CsvStreamParser, NdjsonStreamParser]
+
+    def post(self, request: Request) -> Response:
+        if not request.user.is_staff:
+            raise PermissionDenied("Apenas administradores podem importar cupons.")
+
+        if not isinstance(request.data, LineStream):
+            raise ValidationError("Envie o arquivo CSV ou NDJSON no corpo da requisição.")
+
+        report = CouponImporter().run(request.data.lines, format=request.data.format)
+        return Response(CouponImportReportSerializer(report).data)
+
+
 @extend_schema_view(
     get=ApiDoc(
         op="list_redemptions",
@@ -104,40 +212,182 @@ class CouponDetailView(generics.RetrieveUpdateDestroyAPIView):
         title="Listar Resgates",
         desc="Lista todos os resgates feitos pelo usuário autenticado.",
         search_fields=["coupon__code", "coupon__description", "user__email", "user__team"],
-        responses={200: RedemptionSerializer(many=True)},
+        responses={200: RedemptionSerializer(many=True), 304: NOT_MODIFIED_RESPONSE},
     ),
     post=ApiDoc(
         op="create_redemption",
         tag="Redemptions",
         title="Criar Resgate",
-        desc="Cria um novo resgate para o cupom especificado.",
+        desc=(
+            "Cria um novo resgate para o cupom especificado. Com o cabeçalho "
+            "`Prefer: respond-async`, o pedido é apenas enfileirado e a resposta é `202` com "
+            "o ticket; a situação fica disponível em `Location` "
+            "(`/coupons/redemptions/requests/{id}`)."
+        ),
+        query_params=[IDEMPOTENCY_KEY_PARAMETER],
         body_payload=CreateRedemptionSerializer,
-        responses={201: GenericResponseSerializer},
+        responses={201: GenericResponseSerializer, 202: RedemptionRequestSerializer},
     ),
 )
-class RedemptionListCreateView(generics.ListCreateAPIView):
+class RedemptionListCreateView(
+    IdempotencyMixin,
+    ConditionalGetMixin,
+    EagerLoadingMixin,
+    StreamingListMixin,
+    generics.ListCreateAPIView,
+):
     permission_classes = [permissions.IsAuthenticated]
     search_fields = ["coupon__code", "coupon__description", "user__email", "user__team"]
+    filter_fields = {
+        "coupon": FieldFilter("int", lookups=("exact", "in"), field="coupon_id"),
+        "redeemed_at": FieldFilter("datetime", lookups=("range",)),
+    }
+    cursor_ordering = ("-redeemed_at", "-id")
+    count_strategy = CachedCount(scope="user_id")
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "redemptions"
+    throttle_methods = ("POST",)
+    conditional_related = ("coupon", "user")
+    conditional_vary_on_user = True
 
     def get_queryset(self) -> BaseManager[Redemption]:
-        return Redemption.objects.filter(user=self.request.user).select_related("coupon")
+        return Redemption.objects.filter(user=self.request.user)
 
     def get_serializer_class(self) -> type[CreateRedemptionSerializer]:
         if self.request.method == "POST":
             return CreateRedemptionSerializer
         return RedemptionSerializer
 
+    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        if "respond-async" not in request.headers.get("Prefer", ""):
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            ticket = enqueue_redemption(
+                user=request.user, coupon=serializer.validated_data["coupon"]
+            )
+        except DjangoValidationError as exc:
+            raise ValidationError(detail=as_serializer_error(exc))
+        return Response(
+            RedemptionRequestSerializer(ticket).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={
+                "Location": reverse("redemption-request-detail", kwargs={"pk": ticket.pk}),
+                "Preference-Applied": "respond-async",
+            },
+        )
+
     def perform_create(self, serializer: Any) -> None:
         serializer.save(user=self.request.user)
 
 
+@extend_schema_view(
+    get=ApiDoc(
+        op="retrieve_redemption_request",
+        tag="Redemptions",
+        title="Situação do Pedido de Resgate",
+        desc=(
+            "Obtém a situação de um pedido de resgate enfileirado (`Prefer: respond-async`): "
+            "`PENDING` enquanto aguarda o worker, `REDEEMED` com o resgate criado ou "
+            "`REJECTED` com o motivo da recusa."
+        ),
+        responses={200: RedemptionRequestSerializer},
+    )
+)
+class RedemptionRequestDetailView(EagerLoadingMixin, generics.RetrieveAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = RedemptionRequestSerializer
+
+    def get_queryset(self) -> BaseManager[RedemptionRequest]:
+        return RedemptionRequest.objects.filter(user=self.request.user)
+
+
+@extend_schema_view(
+    post=ApiDoc(
+        op="bulk_create_redemptions",
+        tag="Redemptions",
+        title="Resgatar Cupons em Lote",
+        desc=(
+            "Resgata vários cupons (por id ou código) em uma única requisição e transação. "
+            "Retorna um resultado por item, na ordem recebida; itens recusados não impedem "
+            f"os demais. Máximo de {BulkRedemptionSerializer.max_items} itens por lote."
+        ),
+        query_params=[IDEMPOTENCY_KEY_PARAMETER],
+        body_payload=BulkRedemptionSerializer,
+        responses={200: BulkRedemptionResultSerializer(many=True)},
+    )
+)
+class RedemptionBulkCreateView(IdempotencyMixin, generics.CreateAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = BulkRedemptionSerializer
+    # A resposta é a lista de resultados do lote, sem paginação nem filtros.
+    filter_backends: tuple = ()
+    pagination_class = None
+
+    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = redeem_coupons(user=request.user, refs=serializer.validated_data["coupons"])
+        return Response(BulkRedemptionResultSerializer(results, many=True).data)
+
+
+@extend_schema_view(
+    get=ApiDoc(
+        op="export_redemptions",
+        tag="Redemptions",
+        title="Exportar Resgates",
+        desc=(
+            "Exporta o histórico de resgates de todos os usuários em CSV ou NDJSON, em "
+            "streaming, opcionalmente filtrado por período (`redeemed_at`) e comprimido com "
+            "gzip. Apenas administradores."
+        ),
+        query_params=RedemptionExportSerializer,
+        responses={
+            (200, "text/csv"): OpenApiTypes.BINARY,
+            (200, "application/x-ndjson"): OpenApiTypes.BINARY,
+            (200, "application/gzip"): OpenApiTypes.BINARY,
+        },
+    )
+)
+class RedemptionExportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request: Request) -> StreamingHttpResponse:
+        if not request.user.is_staff:
+            raise PermissionDenied("Apenas administradores podem exportar resgates.")
+
+        serializer = RedemptionExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        filename = f"resgates.{params['output']}"
+        content_type = CONTENT_TYPES[params["output"]]
+        if params["gzip"]:
+            filename, content_type = f"{filename}.gz", "application/gzip"
+
+        response = StreamingHttpResponse(
+            export_redemptions(
+                format=params["output"],
+                init_datetime=params.get("init_datetime"),
+                end_datetime=params.get("end_datetime"),
+                compress=params["gzip"],
+            ),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
 @extend_schema_view(
     get=ApiDoc(
         op="retrieve_delete_redemption",
         tag="Redemptions",
         title="Detalhes do Resgate",
         desc="Obtém ou remove um resgate específico.",
-        responses={200: RedemptionSerializer},
+        responses={200: RedemptionSerializer, 304: NOT_MODIFIED_RESPONSE},
     ),
     delete=ApiDoc(
         op="delete_redemption",
@@ -147,12 +397,14 @@ class RedemptionListCreateView(generics.ListCreateAPIView):
         responses={204: GenericResponseSerializer},
     ),
 )
-class RedemptionDetailView(generics.RetrieveDestroyAPIView):
+class RedemptionDetailView(ConditionalGetMixin, EagerLoadingMixin, generics.RetrieveDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = RedemptionSerializer
+    conditional_related = ("coupon", "user")
+    conditional_vary_on_user = True
 
     def get_queryset(self) -> BaseManager[Redemption]:
-        return Redemption.objects.filter(user=self.request.user).select_related("coupon")
+        return Redemption.objects.filter(user=self.request.user)
 
 
 @extend_schema_view(
@@ -161,24 +413,30 @@ class RedemptionDetailView(generics.RetrieveDestroyAPIView):
         tag="Coupons",
         title="Saldo de Cupons",
         desc="Obtém o saldo de cupons disponíveis para o usuário autenticado.",
-        responses={200: CouponSerializer(many=True)},
+        search_fields=["code", "description"],
+        responses={200: CouponBalanceSerializer(many=True), 304: NOT_MODIFIED_RESPONSE},
     )
 )
-class BalanceView(APIView):
+class BalanceView(ConditionalGetMixin, EagerLoadingMixin, StreamingListMixin, generics.ListAPIView):
+    serializer_class = CouponBalanceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    search_fields = ["code", "description"]
+    cursor_ordering = ("-created_at", "-id")
+    count_strategy = CachedCount()
+    conditional_vary_on_user = True
 
-    def get(self, request: Request) -> Response:
-        user = request.user
-        data = []
-        for coupon in Coupon.objects.filter(available=True):
-            resgates = Redemption.objects.filter(user=user, coupon=coupon).count()
-            saldo = None
-            if coupon.max_redemptions is None:
-                saldo = 0 if resgates >= 1 else 1
-            else:
-                saldo = max(0, coupon.max_redemptions - resgates)
-            data.append({"coupon": CouponSerializer(coupon).data, "remaining": saldo})
-        return Response(data)
+    def get_queryset(self) -> BaseManager[Coupon]:
+        return Coupon.objects.filter(available=True).with_balance(self.request.user)
+
+    def get_conditional_state(self, request: Request, many: bool) -> tuple[str, None]:
+        """
+        O saldo muda apenas com o catálogo ou com os contadores de resgate do usuário.
+        """
+        counters = RedemptionCounter.objects.filter(user=request.user).aggregate(
+            count=Count("pk"), redeemed=Sum("redeemed"), updated_at=Max("updated_at")
+        )
+        fingerprint = "|".join(f"{name}={value!r}" for name, value in sorted(counters.items()))
+        return f"{coupon_catalog.version()}|{fingerprint}", None
 
 
 @extend_schema_view(
@@ -186,12 +444,20 @@ class BalanceView(APIView):
         op="recent_redemptions",
         tag="Redemptions",
         title="Resgates Recentes",
-        desc="Lista os últimos resgates feitos.",
-        responses={200: RedemptionSerializer(many=True)},
+        desc=(
+            "Lista os últimos resgates feitos. Responde com `ETag`; envie-o em "
+            "`If-None-Match` para receber `304` quando o feed não mudou."
+        ),
+        responses={
+            200: RedemptionSerializer(many=True),
+            304: NOT_MODIFIED_RESPONSE,
+        },
     )
 )
 class RecentRedemptionsView(APIView):
     def get(self, request: Request) -> Response:
-        recent = Redemption.objects.select_related("coupon").order_by("-redeemed_at")[:20]
-        output = RedemptionSerializer(recent, many=True).data
-        return Response(output)
+        feed = recent_redemptions_feed.get()
+        etag = quote_etag(feed.etag)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(feed.items, headers={"ETag": etag})
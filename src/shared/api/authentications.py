@@ -1,10 +1,31 @@
+import hashlib
 import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
 from typing import Any
 
+from django.contrib.auth import get_user_model
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.core.cache import BaseCache, caches
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
 from drf_spectacular.extensions import OpenApiAuthenticationExtension
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken, Token
 
 from config.settings import API_APPS_TOKENS, DJANGO_SETT
 
@@ -63,3 +84,451 @@ class HubsatTagEventAuthentication(BaseAuthentication):
 
             return (None, token)
         return None
+
+
+# ---------------------
+# JWT COM CLAIMS DO USUÁRIO
+# ---------------------
+
+# Claim com os campos do usuário (`User.claim_fields`) nos tokens emitidos pela API.
+USER_CLAIMS_CLAIM = "usr"
+
+
+def user_claims(user: AbstractBaseUser) -> dict[str, Any]:
+    """
+    Campos do usuário que vão no token e no cache de usuários, em valores JSON.
+    """
+    claims = {}
+    for name in type(user).claim_fields:
+        value = getattr(user, name)
+        claims[name] = value.isoformat() if isinstance(value, date) else value
+    return claims
+
+
+def user_from_claims(user_id: Any, claims: dict[str, Any]) -> AbstractBaseUser:
+    """
+    Monta o usuário a partir das claims, sem consultar o banco. A instância se comporta
+    como carregada com `only()`: os demais campos (ex.: `password`) são lidos sob demanda.
+    As claims podem estar desatualizadas, então a instância fica marcada com `from_claims`
+    e só pode ser salva com `update_fields` (ex.: `save(update_fields=["password"])`).
+    """
+    model = get_user_model()
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        if field.primary_key or field.attname in claims
+    ]
+    values = [
+        field.to_python(user_id if field.primary_key else claims[field.attname]) for field in fields
+    ]
+    user = model.from_db(DEFAULT_DB_ALIAS, [field.attname for field in fields], values)
+    user.from_claims = True
+    return user
+
+
+class UserClaimsCache:
+    """
+    Cache das claims dos usuários, em dois níveis:
+
+    - memória do worker (alias `users`, LRU limitado por `MAX_ENTRIES`), com validade curta
+      (`local_timeout`), lida em toda requisição autenticada;
+    - cache compartilhado (`default`), com as claims gravadas a cada `save`/`delete` do
+      usuário, válidas por mais tempo que qualquer token emitido antes da escrita.
+
+    Assim, tokens com claims anteriores a uma escrita deixam de valer no worker que a fez
+    imediatamente e, quando `default` é compartilhado entre os workers (`CACHE_BACKEND`
+    como Redis ou Memcached), nos demais em até `local_timeout` segundos. Com o
+    `LocMemCache` padrão, os demais workers só veem a escrita no fim dos tokens já emitidos.
+    """
+
+    key_prefix = "auth:user"
+    local_timeout = 10
+
+    @property
+    def local(self) -> BaseCache:
+        return caches["users"]
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches["default"]
+
+    @property
+    def shared_timeout(self) -> int:
+        return int(jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds()) + self.local_timeout
+
+    def key(self, user_id: Any) -> str:
+        return f"{self.key_prefix}:{user_id}"
+
+    def get(self, user_id: Any) -> dict[str, Any] | None:
+        """
+        Claims mais recentes conhecidas do usuário, ou `None` se o usuário não foi escrito
+        recentemente e ainda não está na memória do worker.
+        """
+        key = self.key(user_id)
+        claims = self.local.get(key)
+        if claims is None:
+            claims = self.shared.get(key)
+            if claims is not None:
+                self.local.set(key, claims, self.local_timeout)
+        return claims
+
+    def remember(self, user_id: Any, claims: dict[str, Any]) -> None:
+        self.local.set(self.key(user_id), claims, self.local_timeout)
+
+    def store(self, user_id: Any, claims: dict[str, Any]) -> None:
+        """
+        Publica as claims de um usuário que acabou de ser escrito.
+        """
+        key = self.key(user_id)
+        self.shared.set(key, claims, self.shared_timeout)
+        self.local.set(key, claims, self.local_timeout)
+
+    def track(self, model: type[models.Model]) -> None:
+        """
+        Publica as claims a cada `save` e as de um usuário inativo a cada `delete`, após o
+        commit. Escritas sem sinais (`QuerySet.update`) não são vistas até `local_timeout`
+        e o fim dos tokens já emitidos.
+        """
+        uid = f"auth_claims:{model._meta.label}"
+        post_save.connect(self._saved, sender=model, dispatch_uid=f"{uid}:saved")
+        post_delete.connect(self._deleted, sender=model, dispatch_uid=f"{uid}:deleted")
+
+    def _saved(self, sender: type[models.Model], instance: Any, **kwargs: Any) -> None:
+        user_id = str(instance.pk)
+        if getattr(instance, "from_claims", False) or (
+            instance.get_deferred_fields() & set(sender.claim_fields)
+        ):
+            instance = sender.objects.only(*sender.claim_fields).get(pk=instance.pk)
+        claims = user_claims(instance)
+        transaction.on_commit(lambda: self.store(user_id, claims))
+
+    def _deleted(self, sender: type[models.Model], instance: Any, **kwargs: Any) -> None:
+        user_id = str(instance.pk)
+        claims = {**user_claims(instance), "is_active": False}
+        transaction.on_commit(lambda: self.store(user_id, claims))
+
+
+user_claims_cache = UserClaimsCache()
+
+
+# ---------------------
+# BLACKLIST DE REFRESH TOKENS
+# ---------------------
+
+
+class BloomFilter:
+    """
+    Conjunto aproximado em um `bytearray`: sem falsos negativos e com falsos positivos em
+    torno de `error_rate` até `capacity` itens. As `hashes` posições de cada item saem de
+    um único BLAKE2b (hashing duplo).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def _positions(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        size = self.size
+        return [(first + index * second) % size for index in range(self.hashes)]
+
+    def add(self, item: str) -> bool:
+        """
+        Adiciona o item; retorna `False` se ele (provavelmente) já estava no filtro.
+        """
+        bits = self._bits
+        added = False
+        for position in self._positions(item):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                added = True
+        self._count += added
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class BlacklistFilter:
+    """
+    Frente em memória da blacklist de refresh tokens: um `BloomFilter` com os `jti` dos
+    tokens na blacklist que ainda não expiraram. Um token fora do filtro certamente não
+    está na blacklist e dispensa a consulta ao banco; os positivos (os da blacklist e cerca
+    de `error_rate` dos demais) seguem para a consulta do SimpleJWT.
+
+    Cada processo carrega o filtro na primeira consulta, inclui após o commit os tokens que
+    ele mesmo põe na blacklist (`track`) e busca os dos demais processos a cada
+    `sync_interval` segundos. O filtro é refeito, sem os tokens expirados, a cada
+    `rebuild_interval` segundos ou quando passa da capacidade. As consultas rodam fora do
+    lock: enquanto um thread monta ou sincroniza o filtro, os demais seguem com o filtro
+    atual (ou, antes do primeiro, com a consulta ao banco).
+
+    Um token posto na blacklist por outro processo pode passar por aqui durante até
+    `sync_interval` segundos; na rotação isso não o reabre, pois
+    `UserClaimsRefreshToken.blacklist` recusa tokens que já estão na blacklist.
+    """
+
+    min_capacity = 10_000
+    error_rate = 0.001
+    sync_interval = 30
+    rebuild_interval = 60 * 60
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._filter: BloomFilter | None = None
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        # Um thread está montando ou sincronizando o filtro, fora do lock.
+        self._refreshing = False
+        # Momento da última leitura da blacklist no banco.
+        self._watermark: datetime | None = None
+
+    def might_contain(self, jti: str) -> bool:
+        bloom = self._current()
+        # Sem filtro enquanto outro thread monta o primeiro: a consulta ao banco decide.
+        return bloom is None or jti in bloom
+
+    def add(self, jti: str) -> None:
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._filter = None
+
+    def track(self) -> None:
+        post_save.connect(self._saved, sender=BlacklistedToken, dispatch_uid="blacklist_filter")
+
+    def _saved(
+        self, sender: type[models.Model], instance: Any, created: bool, **kwargs: Any
+    ) -> None:
+        if created:
+            jti = instance.token.jti
+            transaction.on_commit(lambda: self.add(jti))
+
+    def _current(self) -> BloomFilter | None:
+        """
+        Filtro atual, montado ou sincronizado antes se for a hora. As consultas ao banco
+        rodam fora do lock, por um thread de cada vez; os demais seguem com o filtro atual.
+        """
+        now = time.monotonic()
+        with self._lock:
+            bloom = self._filter
+            if self._refreshing:
+                return bloom
+            rebuild = bloom is None or (
+                now - self._built_at >= self.rebuild_interval or len(bloom) > bloom.capacity
+            )
+            if not rebuild and now - self._synced_at < self.sync_interval:
+                return bloom
+            self._refreshing = True
+            watermark = self._watermark
+
+        try:
+            if rebuild:
+                built, watermark = self._build()
+                with self._lock:
+                    self._filter, self._watermark = built, watermark
+                    self._built_at = self._synced_at = now
+                return built
+
+            assert bloom is not None and watermark is not None
+            jtis, watermark = self._recent(watermark)
+            with self._lock:
+                # `clear()` durante a consulta descarta o filtro sincronizado.
+                if self._filter is bloom:
+                    for jti in jtis:
+                        bloom.add(jti)
+                    self._synced_at, self._watermark = now, watermark
+            return bloom
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _build(self) -> tuple[BloomFilter, datetime]:
+        watermark = timezone.now()
+        jtis = list(
+            BlacklistedToken.objects.filter(token__expires_at__gt=watermark).values_list(
+                "token__jti", flat=True
+            )
+        )
+        bloom = BloomFilter(max(self.min_capacity, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        return bloom, watermark
+
+    def _recent(self, since: datetime) -> tuple[list[str], datetime]:
+        """
+        Tokens postos na blacklist desde `since` (índice em `blacklisted_at`) e o novo
+        marco da sincronização.
+        """
+        watermark = timezone.now()
+        # A sobreposição cobre os tokens gravados por transações que commitaram depois.
+        jtis = BlacklistedToken.objects.filter(
+            blacklisted_at__gte=since - timedelta(seconds=self.sync_interval),
+            token__expires_at__gt=watermark,
+        ).values_list("token__jti", flat=True)
+        return list(jtis), watermark
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class UserClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token com as claims do usuário (`USER_CLAIMS_CLAIM`), copiadas para os access
+    tokens. A cada refresh as claims são relidas do banco, então um access token nunca
+    carrega dados mais antigos que a sua própria emissão.
+
+    A consulta à blacklist passa antes pelo `blacklist_filter`.
+    """
+
+    @classmethod
+    def for_user(cls, user: AbstractBaseUser) -> "UserClaimsRefreshToken":
+        token = super().for_user(user)
+        token[USER_CLAIMS_CLAIM] = user_claims(user)
+        return token
+
+    @property
+    def access_token(self) -> Token:
+        if self.token is not None:
+            user = (
+                get_user_model()
+                .objects.filter(pk=self[jwt_settings.USER_ID_CLAIM])
+                .only(*get_user_model().claim_fields)
+                .first()
+            )
+            if user is not None:
+                self[USER_CLAIMS_CLAIM] = user_claims(user)
+        return super().access_token
+
+    def check_blacklist(self) -> None:
+        if blacklist_filter.might_contain(self.payload[jwt_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self) -> BlacklistedToken:
+        """
+        Põe o token na blacklist com um único INSERT, que falha se ele já estava lá: o mesmo
+        refresh token nunca é rotacionado duas vezes, mesmo que o `blacklist_filter` deste
+        processo ainda não conheça a primeira rotação. O usuário só é consultado para tokens
+        que não estão na lista de emitidos.
+        """
+        outstanding = (
+            OutstandingToken.objects.only("id", "jti")
+            .filter(jti=self.payload[jwt_settings.JTI_CLAIM])
+            .first()
+        )
+        if outstanding is None:
+            outstanding, _ = self.outstand()  # type: ignore[misc]
+        try:
+            with transaction.atomic():
+                return BlacklistedToken.objects.create(token=outstanding)
+        except IntegrityError:
+            raise TokenError("O token já foi invalidado.")
+
+
+class VerifiedTokenCache:
+    """
+    Tokens já verificados (assinatura, `exp`, tipo), na memória do processo, indexados
+    pelo SHA-256 do token recebido. Um token repetido vira uma consulta a um dict, sem
+    base64, HMAC e JSON; a entrada vale até o `exp` do token e o cache guarda no máximo
+    `max_size` tokens (LRU).
+
+    Tokens que podem entrar na blacklist (`BlacklistMixin`, ex.: refresh tokens) nunca são
+    guardados: para eles a verificação completa, com a consulta à blacklist, roda sempre.
+    Os tokens devolvidos são compartilhados entre requisições e não devem ser alterados.
+    """
+
+    def __init__(self, max_size: int = 4096) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[float, Token]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw_token: bytes) -> Token | None:
+        key = hashlib.sha256(raw_token).digest()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, token = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return token
+
+    def set(self, raw_token: bytes, token: Token) -> None:
+        if isinstance(token, BlacklistMixin) or "exp" not in token:
+            return None
+        key = hashlib.sha256(raw_token).digest()
+        with self._lock:
+            self._entries[key] = (float(token["exp"]), token)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+verified_tokens = VerifiedTokenCache()
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    target_class = "shared.api.authentications.ClaimsJWTAuthentication"
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    `JWTAuthentication` sem consulta ao banco: o usuário é montado com as claims do
+    `UserClaimsCache` ou, na falta delas, com as claims assinadas do próprio token.
+    Tokens sem claims (emitidos antes delas) caem na consulta padrão do SimpleJWT.
+
+    Tokens já verificados neste processo vêm do `VerifiedTokenCache`.
+    """
+
+    token_cache = verified_tokens
+
+    def get_validated_token(self, raw_token: bytes) -> Token:
+        token = self.token_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            self.token_cache.set(raw_token, token)
+        return token
+
+    def get_user(self, validated_token: Token) -> AbstractBaseUser:
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        if user_id is None:
+            raise InvalidToken("O token não identifica um usuário.")
+
+        claims = user_claims_cache.get(user_id)
+        if claims is None:
+            claims = validated_token.get(USER_CLAIMS_CLAIM)
+            if claims is None:
+                user = super().get_user(validated_token)
+                user_claims_cache.remember(user_id, user_claims(user))
+                return user
+            user_claims_cache.remember(user_id, claims)
+
+        if not claims.get("is_active", False):
+            raise AuthenticationFailed("Usuário inativo.", code="user_inactive")
+        return user_from_claims(user_id, claims)
@@ -0,0 +1,156 @@
+"""
+Estratégias de contagem para listagens paginadas.
+
+Um `COUNT(*)` com os filtros da busca aplicados custa tanto quanto ler todas as linhas
+filtradas. As views escolhem, por `count_strategy`, como o total é obtido:
+
+- `ExactCount`: `COUNT(*)` a cada requisição (padrão);
+- `CachedCount`: `COUNT(*)` exato, cacheado por consulta e pelas versões das tabelas lidas;
+- `EstimatedCount`: estimativa do planner (`pg_class.reltuples`) para listagens sem filtro
+  acima de um limite, e outra estratégia nos demais casos;
+- `SkipCount`: não conta.
+"""
+
+import hashlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any
+
+from django.core.cache import caches
+from django.db import connections
+from django.db.models import QuerySet
+from django.db.models.expressions import Col
+from django.db.models.lookups import Exact
+from django.db.models.sql.where import AND
+
+from shared.models.versions import data_versions
+
+
+@dataclass(frozen=True)
+class CountResult:
+    # `None` quando a contagem não foi feita.
+    value: int | None
+    exact: bool
+
+
+class CountStrategy(ABC):
+    @abstractmethod
+    def count(self, queryset: QuerySet) -> CountResult: ...
+
+
+class ExactCount(CountStrategy):
+    def count(self, queryset: QuerySet) -> CountResult:
+        return CountResult(value=queryset.count(), exact=True)
+
+
+class SkipCount(CountStrategy):
+    def count(self, queryset: QuerySet) -> CountResult:
+        return CountResult(value=None, exact=False)
+
+
+class CachedCount(CountStrategy):
+    """
+    Contagem exata cacheada sob o hash da consulta (SQL e parâmetros, sem ordenação) e as
+    versões de dados das tabelas que ela lê (ver `shared.models.versions`). O `timeout`
+    limita quanto tempo uma contagem sobrevive a escritas que não trocam a versão.
+
+    Com `scope` (ex.: `"user_id"`), consultas filtradas por `scope = valor` na tabela base
+    usam a versão desse recorte em vez da versão da tabela inteira: a contagem da listagem
+    de um usuário não é invalidada pelas escritas dos demais.
+    """
+
+    def __init__(self, timeout: int = 60 * 5, scope: str | None = None) -> None:
+        self.timeout = timeout
+        self.scope = scope
+
+    def count(self, queryset: QuerySet) -> CountResult:
+        # Ordenação e `select_related` não mudam o total nem as tabelas filtradas.
+        queryset = queryset.order_by().select_related(None)
+        tables = query_tables(queryset)
+        base_table = queryset.model._meta.db_table
+        scope_value = query_scope(queryset, self.scope) if self.scope else None
+        if scope_value is not None:
+            tables.discard(base_table)
+        versions = data_versions.get_many(tables)
+        if scope_value is not None:
+            versions[base_table] = data_versions.get_scoped(base_table, self.scope, scope_value)
+        sql, params = queryset.query.sql_with_params()
+        digest = hashlib.md5(  # nosec
+            repr((queryset.db, sql, params, sorted(versions.items()))).encode()
+        ).hexdigest()
+
+        cache = caches["default"]
+        key = f"count:{queryset.model._meta.db_table}:{digest}"
+        value = cache.get(key)
+        if value is None:
+            value = queryset.count()
+            cache.set(key, value, self.timeout)
+        return CountResult(value=value, exact=True)
+
+
+class EstimatedCount(CountStrategy):
+    """
+    Usa a estimativa de linhas da tabela mantida pelo `ANALYZE`/autovacuum quando a
+    listagem não tem filtros e a tabela passa de `threshold` linhas; caso contrário,
+    delega para `fallback`.
+    """
+
+    def __init__(self, threshold: int = 100_000, fallback: CountStrategy | None = None) -> None:
+        self.threshold = threshold
+        self.fallback = fallback or CachedCount()
+
+    def count(self, queryset: QuerySet) -> CountResult:
+        query = queryset.query
+        if not query.where and not query.distinct and not query.is_sliced:
+            estimate = table_estimate(queryset)
+            if estimate is not None and estimate >= self.threshold:
+                return CountResult(value=estimate, exact=False)
+        return self.fallback.count(queryset)
+
+
+def query_tables(queryset: QuerySet) -> set[str]:
+    """
+    Tabelas lidas pela consulta (tabela base e joins).
+    """
+    query = queryset.query
+    tables = {join.table_name for join in query.alias_map.values()}
+    tables.add(query.get_meta().db_table)
+    return tables
+
+
+def query_scope(queryset: QuerySet, field: str) -> Any | None:
+    """
+    Valor do filtro `field = valor` aplicado à tabela base na raiz do `WHERE` (combinado
+    por AND com os demais filtros), ou `None` se a consulta não tem esse filtro.
+    """
+    query = queryset.query
+    where = query.where
+    if where.connector != AND or where.negated:
+        return None
+    for child in where.children:
+        lhs = getattr(child, "lhs", None)
+        if (
+            isinstance(child, Exact)
+            and isinstance(lhs, Col)
+            and lhs.alias == query.base_table
+            and lhs.target.attname == field
+            and not hasattr(child.rhs, "resolve_expression")
+        ):
+            return child.rhs
+    return None
+
+
+def table_estimate(queryset: QuerySet) -> int | None:
+    """
+    Número estimado de linhas da tabela do queryset, ou `None` se a tabela nunca foi
+    analisada.
+    """
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
@@ -2,7 +2,14 @@ import logging
 import pprint
 from typing import Any, Callable
 
-from drf_spectacular.utils import F, OpenApiExample, OpenApiResponse, extend_schema
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    F,
+    OpenApiExample,
+    OpenApiParameter,
+    OpenApiResponse,
+    extend_schema,
+)
 from pydantic import BaseModel as PydanticBaseModel
 from pydantic import ConfigDict, Field
 
@@ -39,7 +46,11 @@ class ApiDoc(PydanticBaseModel):
         default_factory=list, description="Campos de busca para o endpoint."
     )
     ordering_fields: list[str] = Field(
-        default_factory=list, description="Campos de ordenação para o endpoint."
+        default_factory=list,
+        description=(
+            "Campos de ordenação para o endpoint. Se vazio, a lista documentada é a aceita "
+            "pelo `IndexedOrderingFilter` (campos indexados do model)."
+        ),
     )
     no_auth: bool = Field(
         default=False,
@@ -86,6 +97,22 @@ class ApiDoc(PydanticBaseModel):
         return instance.generate()  # Retorna o resultado de generate
 
 
+NOT_MODIFIED_RESPONSE = OpenApiResponse(
+    description="Os dados não mudaram desde o `ETag` enviado em `If-None-Match`."
+)
+
+IDEMPOTENCY_KEY_PARAMETER = OpenApiParameter(
+    name="Idempotency-Key",
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.HEADER,
+    required=False,
+    description=(
+        "Chave única por operação (ex.: UUID). Repetições com a mesma chave recebem a "
+        "resposta original, com o cabeçalho `Idempotent-Replayed: true`, sem executar a "
+        "operação de novo. Válida por 24 horas."
+    ),
+)
+
 DEFAULT_SCHEMA_RESPONSES = {
     400: _ApiErrorSerializer,
     401: OpenApiResponse(
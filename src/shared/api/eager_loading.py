@@ -0,0 +1,166 @@
+"""
+Planejamento de `select_related`/`prefetch_related`/`only()` a partir de um serializer.
+
+Percorre a árvore de campos do serializer e descobre quais relações precisam ser carregadas
+junto com o queryset e quais colunas são de fato lidas, evitando consultas N+1 e colunas
+desnecessárias (ex.: colunas `tsvector`).
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Prefetch
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import serializers
+
+
+@dataclass
+class QueryPlan:
+    select_related: list[str] = field(default_factory=list)
+    prefetch_related: list[Prefetch] = field(default_factory=list)
+    # Campos por nível (prefixo de relação); `None` quando o nível precisa de todos os campos.
+    only: dict[str, set[str] | None] = field(default_factory=dict)
+
+    def add_field(self, prefix: str, name: str) -> None:
+        fields = self.only.setdefault(prefix, set())
+        if fields is not None:
+            fields.add(name)
+
+    def load_all(self, prefix: str) -> None:
+        self.only[prefix] = None
+
+    def only_fields(self) -> list[str] | None:
+        """
+        Argumentos para `only()`, ou `None` se o model principal precisa de todos os campos.
+        Relações sem campos listados são carregadas por completo pelo Django.
+        """
+        if self.only.get("", set()) is None:
+            return None
+        return sorted(
+            f"{prefix}{name}"
+            for prefix, fields in self.only.items()
+            if fields is not None
+            for name in fields
+        )
+
+    def apply(self, queryset: models.QuerySet, restrict_fields: bool = True) -> models.QuerySet:
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        only = self.only_fields() if restrict_fields else None
+        if only:
+            queryset = queryset.only(*only)
+        return queryset
+
+
+@lru_cache(maxsize=256)
+def plan_for_serializer(
+    serializer_class: type[serializers.BaseSerializer],
+    model: type[models.Model],
+    annotations: frozenset[str] = frozenset(),
+    extra_fields: tuple[str, ...] = (),
+) -> QueryPlan:
+    """
+    Monta (e memoriza) o plano de carregamento para serializar instâncias de `model`.
+
+    Args:
+        serializer_class: Serializer usado na resposta.
+        model: Model do queryset.
+        annotations: Anotações já presentes no queryset (não são colunas do model).
+        extra_fields: Campos do model lidos fora do serializer (ex.: ordenação do cursor).
+    """
+    plan = QueryPlan()
+    _walk(serializer_class(), model, "", plan, annotations)
+    for name in extra_fields:
+        plan.add_field("", name)
+    return plan
+
+
+def _walk(
+    serializer: serializers.BaseSerializer,
+    model: type[models.Model],
+    prefix: str,
+    plan: QueryPlan,
+    annotations: frozenset[str] = frozenset(),
+) -> None:
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    plan.add_field(prefix, model._meta.pk.name)
+    for serializer_field in serializer.fields.values():
+        if serializer_field.write_only:
+            continue
+        if serializer_field.source == "*":
+            if isinstance(serializer_field, serializers.BaseSerializer):
+                _walk(serializer_field, model, prefix, plan, annotations)
+            else:
+                plan.load_all(prefix)
+            continue
+        _walk_source(serializer_field, model, prefix, plan, annotations)
+
+
+def _walk_source(
+    serializer_field: serializers.Field,
+    model: type[models.Model],
+    prefix: str,
+    plan: QueryPlan,
+    annotations: frozenset[str],
+) -> None:
+    attrs = serializer_field.source_attrs
+    for index, attr in enumerate(attrs):
+        last = index == len(attrs) - 1
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            # Anotação do queryset, ou property/método do model cujas dependências
+            # não são conhecidas: o nível é carregado por completo.
+            if not (prefix == "" and attr in annotations):
+                plan.load_all(prefix)
+            return None
+
+        if not model_field.is_relation:
+            plan.add_field(prefix, model_field.name)
+            return None
+
+        path = f"{prefix}{attr}"
+        related_model = model_field.related_model
+        if model_field.many_to_many or model_field.one_to_many:
+            plan.prefetch_related.append(_prefetch(serializer_field, model_field, path, last))
+            return None
+
+        if model_field.concrete:
+            plan.add_field(prefix, model_field.name)
+        if last and isinstance(serializer_field, serializers.PrimaryKeyRelatedField):
+            return None
+
+        plan.select_related.append(path)
+        if not last:
+            model, prefix = related_model, f"{path}{LOOKUP_SEP}"
+        elif isinstance(serializer_field, serializers.BaseSerializer):
+            _walk(serializer_field, related_model, f"{path}{LOOKUP_SEP}", plan)
+        else:
+            plan.load_all(f"{path}{LOOKUP_SEP}")
+
+
+def _prefetch(
+    serializer_field: serializers.Field,
+    model_field: models.Field,
+    path: str,
+    last: bool,
+) -> Prefetch:
+    child = getattr(serializer_field, "child", None) or getattr(
+        serializer_field, "child_relation", None
+    )
+    if not last or not isinstance(child, serializers.BaseSerializer):
+        return Prefetch(path)
+
+    related_model = model_field.related_model
+    child_plan = QueryPlan()
+    _walk(child, related_model, "", child_plan)
+    if model_field.one_to_many:
+        # A FK de volta para o pai é usada para distribuir os objetos pré-carregados.
+        child_plan.add_field("", model_field.field.name)
+    return Prefetch(path, queryset=child_plan.apply(related_model._default_manager.all()))
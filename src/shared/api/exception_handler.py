@@ -43,8 +43,13 @@ class _Router:
         for handler in self._handlers:
             if returned := handler(exc=self.exc, context=self.context).handle():
                 data, status = returned
-                return Response(data, status=status)
+                return Response(data, status=status, headers=self.headers())
 
         ## GeneralExceptionHandler
         data, status = self._end_chain_handler(exc=self.exc, context=self.context).handle()
         return Response(data, status=status)
+
+    def headers(self) -> dict[str, str]:
+        # Ex.: `Throttled` informa em quantos segundos o cliente pode tentar de novo.
+        wait = getattr(self.exc, "wait", None)
+        return {"Retry-After": str(int(wait))} if wait is not None else {}
@@ -0,0 +1,494 @@
+import operator
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import reduce
+from typing import Any, TypeVar
+
+from django.contrib.postgres.search import SearchQuery
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models.constants import LOOKUP_SEP
+from drf_spectacular.plumbing import get_view_model
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter, SearchFilter
+from rest_framework.request import Request
+
+from shared.models import SEARCH_CONFIG
+from shared.patterns import DATETIME_API_STRING_FORMAT
+from shared.validators import (
+    validate_date,
+    validate_datetime,
+    validate_email,
+    validate_non_empty_string,
+)
+
+WORD_RE = re.compile(r"\w+")
+
+T = TypeVar("T")
+
+
+class PostgresSearchFilter(SearchFilter):
+    """
+    `SearchFilter` que usa os índices de busca do Postgres.
+
+    - Campos mapeados em `Model.search_vector_fields` (ex.: `{"description": "search_vector"}`)
+      são pesquisados na coluna `tsvector` por prefixo de palavra (`termo:*`), servida
+      pelo índice GIN.
+    - Os demais continuam com `icontains`, servido pelos índices trigram (`gin_trgm_ops`)
+      sobre `UPPER(coluna)`.
+
+    Os prefixos do DRF (`^`, `=`, `@`, `$`) continuam funcionando normalmente.
+    """
+
+    def get_search_vector(self, search_field: str, queryset: models.QuerySet) -> str | None:
+        """
+        Retorna o caminho até a coluna `tsvector` equivalente ao campo pesquisado, seguindo
+        relações (ex.: `coupon__description` -> `coupon__search_vector`), ou `None`.
+        """
+        if search_field[0] in self.lookup_prefixes:
+            return None
+
+        *relations, field_name = search_field.split(LOOKUP_SEP)
+        opts = queryset.model._meta
+        for part in relations:
+            try:
+                field = opts.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            if not field.is_relation or field.related_model is None:
+                return None
+            opts = field.related_model._meta
+
+        vector_field = getattr(opts.model, "search_vector_fields", {}).get(field_name)
+        if vector_field is None:
+            return None
+        return LOOKUP_SEP.join([*relations, vector_field])
+
+    @staticmethod
+    def build_search_query(term: str) -> SearchQuery | None:
+        """
+        Converte o termo em uma consulta de prefixo por palavra: `cafe gra` -> `cafe:* & gra:*`.
+        """
+        words = WORD_RE.findall(term)
+        if not words:
+            return None
+        return SearchQuery(
+            " & ".join(f"{word}:*" for word in words), search_type="raw", config=SEARCH_CONFIG
+        )
+
+    def build_condition(
+        self, term: str, search_fields: list[str], queryset: models.QuerySet
+    ) -> models.Q:
+        conditions = []
+        for search_field in search_fields:
+            vector_field = self.get_search_vector(search_field, queryset)
+            search_query = self.build_search_query(term) if vector_field else None
+            if search_query is not None:
+                conditions.append(models.Q(**{vector_field: search_query}))
+            else:
+                conditions.append(models.Q(**{self.construct_search(search_field, queryset): term}))
+        return reduce(operator.or_, conditions)
+
+    def filter_queryset(
+        self, request: Request, queryset: models.QuerySet, view: Any
+    ) -> models.QuerySet:
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if not search_fields or not search_terms:
+            return queryset
+
+        search_fields = [str(search_field) for search_field in search_fields]
+        base = queryset
+        queryset = queryset.filter(
+            reduce(
+                operator.and_,
+                (self.build_condition(term, search_fields, queryset) for term in search_terms),
+            )
+        )
+
+        if self.must_call_distinct(queryset, search_fields):
+            queryset = queryset.filter(pk=models.OuterRef("pk"))
+            queryset = base.filter(models.Exists(queryset))
+        return queryset
+
+    def filter_rows(
+        self,
+        request: Request,
+        rows: list[T],
+        view: Any,
+        model: type[models.Model],
+        values: Callable[[T], dict] | None = None,
+    ) -> list[T] | None:
+        """
+        Aplica a mesma busca sobre linhas já carregadas em memória (ex.: cache), com as
+        mesmas regras usadas no banco. `values` extrai de cada linha o dict com os valores
+        dos campos (por padrão, a própria linha).
+
+        Retorna `None` quando algum campo de busca não pode ser avaliado em memória
+        (relações ou prefixos de lookup), para que a busca seja feita no banco.
+        """
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return rows
+
+        vector_fields = getattr(model, "search_vector_fields", {})
+        fields = []
+        for search_field in map(str, search_fields):
+            if search_field[0] in self.lookup_prefixes or LOOKUP_SEP in search_field:
+                return None
+            fields.append((search_field, search_field in vector_fields))
+
+        def matches(row_values: dict, term: str) -> bool:
+            words = WORD_RE.findall(term.lower())
+            for name, vectorized in fields:
+                value = row_values.get(name)
+                if value is None:
+                    continue
+                if vectorized and words:
+                    row_words = WORD_RE.findall(str(value).lower())
+                    if all(any(w.startswith(word) for w in row_words) for word in words):
+                        return True
+                elif term.upper() in str(value).upper():
+                    return True
+            return False
+
+        get_values = values or (lambda row: row)
+        return [row for row in rows if all(matches(get_values(row), term) for term in search_terms)]
+
+
+class IndexedOrderingFilter(OrderingFilter):
+    """
+    `OrderingFilter` que só aceita ordenações servidas por um índice B-tree do model.
+
+    - Campos ordenáveis: primeira coluna de um índice B-tree (chave primária, campos
+      `unique`/`db_index`, `Meta.indexes`, `UniqueConstraint` e `unique_together`), sem
+      relações. Se a view declarar `ordering_fields`, apenas a interseção é aceita.
+    - Ordenações com vários campos são aceitas enquanto formarem um prefixo de um índice;
+      os campos seguintes são descartados.
+    - Se a ordenação não terminar em um campo único, a chave primária é adicionada como
+      desempate, para que a paginação seja estável. O mesmo vale para a ordenação padrão.
+    """
+
+    def get_valid_fields(
+        self, queryset: models.QuerySet, view: Any, context: dict | None = None
+    ) -> list[tuple[str, str]]:
+        fields = orderable_fields(queryset.model)
+        declared = getattr(view, "ordering_fields", self.ordering_fields)
+        if declared is not None and declared != "__all__":
+            fields = [name for name in fields if name in declared]
+        return [(name, name) for name in fields]
+
+    def remove_invalid_fields(
+        self, queryset: models.QuerySet, fields: list[str], view: Any, request: Request
+    ) -> list[str]:
+        valid = {name for name, _label in self.get_valid_fields(queryset, view)}
+        terms = [(term.lstrip("-"), term.startswith("-")) for term in fields]
+        terms = [(name, descending) for name, descending in terms if name in valid]
+
+        accepted: list[str] = []
+        indexes = index_columns(queryset.model)
+        for size in range(1, len(terms) + 1):
+            if not any(_is_index_prefix(terms[:size], columns) for columns in indexes):
+                break
+            accepted = [f"-{name}" if descending else name for name, descending in terms[:size]]
+        return accepted
+
+    def get_ordering(self, request: Request, queryset: models.QuerySet, view: Any) -> list[str]:
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        return with_tiebreaker(queryset.model, list(ordering))
+
+    def get_schema_operation_parameters(self, view: Any) -> list[dict]:
+        parameters = super().get_schema_operation_parameters(view)
+        model = get_view_model(view, emit_warnings=False)
+        if model is None and hasattr(view, "get_serializer_class"):
+            # Views cujo queryset depende do usuário autenticado.
+            model = getattr(getattr(view.get_serializer_class(), "Meta", None), "model", None)
+        if model is None:
+            return parameters
+
+        fields = [
+            name for name, _label in self.get_valid_fields(model._default_manager.none(), view)
+        ]
+        for parameter in parameters:
+            if parameter["name"] == self.ordering_param:
+                parameter["description"] = (
+                    f"Ordenação disponível para os campos: [ {', '.join(fields)} ]  "
+                    "(prefixo '-' para ordem decrescente)"
+                )
+        return parameters
+
+
+def index_columns(model: type[models.Model]) -> list[list[tuple[str, bool]]]:
+    """
+    Colunas (campo, decrescente) de cada índice B-tree do model, na ordem do índice.
+    """
+    meta = model._meta
+    indexes: list[list[tuple[str, bool]]] = [[(meta.pk.name, False)]]
+    for model_field in meta.concrete_fields:
+        if model_field.unique or model_field.db_index:
+            indexes.append([(model_field.name, False)])
+    for index in meta.indexes:
+        # Subclasses (GIN, BRIN, GiST...) não servem ordenação.
+        if type(index) is models.Index and index.fields and not index.condition:
+            indexes.append([(name.lstrip("-"), name.startswith("-")) for name in index.fields])
+    for constraint in meta.constraints:
+        if isinstance(constraint, models.UniqueConstraint) and constraint.fields:
+            if not constraint.condition:
+                indexes.append([(name, False) for name in constraint.fields])
+    for names in meta.unique_together:
+        indexes.append([(name, False) for name in names])
+    return indexes
+
+
+def orderable_fields(model: type[models.Model]) -> list[str]:
+    """
+    Campos pelos quais o model pode ser ordenado usando um índice, na ordem dos campos.
+    """
+    leading = {columns[0][0] for columns in index_columns(model)}
+    return [
+        model_field.name
+        for model_field in model._meta.concrete_fields
+        if model_field.name in leading and not model_field.is_relation
+    ]
+
+
+def with_tiebreaker(model: type[models.Model], ordering: list[str]) -> list[str]:
+    """
+    Adiciona a chave primária ao fim da ordenação se nenhum campo dela for único, na mesma
+    direção do último campo (como nos índices de keyset, ex.: `(-created_at, -id)`).
+    """
+    if not ordering or not all(isinstance(term, str) for term in ordering):
+        return ordering
+
+    pk_name = model._meta.pk.name
+    for term in ordering:
+        name = term.lstrip("-")
+        if name == "pk" or LOOKUP_SEP in name:
+            continue
+        try:
+            if model._meta.get_field(name).unique:
+                return ordering
+        except FieldDoesNotExist:
+            continue
+    return [*ordering, f"-{pk_name}" if ordering[-1].startswith("-") else pk_name]
+
+
+def _is_index_prefix(terms: list[tuple[str, bool]], columns: list[tuple[str, bool]]) -> bool:
+    if len(terms) > len(columns):
+        return False
+    names_match = all(term[0] == column[0] for term, column in zip(terms, columns))
+    # O índice pode ser percorrido nos dois sentidos.
+    same = all(term[1] == column[1] for term, column in zip(terms, columns))
+    inverted = all(term[1] != column[1] for term, column in zip(terms, columns))
+    return names_match and (same or inverted)
+
+
+def _parse_int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError("Número inteiro inválido.") from None
+
+
+def _parse_bool(value: str) -> bool:
+    normalized = value.strip().lower()
+    if normalized in ("true", "1"):
+        return True
+    if normalized in ("false", "0"):
+        return False
+    raise ValueError("Valor booleano inválido. Use `true` ou `false`.")
+
+
+# Tipo do filtro -> (conversor do valor do query param, schema OpenAPI).
+FILTER_TYPES: dict[str, tuple[Callable[[str], Any], dict]] = {
+    "str": (validate_non_empty_string, {"type": "string"}),
+    "int": (_parse_int, {"type": "integer"}),
+    "bool": (_parse_bool, {"type": "boolean"}),
+    "date": (validate_date, {"type": "string", "format": "date"}),
+    "datetime": (validate_datetime, {"type": "string", "format": "date-time"}),
+    "email": (validate_email, {"type": "string", "format": "email"}),
+}
+
+# Grupo de lookups declarável -> sufixos aceitos no query param.
+FILTER_LOOKUPS: dict[str, tuple[str, ...]] = {
+    "exact": ("",),
+    "in": ("in",),
+    "prefix": ("prefix",),
+    "range": ("gte", "lte", "gt", "lt"),
+}
+
+# Sufixo do query param -> (lookup do ORM, operação equivalente em memória, descrição).
+_SUFFIXES: dict[str, tuple[str, Callable[[Any, Any], bool], str]] = {
+    "": ("exact", operator.eq, "igual a"),
+    "in": ("in", lambda value, values: value in values, "um dos valores, separados por vírgula"),
+    "prefix": ("startswith", lambda value, prefix: value.startswith(prefix), "começa com"),
+    "gte": ("gte", operator.ge, "maior ou igual a"),
+    "lte": ("lte", operator.le, "menor ou igual a"),
+    "gt": ("gt", operator.gt, "maior que"),
+    "lt": ("lt", operator.lt, "menor que"),
+}
+
+
+@dataclass(frozen=True)
+class FieldFilter:
+    """
+    Filtro por query param declarado em `filter_fields` de uma view:
+
+        filter_fields = {
+            "code": FieldFilter("str", lookups=("exact", "in", "prefix")),
+            "created_at": FieldFilter("datetime", lookups=("range",)),
+            "coupon": FieldFilter("int", lookups=("exact", "in"), field="coupon_id"),
+        }
+
+    Aceita `code=X`, `code__in=X,Y`, `code__prefix=X`, `created_at__gte=...` etc. O nome do
+    query param é a chave do dict; `field` é o caminho no ORM (padrão: a própria chave).
+    Declare apenas campos que sejam a primeira coluna de um índice B-tree.
+    """
+
+    type: str
+    lookups: tuple[str, ...] = ("exact",)
+    field: str | None = None
+
+    def __post_init__(self) -> None:
+        if self.type not in FILTER_TYPES:
+            raise ValueError(f"Tipo de filtro desconhecido: {self.type}")
+        unknown = set(self.lookups) - set(FILTER_LOOKUPS)
+        if unknown:
+            raise ValueError(f"Lookups de filtro desconhecidos: {sorted(unknown)}")
+        if "prefix" in self.lookups and self.type not in ("str", "email"):
+            raise ValueError("O lookup `prefix` só pode ser usado em filtros de texto.")
+        if "range" in self.lookups and self.type == "bool":
+            raise ValueError("O lookup `range` não pode ser usado em filtros booleanos.")
+
+    @property
+    def suffixes(self) -> list[str]:
+        return [suffix for lookup in self.lookups for suffix in FILTER_LOOKUPS[lookup]]
+
+    def parse(self, raw: str, suffix: str, max_items: int) -> Any:
+        convert = FILTER_TYPES[self.type][0]
+        if suffix == "prefix":
+            # Um prefixo não precisa ser um valor completo válido (ex.: parte de um e-mail).
+            return validate_non_empty_string(raw)
+        if suffix != "in":
+            return convert(raw)
+
+        items = [item.strip() for item in raw.split(",") if item.strip()]
+        if not items:
+            raise ValueError("Informe ao menos um valor.")
+        if len(items) > max_items:
+            raise ValueError(f"Informe no máximo {max_items} valores.")
+        return list(dict.fromkeys(convert(item) for item in items))
+
+
+class FieldFilterBackend(BaseFilterBackend):
+    """
+    Aplica os filtros declarados em `view.filter_fields` (ver `FieldFilter`).
+
+    Os valores são convertidos pelo tipo do filtro (com os validadores de
+    `shared.validators`) e todos os filtros são combinados com AND em um único `filter()`,
+    como comparações simples (`=`, `IN`, `LIKE 'x%'`, `>=`...) que os índices B-tree
+    atendem. Query params com o nome de um filtro e um lookup não declarado, ou com valor
+    inválido, resultam em erro de validação; os demais query params são ignorados.
+    """
+
+    max_in_items = 100
+
+    def get_filter_fields(self, view: Any) -> dict[str, FieldFilter]:
+        return getattr(view, "filter_fields", None) or {}
+
+    def get_predicates(self, request: Request, view: Any) -> list[tuple[str, str, Any]]:
+        """
+        Retorna os filtros da requisição como (caminho do campo, sufixo, valor convertido).
+        """
+        filter_fields = self.get_filter_fields(view)
+        if not filter_fields:
+            return []
+
+        predicates, errors = [], {}
+        for param, raw in request.query_params.items():
+            name, _sep, suffix = param.partition(LOOKUP_SEP)
+            field_filter = filter_fields.get(name)
+            if field_filter is None:
+                continue
+            if suffix not in field_filter.suffixes:
+                accepted = [LOOKUP_SEP.join(filter(None, (name, s))) for s in field_filter.suffixes]
+                errors[param] = [f"Filtro não permitido. Use: {', '.join(accepted)}."]
+                continue
+            try:
+                value = field_filter.parse(raw, suffix, self.max_in_items)
+            except ValueError as exc:
+                errors[param] = [str(exc)]
+                continue
+            predicates.append((field_filter.field or name, suffix, value))
+
+        if errors:
+            raise ValidationError(errors)
+        return predicates
+
+    def filter_queryset(
+        self, request: Request, queryset: models.QuerySet, view: Any
+    ) -> models.QuerySet:
+        predicates = self.get_predicates(request, view)
+        if not predicates:
+            return queryset
+        return queryset.filter(
+            *(
+                models.Q(**{f"{field}{LOOKUP_SEP}{_SUFFIXES[suffix][0]}": value})
+                for field, suffix, value in predicates
+            )
+        )
+
+    def filter_rows(
+        self,
+        request: Request,
+        rows: list[T],
+        view: Any,
+        values: Callable[[T], dict] | None = None,
+    ) -> list[T] | None:
+        """
+        Aplica os mesmos filtros sobre linhas já carregadas em memória (ex.: cache).
+        Retorna `None` quando algum filtro atravessa relações, para que seja feito no banco.
+        """
+        predicates = self.get_predicates(request, view)
+        if not predicates:
+            return rows
+        if any(LOOKUP_SEP in field for field, _suffix, _value in predicates):
+            return None
+
+        get_values = values or (lambda row: row)
+
+        def matches(row_values: dict) -> bool:
+            for field, suffix, value in predicates:
+                current = row_values.get(field)
+                # Como no SQL, comparações com nulo nunca são verdadeiras.
+                if current is None or not _SUFFIXES[suffix][1](current, value):
+                    return False
+            return True
+
+        return [row for row in rows if matches(get_values(row))]
+
+    def get_schema_operation_parameters(self, view: Any) -> list[dict]:
+        parameters = []
+        for name, field_filter in self.get_filter_fields(view).items():
+            schema = FILTER_TYPES[field_filter.type][1]
+            for suffix in field_filter.suffixes:
+                description = f"Filtro por `{field_filter.field or name}`: {_SUFFIXES[suffix][2]}"
+                if field_filter.type == "datetime":
+                    description += f" (formato {DATETIME_API_STRING_FORMAT})"
+                if suffix == "in":
+                    description += f" (até {self.max_in_items})"
+                parameters.append(
+                    {
+                        "name": LOOKUP_SEP.join(filter(None, (name, suffix))),
+                        "required": False,
+                        "in": "query",
+                        "description": f"{description}.",
+                        "schema": {"type": "string"} if suffix in ("in", "prefix") else schema,
+                    }
+                )
+        return parameters
@@ -0,0 +1,260 @@
+import hashlib
+import logging
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.db import connection, transaction
+from django.db.models import Count, Max, QuerySet
+from django.http import HttpRequest, HttpResponseBase
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from api.models import IdempotencyKey
+from config.settings import DJANGO_SETT
+from shared.api.eager_loading import plan_for_serializer
+from shared.exceptions import ConflictExc
+
+
+class StreamingListMixin:
+    """
+    Mixin para views de listagem.
+    Quando a paginação pede todos os dados (`page_size=0`), responde um array JSON em
+    streaming em vez de carregar e serializar o queryset inteiro em memória.
+    """
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        paginator = self.paginator  # type: ignore[attr-defined]
+        if paginator is not None and getattr(paginator, "wants_stream", None):
+            if paginator.wants_stream(request):
+                queryset = self.filter_queryset(self.get_queryset())  # type: ignore[attr-defined]
+                serializer = self.get_serializer()  # type: ignore[attr-defined]
+                return paginator.get_streaming_response(queryset, serializer)
+
+        return super().list(request, *args, **kwargs)  # type: ignore[misc]
+
+
+class EagerLoadingMixin:
+    """
+    Mixin para views genéricas.
+    Aplica ao queryset os `select_related`/`prefetch_related`/`only()` necessários para o
+    serializer da view (ver `shared.api.eager_loading`), evitando consultas N+1.
+
+    `only()` é aplicado apenas em métodos de leitura, já que escritas podem ler campos que o
+    serializer não expõe (ex.: validações do model).
+
+    Em modo DEBUG, registra um aviso para cada consulta disparada depois que os objetos da
+    resposta já foram carregados (carregamento preguiçoso durante a serialização).
+    """
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        queryset = super().filter_queryset(queryset)  # type: ignore[misc]
+        plan = plan_for_serializer(
+            self.get_serializer_class(),  # type: ignore[attr-defined]
+            queryset.model,
+            frozenset(queryset.query.annotations),
+            tuple(field.lstrip("-") for field in getattr(self, "cursor_ordering", ())),
+        )
+        safe = self.request.method in SAFE_METHODS  # type: ignore[attr-defined]
+        return plan.apply(queryset, restrict_fields=safe)
+
+    def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        self._objects_loaded = False
+        if not DJANGO_SETT.DEBUG:
+            return super().dispatch(request, *args, **kwargs)  # type: ignore[misc]
+
+        with connection.execute_wrapper(self._warn_lazy_load):
+            return super().dispatch(request, *args, **kwargs)  # type: ignore[misc]
+
+    def paginate_queryset(self, queryset: QuerySet) -> list | None:
+        page = super().paginate_queryset(queryset)  # type: ignore[misc]
+        self._objects_loaded = page is not None
+        return page
+
+    def get_object(self) -> Any:
+        instance = super().get_object()  # type: ignore[misc]
+        self._objects_loaded = True
+        return instance
+
+    def _warn_lazy_load(
+        self, execute: Callable, sql: str, params: Any, many: bool, context: dict
+    ) -> Any:
+        if self._objects_loaded and self.request.method in SAFE_METHODS:  # type: ignore[attr-defined]
+            logging.warning(
+                f"⚠️ Carregamento preguiçoso durante a serialização em "
+                f"{type(self).__name__}: {sql}"
+            )
+        return execute(sql, params, many, context)
+
+
+class ConditionalGetMixin:
+    """
+    Mixin para views genéricas de leitura.
+    Calcula `ETag` (e `Last-Modified`, no detalhe) com uma consulta agregada barata antes da
+    consulta principal e responde `304` sem serializar quando o cliente já tem a versão atual.
+
+    Por padrão o estado é `MAX(updated_at)` e `COUNT(*)` do queryset filtrado, incluindo o
+    `updated_at` das relações em `conditional_related` (dados aninhados na resposta). Views
+    podem sobrescrever `get_conditional_state` (ex.: para usar a versão de um cache).
+
+    Com `conditional_vary_on_user`, o `ETag` é específico do usuário autenticado e a resposta
+    é marcada como privada (`Vary: Authorization`).
+    """
+
+    conditional_related: tuple[str, ...] = ()
+    conditional_vary_on_user = False
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        return self.conditional_response(request, *args, many=True, **kwargs)
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        return self.conditional_response(request, *args, many=False, **kwargs)
+
+    def conditional_response(
+        self, request: Request, *args: Any, many: bool, **kwargs: Any
+    ) -> HttpResponseBase:
+        view = super(ConditionalGetMixin, self)
+        render = view.list if many else view.retrieve  # type: ignore[attr-defined]
+
+        state = self.get_conditional_state(request, many=many)
+        if state is None:
+            return render(request, *args, **kwargs)
+
+        fingerprint, last_modified = state
+        scope = [type(self).__name__, request.get_full_path()]
+        if self.conditional_vary_on_user:
+            scope.append(str(request.user.pk))
+        digest = hashlib.md5("|".join([*scope, fingerprint]).encode()).hexdigest()  # nosec
+        etag = quote_etag(digest)
+        # Em listagens, remoções podem não alterar `MAX(updated_at)`: só o `ETag` é confiável.
+        last_modified_ts = None
+        if not many and last_modified is not None:
+            last_modified_ts = int(last_modified.timestamp())
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified_ts
+        ) or render(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response["ETag"] = etag
+            if last_modified_ts is not None:
+                response["Last-Modified"] = http_date(last_modified_ts)
+            if self.conditional_vary_on_user:
+                patch_vary_headers(response, ["Authorization"])
+                patch_cache_control(response, private=True)
+        return response
+
+    def get_conditional_state(
+        self, request: Request, many: bool
+    ) -> tuple[str, datetime | None] | None:
+        """
+        Retorna `(impressão digital, última modificação)` dos dados da resposta, ou `None`
+        para responder sem validação condicional.
+        """
+        queryset = self.filter_queryset(self.get_queryset())  # type: ignore[attr-defined]
+        if not many:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field  # type: ignore[attr-defined]
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}  # type: ignore[attr-defined]
+            )
+
+        aggregates = {"count": Count("pk"), "updated_at": Max("updated_at")}
+        for related in self.conditional_related:
+            aggregates[f"{related}_updated_at"] = Max(f"{related}__updated_at")
+        state = queryset.order_by().aggregate(**aggregates)
+        if not state["count"] and not many:
+            return None
+
+        timestamps = [value for name, value in state.items() if name != "count" and value]
+        last_modified = max(timestamps) if timestamps else None
+        fingerprint = "|".join(f"{name}={value!r}" for name, value in sorted(state.items()))
+        return fingerprint, last_modified
+
+
+class IdempotencyMixin:
+    """
+    Mixin para views com `POST` que não deve ser repetido (ex.: criação de resgates).
+
+    Quando o cliente envia o cabeçalho `Idempotency-Key`, a requisição é executada dentro de
+    uma transação junto com a reserva da chave (`api.models.IdempotencyKey`, única por
+    usuário) e a resposta é guardada por `idempotency_ttl`. Repetições com a mesma chave
+    recebem a resposta guardada (com `Idempotent-Replayed: true`) sem executar a view;
+    repetições concorrentes esperam a primeira terminar. Reusar a chave com outra requisição
+    (método, caminho ou corpo diferentes) resulta em `409`.
+
+    Exceções e respostas `5xx` desfazem a reserva, para que a requisição possa ser repetida.
+    Sem o cabeçalho, ou para usuários anônimos, a view funciona normalmente.
+
+    A view implementa o `POST` em `create` (ex.: `generics.CreateAPIView`): um `post`
+    próprio passaria por cima do mixin e a chave seria ignorada.
+    """
+
+    idempotency_header = "Idempotency-Key"
+    idempotency_ttl = timedelta(hours=24)
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "post" in vars(cls):
+            raise TypeError(
+                f"{cls.__name__} define `post` e ignoraria o `IdempotencyMixin`: "
+                "implemente `create`."
+            )
+
+    def post(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        handler = super().post  # type: ignore[misc]
+        key = request.headers.get(self.idempotency_header)
+        if key is None or not request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+
+        key = key.strip()
+        if not key or len(key) > IdempotencyKey._meta.get_field("key").max_length:
+            raise ValidationError(
+                {self.idempotency_header: ["Informe uma chave com 1 a 255 caracteres."]}
+            )
+
+        fingerprint = self.get_request_fingerprint(request)
+        with transaction.atomic():
+            record, created = IdempotencyKey.objects.claim(
+                user_id=request.user.pk, key=key, fingerprint=fingerprint, ttl=self.idempotency_ttl
+            )
+            if not created:
+                return self.replay(record, fingerprint)
+
+            response = handler(request, *args, **kwargs)
+            if response.status_code >= 500 or not isinstance(response, Response):
+                # Libera a chave sem desfazer o que a view já fez.
+                record.delete()
+                return response
+
+            record.status_code = response.status_code
+            record.response = response.data
+            record.save(update_fields=["status_code", "response"])
+        return response
+
+    def get_request_fingerprint(self, request: Request) -> str:
+        """
+        Impressão digital do método, caminho (com query string) e corpo da requisição.
+        """
+        digest = hashlib.sha256()
+        for part in (request.method.encode(), request.get_full_path().encode()):
+            digest.update(part)
+            digest.update(b"\0")
+        digest.update(request.body)
+        return digest.hexdigest()
+
+    def replay(self, record: IdempotencyKey, fingerprint: str) -> Response:
+        if record.fingerprint != fingerprint:
+            raise ConflictExc("Esta chave de idempotência já foi usada em outra requisição.")
+        if record.status_code is None:
+            raise ConflictExc("A requisição com esta chave de idempotência ainda não terminou.")
+        return Response(
+            record.response, status=record.status_code, headers={"Idempotent-Replayed": "true"}
+        )
@@ -0,0 +1,43 @@
+"""
+Parsers que entregam o corpo da requisição em streaming, linha a linha, em vez de
+carregá-lo inteiro em memória.
+"""
+
+import codecs
+from collections.abc import Iterator
+from typing import Any, NamedTuple
+
+from rest_framework.parsers import BaseParser
+
+
+class LineStream(NamedTuple):
+    format: str
+    lines: Iterator[str]
+
+
+class LineStreamParser(BaseParser):
+    """
+    Entrega `request.data` como um `LineStream` com as linhas decodificadas do corpo.
+    O corpo só é lido à medida que as linhas são consumidas.
+    """
+
+    format: str
+
+    def parse(
+        self, stream: Any, media_type: str | None = None, parser_context: dict | None = None
+    ) -> LineStream:
+        encoding = (parser_context or {}).get("encoding") or "utf-8"
+        if encoding.lower().replace("_", "-") == "utf-8":
+            encoding = "utf-8-sig"
+        lines = codecs.iterdecode(stream if stream is not None else iter(()), encoding)
+        return LineStream(format=self.format, lines=lines)
+
+
+class CsvStreamParser(LineStreamParser):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class NdjsonStreamParser(LineStreamParser):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
@@ -0,0 +1,105 @@
+"""
+Utilitários para respostas em streaming, que escrevem a saída aos poucos em vez de
+montar o corpo inteiro em memória.
+"""
+
+import csv
+import io
+import zlib
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from datetime import datetime
+from typing import Any
+
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def stream_json_array(
+    rows: Iterable[Any],
+    to_representation: Callable[[Any], Any],
+    chunk_size: int = 500,
+) -> Iterator[bytes]:
+    """
+    Gera um array JSON a partir de `rows`, serializando um item por vez.
+
+    Args:
+        rows: Iterável com os itens (ex.: `QuerySet.iterator(chunk_size=...)`).
+        to_representation: Função que converte um item em dados serializáveis.
+        chunk_size: Quantidade de itens agrupados em cada bloco enviado ao cliente.
+
+    Returns:
+        Iterador de blocos de bytes que, concatenados, formam um array JSON válido.
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    buffer: list[str] = []
+    separator = ""
+
+    yield b"["
+    for row in rows:
+        buffer.append(separator + encoder.encode(to_representation(row)))
+        separator = ","
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer).encode()
+            buffer = []
+    if buffer:
+        yield "".join(buffer).encode()
+    yield b"]"
+
+
+def stream_csv(
+    rows: Iterable[Sequence[Any]], header: Sequence[str], chunk_size: int = 500
+) -> Iterator[bytes]:
+    """
+    Gera um CSV (com cabeçalho) a partir de tuplas, escrevendo `chunk_size` linhas por bloco.
+    Datas são escritas em ISO 8601.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    pending = 0
+    for row in rows:
+        writer.writerow([_iso(value) for value in row])
+        pending += 1
+        if pending >= chunk_size:
+            yield _drain(buffer)
+            pending = 0
+    yield _drain(buffer)
+
+
+def stream_ndjson(
+    rows: Iterable[Sequence[Any]], columns: Sequence[str], chunk_size: int = 500
+) -> Iterator[bytes]:
+    """
+    Gera NDJSON (um objeto por linha) a partir de tuplas com os valores de `columns`.
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    buffer: list[str] = []
+    for row in rows:
+        buffer.append(encoder.encode(dict(zip(columns, row))) + "\n")
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer).encode()
+            buffer = []
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Comprime um fluxo de blocos no formato gzip, sem acumulá-lo em memória.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _iso(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _drain(buffer: io.StringIO) -> bytes:
+    data = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
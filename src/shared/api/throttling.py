@@ -0,0 +1,135 @@
+"""
+Limite de requisições por token bucket.
+
+Cada bucket é guardado no cache compartilhado como um único instante, o "tempo teórico de
+chegada" da próxima requisição (GCRA, equivalente a um token bucket com capacidade igual ao
+número de requisições da taxa e reposição contínua). Cada requisição custa um `get_many` e,
+se aceita, um `set_many` no cache, para todos os seus buckets; não há lista de horários como
+no `SimpleRateThrottle` do DRF.
+
+As leituras e escritas não são atômicas: requisições simultâneas do mesmo cliente podem
+passar alguns tokens além do limite, o que é aceitável para conter rajadas. Se o cache
+compartilhado falhar, os buckets passam a ser mantidos no cache local do worker.
+"""
+
+import logging
+import time
+from typing import Any
+
+from django.core.cache import caches
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {"s": 1, "m": 60, "h": 60 * 60, "d": 60 * 60 * 24}
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    """
+    Converte uma taxa no formato do DRF (ex.: `10/min`, `5/s`, `1000/day`) em
+    `(capacidade do bucket, período em segundos)`.
+    """
+    num, period = rate.split("/")
+    return int(num), float(DURATIONS[period.strip()[0]])
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle com buckets por endpoint (escopo e view) e cliente: cada requisição consome um
+    token do bucket do usuário autenticado e um do bucket do IP (considerando
+    `NUM_PROXIES`); falta de token em qualquer um deles recusa a requisição.
+
+    A view define o escopo em `throttle_scope` e, opcionalmente, os métodos limitados em
+    `throttle_methods` (padrão: todos). As taxas vêm de `DEFAULT_THROTTLE_RATES`: o escopo
+    vale para o usuário e para o IP de anônimos; o IP de requisições autenticadas usa
+    `<escopo>_ip` e não é limitado se essa taxa não existir (vários usuários podem
+    compartilhar um IP). Quando um bucket está vazio, a resposta é `429` com `Retry-After`.
+    """
+
+    cache_alias = "default"
+    fallback_cache_alias = "local"
+    key_prefix = "throttle"
+    # Intervalo mínimo, em segundos, entre avisos de cache indisponível.
+    log_interval = 60.0
+    logged_at: float | None = None
+
+    def __init__(self) -> None:
+        self.wait_seconds: float | None = None
+
+    def get_buckets(self, request: Request, view: Any) -> list[tuple[str, str]]:
+        """
+        `(chave, taxa)` de cada bucket que a requisição consome.
+        """
+        scope = getattr(view, "throttle_scope", None)
+        methods = getattr(view, "throttle_methods", None)
+        if scope is None or (methods is not None and request.method not in methods):
+            return []
+
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        prefix = f"{self.key_prefix}:{scope}:{type(view).__name__}"
+        ip_key = f"{prefix}:ip:{self.get_ident(request)}"
+        user = getattr(request, "user", None)
+        if user is None or not user.is_authenticated:
+            return [(ip_key, rates[scope])]
+
+        buckets = [(f"{prefix}:user:{user.pk}", rates[scope])]
+        if rates.get(f"{scope}_ip"):
+            buckets.append((ip_key, rates[f"{scope}_ip"]))
+        return buckets
+
+    def allow_request(self, request: Request, view: Any) -> bool:
+        buckets = self.get_buckets(request, view)
+        if not buckets:
+            return True
+
+        now = time.time()
+        arrivals = self.cache_get_many([key for key, _ in buckets])
+        updates, wait, timeout = {}, 0.0, 0.0
+        for key, rate in buckets:
+            capacity, period = parse_rate(rate)
+            interval = period / capacity
+            arrival = max(arrivals.get(key) or now, now)
+            # O bucket está vazio enquanto a próxima chegada estiver a mais de `capacity`
+            # intervalos no futuro.
+            allowed_at = arrival + interval - period
+            if now < allowed_at:
+                wait = max(wait, allowed_at - now)
+            updates[key] = arrival + interval
+            timeout = max(timeout, arrival + interval - now)
+
+        if wait:
+            self.wait_seconds = wait
+            return False
+        self.cache_set_many(updates, timeout=int(timeout) + 1)
+        return True
+
+    def wait(self) -> float | None:
+        return self.wait_seconds
+
+    # Cada backend de cache tem as suas exceções (ex.: `redis.exceptions.ConnectionError`),
+    # sem base comum: qualquer falha do cache compartilhado cai no cache local.
+
+    def cache_get_many(self, keys: list[str]) -> dict[str, float]:
+        try:
+            return caches[self.cache_alias].get_many(keys)
+        except Exception as exc:  # noqa: BLE001
+            self.cache_unavailable(exc)
+            return caches[self.fallback_cache_alias].get_many(keys)
+
+    def cache_set_many(self, values: dict[str, float], timeout: int) -> None:
+        try:
+            caches[self.cache_alias].set_many(values, timeout)
+        except Exception as exc:  # noqa: BLE001
+            self.cache_unavailable(exc)
+            caches[self.fallback_cache_alias].set_many(values, timeout)
+
+    def cache_unavailable(self, exc: Exception) -> None:
+        """
+        Avisa que o cache compartilhado falhou no máximo uma vez a cada `log_interval`
+        segundos por processo, e não a cada requisição.
+        """
+        now = time.monotonic()
+        logged_at = TokenBucketThrottle.logged_at
+        if logged_at is None or now - logged_at >= self.log_interval:
+            TokenBucketThrottle.logged_at = now
+            logging.warning(f"Cache de throttling indisponível, usando o cache local: {exc}")
@@ -1,4 +1,6 @@
 from .base import BaseModel
 from .deactivate import DeactivateModel
+from .search import SEARCH_CONFIG, search_vector_field
+from .versions import data_versions
 
-__all__ = ["BaseModel", "DeactivateModel"]
+__all__ = ["SEARCH_CONFIG", "BaseModel", "DeactivateModel", "data_versions", "search_vector_field"]
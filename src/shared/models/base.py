@@ -1,4 +1,3 @@
-import logging
 from typing import Self
 
 from django.db import models
@@ -27,48 +26,14 @@ class BaseModel(models.Model):
         self.updated_at = make_aware_if_exists(self.updated_at)
         return None
 
-    def save(self, *args: list, **kwargs: dict) -> Self:
+    def save(self, *args: list, clean: bool = True, **kwargs: dict) -> Self:
         """
         Method to save the model.
+        Use `clean=False` only when the instance was already validated (e.g. by a service).
         """
-        self.clean()
+        if clean:
+            self.clean()
         return super(BaseModel, self).save(*args, **kwargs)
 
-    @classmethod
-    def filter_by_search(
-        cls,
-        queryset: models.QuerySet,
-        search_params: list[tuple[str, str]],
-        search_fields: list[str],
-    ) -> models.QuerySet:
-        """
-        Aplica filtros de pesquisa em um queryset do Django.
-        Método de classe que permite filtrar um queryset baseado em parâmetros de busca específicos,
-        suportando operadores de consulta do Django (como __gte, __contains, etc).
-        Args:
-            queryset (models.QuerySet): O queryset base a ser filtrado.
-            search_params (list[tuple[str,str]]): Lista de tuplas contendo pares de (campo, valor) para filtrar.
-            search_fields (list[str]): Lista de campos permitidos para busca.
-        Returns:
-            models.QuerySet: Queryset filtrado com os parâmetros de busca aplicados.
-        Example:
-            >>> search_params = [('nome__contains', 'João'), ('idade__gte', '18')]
-            >>> search_fields = ['nome', 'idade']
-            >>> Model.filter_by_search(Model.objects.all(), search_params, search_fields)
-        """
-
-        filters = models.Q()
-
-        for field, value in search_params:
-            try:
-                if field in search_fields:
-                    filters |= models.Q(**{f"{field}__icontains": value})
-                if field.startswith(f"{field}__"):
-                    filters |= models.Q(**{field: value})
-            except Exception as e:
-                logging.error(f"❌ Erro ao aplicar filtro '{field}::{value}': {e}")
-
-        return queryset.filter(filters)
-
     class Meta:
         abstract = True
@@ -0,0 +1,20 @@
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import models
+
+# Configuração de busca textual usada nas colunas `tsvector` e nas consultas.
+# "simple" apenas normaliza para minúsculas (sem stemming nem stop words), o que mantém
+# a busca por prefixo de palavra previsível e próxima do antigo `icontains`.
+SEARCH_CONFIG = "simple"
+
+
+def search_vector_field(*fields: str) -> models.GeneratedField:
+    """
+    Coluna `tsvector` gerada e persistida pelo Postgres a partir dos campos informados.
+    Deve ser acompanhada de um `GinIndex` no model.
+    """
+    return models.GeneratedField(
+        expression=SearchVector(*fields, config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name="Vetor de busca",
+    )
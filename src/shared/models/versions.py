@@ -0,0 +1,99 @@
+"""
+Versões de dados por tabela, guardadas no cache compartilhado.
+
+Cada tabela tem uma versão aleatória que é trocada após o commit de toda escrita nela.
+Resultados derivados de uma consulta (ex.: contagens) podem ser cacheados sob as versões
+das tabelas que a consulta lê, e deixam de ser usados assim que alguma delas muda.
+
+Escritas por `Model.save`/`Model.delete` são cobertas por `track`; escritas que não
+disparam sinais (`bulk_create`, `QuerySet.update`, SQL puro, cascatas) devem chamar `bump`.
+
+Uma tabela também tem versões por recorte (ex.: `user_id = 7`), para consultas que leem só
+as linhas de um recorte. `bump` com `scopes` troca apenas as versões dos recortes escritos;
+`bump` sem `scopes` troca também a época dos recortes da tabela, invalidando todos eles.
+Quem escreve em uma tabela lida por recortes deve informar os valores de todos os campos
+de recorte usados nas leituras, ou nenhum.
+"""
+
+import uuid
+from collections.abc import Iterable
+from typing import Any
+
+from django.core.cache import caches
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+
+
+class DataVersions:
+    key_prefix = "data_version"
+
+    def get_many(self, tables: Iterable[str]) -> dict[str, str]:
+        """
+        Versões atuais das tabelas, criando as que ainda não existem.
+        """
+        keys = {table: self.key(table) for table in sorted(set(tables))}
+        found = self._get_keys(list(keys.values()))
+        return {table: found[key] for table, key in keys.items()}
+
+    def get_scoped(self, table: str, field: str, value: Any) -> str:
+        """
+        Versão das linhas da tabela com `field = value`: a época dos recortes da tabela
+        combinada com a versão do recorte.
+        """
+        epoch, scoped = self.scope_epoch_key(table), self.scope_key(table, field, value)
+        found = self._get_keys([epoch, scoped])
+        return f"{found[epoch]}:{found[scoped]}"
+
+    def bump(
+        self, *models_: type[models.Model], scopes: dict[str, Iterable[Any]] | None = None
+    ) -> None:
+        """
+        Troca a versão das tabelas dos models após o commit da transação corrente. Com
+        `scopes` (campo -> valores escritos), troca também as versões desses recortes; sem
+        `scopes`, troca a época dos recortes das tabelas.
+        """
+        keys = []
+        for model in models_:
+            table = model._meta.db_table
+            keys.append(self.key(table))
+            if scopes is None:
+                keys.append(self.scope_epoch_key(table))
+                continue
+            for field, values in scopes.items():
+                keys.extend(self.scope_key(table, field, value) for value in set(values))
+        transaction.on_commit(
+            lambda: caches["default"].set_many({key: uuid.uuid4().hex for key in keys}, None)
+        )
+
+    def key(self, table: str) -> str:
+        return f"{self.key_prefix}:{table}"
+
+    def scope_epoch_key(self, table: str) -> str:
+        return f"{self.key_prefix}:{table}:scopes"
+
+    def scope_key(self, table: str, field: str, value: Any) -> str:
+        return f"{self.key_prefix}:{table}:{field}={value}"
+
+    def _get_keys(self, keys: list[str]) -> dict[str, str]:
+        cache = caches["default"]
+        found = cache.get_many(keys)
+        for key in keys:
+            if key not in found:
+                cache.add(key, uuid.uuid4().hex, None)
+                found[key] = cache.get(key)
+        return found
+
+    def track(self, *models_: type[models.Model]) -> None:
+        """
+        Troca a versão da tabela a cada `save`/`delete` das instâncias dos models.
+        """
+        for model in models_:
+            uid = f"data_version:{model._meta.label}"
+            post_save.connect(self._changed, sender=model, dispatch_uid=f"{uid}:saved")
+            post_delete.connect(self._changed, sender=model, dispatch_uid=f"{uid}:deleted")
+
+    def _changed(self, sender: type[models.Model], **kwargs: Any) -> None:
+        self.bump(sender)
+
+
+data_versions = DataVersions()
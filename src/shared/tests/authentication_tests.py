@@ -0,0 +1,199 @@
+from datetime import date
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from authentication.models import User, UserTeamChoice
+from authentication.tests.factories import UserFactory
+from coupons.models import Redemption
+from coupons.tests.factories import CouponFactory
+from shared.api import authentications
+from shared.api.authentications import (
+    USER_CLAIMS_CLAIM,
+    UserClaimsRefreshToken,
+    VerifiedTokenCache,
+    verified_tokens,
+)
+
+PASSWORD = "SenhaS3nf100!"
+
+
+def login(user: User) -> dict:
+    response = APIClient().post(
+        reverse("token_obtain_pair"), {"email": user.email, "password": PASSWORD}, format="json"
+    )
+    assert response.status_code == 200
+    return response.data
+
+
+def client_with(access: str) -> APIClient:
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    return client
+
+
+@pytest.mark.django_db
+class TestsClaimsJWTAuthentication:
+    def test_should_authenticate_without_querying_users(self):
+        user = UserFactory(password=PASSWORD, team=UserTeamChoice.VENDAS)
+        client = client_with(login(user)["access"])
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse("me"))
+
+        assert response.status_code == 200
+        assert response.data["email"] == user.email
+        assert response.data["team"] == "Vendas"
+        assert not ctx.captured_queries
+
+        coupon = CouponFactory(max_redemptions=1, available=True)
+        response = client.post(
+            reverse("redemption-list-create"), {"coupon": coupon.pk}, format="json"
+        )
+        assert response.status_code == 201
+        assert Redemption.objects.get().user_id == user.pk
+
+    def test_should_apply_user_writes_over_token_claims(self, django_capture_on_commit_callbacks):
+        user = UserFactory(password=PASSWORD, is_staff=False)
+        client = client_with(login(user)["access"])
+        assert client.get(reverse("me")).data["is_staff"] is False
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user.is_staff = True
+            user.save()
+        assert client.get(reverse("me")).data["is_staff"] is True
+
+        # Outro worker: memória vazia, claims publicadas no cache compartilhado.
+        with django_capture_on_commit_callbacks(execute=True):
+            user.is_active = False
+            user.save()
+        caches["users"].clear()
+        assert client.get(reverse("me")).status_code == 401
+
+    def test_should_refresh_claims_from_database(self):
+        user = UserFactory(password=PASSWORD, team=UserTeamChoice.RH)
+        tokens = login(user)
+        User.objects.filter(pk=user.pk).update(team=UserTeamChoice.FINANCEIRO)
+
+        response = APIClient().post(
+            reverse("token_refresh"), {"refresh": tokens["refresh"]}, format="json"
+        )
+
+        assert response.status_code == 200
+        assert AccessToken(response.data["access"])[USER_CLAIMS_CLAIM]["team"] == "FINANCEIRO"
+        assert RefreshToken(response.data["refresh"])[USER_CLAIMS_CLAIM]["team"] == "FINANCEIRO"
+
+    def test_should_fall_back_to_database_for_tokens_without_claims(self):
+        user = UserFactory()
+        client = client_with(str(RefreshToken.for_user(user).access_token))
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert client.get(reverse("me")).data["email"] == user.email
+        assert len(ctx.captured_queries) == 1
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert client.get(reverse("me")).status_code == 200
+        assert not ctx.captured_queries
+
+    def test_should_load_other_fields_on_demand(self):
+        user = UserFactory(password=PASSWORD, works_since=date(2023, 5, 2))
+        client = client_with(str(UserClaimsRefreshToken.for_user(user).access_token))
+
+        response = client.patch(
+            reverse("change_password"),
+            {"current_password": PASSWORD, "new_password": "N0vaSenha!2025"},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.check_password("N0vaSenha!2025")
+        assert user.works_since == date(2023, 5, 2)
+
+    def test_should_not_write_claims_back_on_password_change(
+        self, django_capture_on_commit_callbacks
+    ):
+        user = UserFactory(password=PASSWORD, is_staff=True, team=UserTeamChoice.RH)
+        client = client_with(login(user)["access"])
+        # Escrita sem sinais (ou em outro worker): as claims do token ficam desatualizadas.
+        User.objects.filter(pk=user.pk).update(is_staff=False, team=UserTeamChoice.VENDAS)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.patch(
+                reverse("change_password"),
+                {"current_password": PASSWORD, "new_password": "N0vaSenha!2025"},
+                format="json",
+            )
+
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.check_password("N0vaSenha!2025")
+        assert (user.is_staff, user.team) == (False, UserTeamChoice.VENDAS)
+        assert client.get(reverse("me")).data["is_staff"] is False
+
+    def test_should_refuse_full_save_of_claims_user(self):
+        user = UserFactory(password=PASSWORD)
+        claims_user = authentications.user_from_claims(user.pk, authentications.user_claims(user))
+
+        with pytest.raises(ValueError, match="update_fields"):
+            claims_user.save()
+
+
+class TestsVerifiedTokenCache:
+    def token(self, user_id: int = 1) -> tuple[bytes, AccessToken]:
+        token = AccessToken()
+        token["user_id"] = str(user_id)
+        return str(token).encode(), token
+
+    @pytest.mark.django_db
+    def test_should_verify_repeated_token_once(self, monkeypatch):
+        verified_tokens.clear()
+        client = client_with(str(UserClaimsRefreshToken.for_user(UserFactory()).access_token))
+        decoded = []
+        decode = TokenBackend.decode
+        monkeypatch.setattr(
+            TokenBackend,
+            "decode",
+            lambda *args, **kwargs: decoded.append(1) or decode(*args, **kwargs),
+        )
+
+        for _ in range(3):
+            assert client.get(reverse("me")).status_code == 200
+
+        assert len(decoded) == 1
+        assert len(verified_tokens) == 1
+
+    def test_should_drop_tokens_after_exp(self, monkeypatch):
+        cache = VerifiedTokenCache()
+        raw, token = self.token()
+        cache.set(raw, token)
+        assert cache.get(raw) is token
+
+        monkeypatch.setattr(authentications.time, "time", lambda: token["exp"])
+        assert cache.get(raw) is None
+        assert len(cache) == 0
+
+    def test_should_evict_least_recently_used(self):
+        cache = VerifiedTokenCache(max_size=2)
+        first, second, third = [self.token(user_id) for user_id in range(3)]
+        cache.set(*first)
+        cache.set(*second)
+        assert cache.get(first[0]) is first[1]
+
+        cache.set(*third)
+        assert cache.get(second[0]) is None
+        assert cache.get(first[0]) is first[1]
+        assert len(cache) == 2
+
+    @pytest.mark.django_db
+    def test_should_never_keep_blacklistable_tokens(self):
+        cache = VerifiedTokenCache()
+        refresh = RefreshToken.for_user(UserFactory())
+        cache.set(str(refresh).encode(), refresh)
+        assert len(cache) == 0
@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from coupons.models import Coupon, Redemption
+from coupons.tests.factories import CouponFactory, RedemptionFactory
+from shared.api.counting import CachedCount, EstimatedCount, SkipCount, query_tables
+from shared.models import data_versions
+
+
+@pytest.mark.django_db
+class TestsCountStrategies:
+    def test_should_cache_exact_count_per_query(self):
+        CouponFactory.create_batch(3, available=True)
+        queryset = Coupon.objects.filter(available=True)
+        strategy = CachedCount()
+
+        assert strategy.count(queryset).value == 3
+        with CaptureQueriesContext(connection) as ctx:
+            result = strategy.count(queryset.order_by("code"))
+        assert (result.value, result.exact) == (3, True)
+        assert len(ctx.captured_queries) == 0
+        assert strategy.count(Coupon.objects.filter(available=False)).value == 0
+
+    def test_should_recount_after_data_version_changes(self, django_capture_on_commit_callbacks):
+        strategy = CachedCount()
+        RedemptionFactory()
+        assert strategy.count(Redemption.objects.all()).value == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            RedemptionFactory()
+        assert strategy.count(Redemption.objects.all()).value == 2
+
+        Redemption.objects.all().delete()
+        assert strategy.count(Redemption.objects.all()).value == 2  # sem troca de versão
+        with django_capture_on_commit_callbacks(execute=True):
+            data_versions.bump(Redemption)
+        assert strategy.count(Redemption.objects.all()).value == 0
+
+    def test_should_version_user_scoped_counts_per_user(self, django_capture_on_commit_callbacks):
+        strategy = CachedCount(scope="user_id")
+        first, second = RedemptionFactory(), RedemptionFactory()
+        assert strategy.count(Redemption.objects.filter(user=first.user)).value == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            RedemptionFactory(user=second.user)
+        with CaptureQueriesContext(connection) as ctx:
+            assert strategy.count(Redemption.objects.filter(user=first.user)).value == 1
+        assert not ctx.captured_queries
+        assert strategy.count(Redemption.objects.filter(user=second.user)).value == 2
+
+        with django_capture_on_commit_callbacks(execute=True):
+            RedemptionFactory(user=first.user)
+        assert strategy.count(Redemption.objects.filter(user=first.user)).value == 2
+
+        # Escritas sem recorte (ex.: cascatas) invalidam as contagens de todos os usuários.
+        Redemption.objects.filter(user=first.user).delete()
+        with django_capture_on_commit_callbacks(execute=True):
+            data_versions.bump(Redemption)
+        assert strategy.count(Redemption.objects.filter(user=first.user)).value == 0
+
+    def test_should_version_joined_tables(self):
+        queryset = Redemption.objects.filter(coupon__code__startswith="A")
+        assert query_tables(queryset) == {"coupons_redemption", "coupons_coupon"}
+        assert query_tables(Redemption.objects.select_related(None)) == {"coupons_redemption"}
+
+    def test_should_estimate_only_unfiltered_lists_above_threshold(self):
+        CouponFactory.create_batch(3)
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Coupon._meta.db_table}")
+
+        estimated = EstimatedCount(threshold=1).count(Coupon.objects.all())
+        assert (estimated.value, estimated.exact) == (3, False)
+        assert EstimatedCount(threshold=1).count(Coupon.objects.filter(available=True)).exact
+        assert EstimatedCount(threshold=1_000).count(Coupon.objects.all()).exact
+
+    def test_should_skip_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            result = SkipCount().count(Coupon.objects.all())
+        assert (result.value, result.exact) == (None, False)
+        assert len(ctx.captured_queries) == 0
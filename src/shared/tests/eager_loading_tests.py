@@ -0,0 +1,42 @@
+from coupons.models import Coupon, Redemption
+from coupons.serializers import CouponBalanceSerializer, RedemptionSerializer
+from shared.api.eager_loading import plan_for_serializer
+
+
+class TestsPlanForSerializer:
+    def test_should_select_nested_relations(self):
+        plan = plan_for_serializer(RedemptionSerializer, Redemption)
+        assert sorted(plan.select_related) == ["coupon", "user"]
+        assert plan.prefetch_related == []
+
+    def test_should_restrict_columns_to_serialized_fields(self):
+        plan = plan_for_serializer(RedemptionSerializer, Redemption)
+        only = plan.only_fields()
+        assert "coupon__code" in only
+        assert "coupon__search_vector" not in only
+        assert {"id", "coupon", "user", "redeemed_at"} <= set(only)
+
+    def test_should_load_all_fields_when_serializer_reads_model_properties(self):
+        # `UserSerializer.team` lê a property `team_display`.
+        plan = plan_for_serializer(RedemptionSerializer, Redemption)
+        assert not any(field.startswith("user__") for field in plan.only_fields())
+
+    def test_should_accept_annotations_and_source_star(self):
+        plan = plan_for_serializer(
+            CouponBalanceSerializer, Coupon, annotations=frozenset({"remaining"})
+        )
+        assert plan.select_related == []
+        assert set(plan.only_fields()) == {
+            "id",
+            "code",
+            "description",
+            "max_redemptions",
+            "max_total_redemptions",
+            "stock_shards",
+            "available",
+            "created_at",
+        }
+
+    def test_should_include_extra_fields(self):
+        plan = plan_for_serializer(RedemptionSerializer, Redemption, extra_fields=("updated_at",))
+        assert "updated_at" in plan.only_fields()
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import pytest
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from authentication.models import User
+from authentication.views import ListUsersView
+from coupons.models import Coupon, Redemption
+from coupons.tests.factories import CouponFactory
+from coupons.views import CouponListCreateView, RedemptionListCreateView
+from shared.api.filters import FieldFilter, FieldFilterBackend, index_columns
+
+VIEW = SimpleNamespace(
+    filter_fields={
+        "code": FieldFilter("str", lookups=("exact", "in", "prefix")),
+        "created_at": FieldFilter("datetime", lookups=("range",)),
+        "max": FieldFilter("int", lookups=("exact", "range"), field="max_redemptions"),
+    }
+)
+
+
+def request(**params: str) -> Request:
+    return Request(APIRequestFactory().get("/", params))
+
+
+class TestsFieldFilterBackend:
+    def test_should_parse_typed_values(self):
+        predicates = FieldFilterBackend().get_predicates(
+            request(code__in="A, B,A", max__gte="2", page="3"), VIEW
+        )
+        assert predicates == [("code", "in", ["A", "B"]), ("max_redemptions", "gte", 2)]
+
+    def test_should_reject_invalid_values_and_lookups(self):
+        with pytest.raises(ValidationError) as exc:
+            FieldFilterBackend().get_predicates(
+                request(code__contains="A", max="dois", created_at__gte="2025-01-01"), VIEW
+            )
+        assert set(exc.value.detail) == {"code__contains", "max", "created_at__gte"}
+        assert "code, code__in, code__prefix" in str(exc.value.detail["code__contains"][0])
+
+    def test_should_reject_invalid_declarations(self):
+        with pytest.raises(ValueError):
+            FieldFilter("int", lookups=("prefix",))
+        with pytest.raises(ValueError):
+            FieldFilter("bool", lookups=("range",))
+
+    @pytest.mark.django_db
+    def test_should_and_predicates_in_database_and_memory(self):
+        for code, max_redemptions in [("ALFA1", 1), ("ALFA2", 5), ("BETA1", 5), ("GAMA", None)]:
+            CouponFactory(code=code, description="Cupom", max_redemptions=max_redemptions)
+        backend = FieldFilterBackend()
+        query = request(code__prefix="ALFA", max__gte="2")
+
+        queryset = backend.filter_queryset(query, Coupon.objects.order_by("code"), VIEW)
+        assert [coupon.code for coupon in queryset] == ["ALFA2"]
+        assert str(queryset.query).count("LIKE") == 1
+        assert "UPPER" not in str(queryset.query)
+
+        rows = list(Coupon.objects.order_by("code").values())
+        assert [row["code"] for row in backend.filter_rows(query, rows, VIEW)] == ["ALFA2"]
+
+    def test_should_document_parameters(self):
+        parameters = FieldFilterBackend().get_schema_operation_parameters(VIEW)
+        names = [parameter["name"] for parameter in parameters]
+        assert names[:3] == ["code", "code__in", "code__prefix"]
+        assert "created_at__lte" in names
+        assert parameters[names.index("max")]["schema"] == {"type": "integer"}
+
+    def test_views_should_only_filter_by_indexed_columns(self):
+        views = [
+            (CouponListCreateView, Coupon),
+            (RedemptionListCreateView, Redemption),
+            (ListUsersView, User),
+        ]
+        for view, model in views:
+            leading = {columns[0][0] for columns in index_columns(model)}
+            for name, field_filter in view.filter_fields.items():
+                field = (field_filter.field or name).removesuffix("_id")
+                assert field in leading, (view.__name__, name)
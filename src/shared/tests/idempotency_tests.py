@@ -0,0 +1,148 @@
+import threading
+
+import pytest
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from api.models import IdempotencyKey
+from coupons.models import Redemption
+from coupons.tests.factories import CouponFactory, UserFactory
+from shared.api.mixins import IdempotencyMixin
+
+
+def client_for(user) -> APIClient:
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def redeem(client: APIClient, coupon_id: int, key: str | None = "chave-1"):
+    headers = {"Idempotency-Key": key} if key is not None else {}
+    return client.post(
+        reverse("redemption-list-create"),
+        {"coupon": coupon_id},
+        format="json",
+        headers=headers,
+    )
+
+
+@pytest.mark.django_db
+class TestsIdempotencyMixin:
+    def test_should_replay_response_without_touching_coupon_tables(self):
+        user = UserFactory()
+        coupon = CouponFactory(max_redemptions=5, available=True)
+        client = client_for(user)
+
+        first = redeem(client, coupon.id)
+        with CaptureQueriesContext(connection) as ctx:
+            replay = redeem(client, coupon.id)
+
+        assert first.status_code == replay.status_code == 201
+        assert replay.data == first.data
+        assert replay["Idempotent-Replayed"] == "true"
+        assert not any("coupons_" in query["sql"] for query in ctx.captured_queries)
+        assert Redemption.objects.filter(user=user, coupon=coupon).count() == 1
+
+        assert redeem(client, coupon.id, key="chave-2").status_code == 201
+        assert redeem(client, coupon.id, key=None).status_code == 201
+        assert Redemption.objects.filter(user=user, coupon=coupon).count() == 3
+
+    def test_should_scope_keys_per_user(self):
+        coupon = CouponFactory(max_redemptions=5, available=True)
+        assert redeem(client_for(UserFactory()), coupon.id).status_code == 201
+        assert redeem(client_for(UserFactory()), coupon.id).status_code == 201
+        assert Redemption.objects.filter(coupon=coupon).count() == 2
+
+    def test_should_reject_key_reused_with_another_request(self):
+        client = client_for(UserFactory())
+        first, second = CouponFactory.create_batch(2, max_redemptions=5, available=True)
+
+        assert redeem(client, first.id).status_code == 201
+        assert redeem(client, second.id).status_code == 409
+        assert redeem(client, first.id, key=" ").status_code == 400
+
+    def test_should_release_key_when_request_fails(self):
+        client = client_for(UserFactory())
+        coupon = CouponFactory(max_redemptions=1, available=False)
+
+        assert redeem(client, coupon.id).status_code == 400
+        assert not IdempotencyKey.objects.exists()
+
+        coupon.available = True
+        coupon.save()
+        assert redeem(client, coupon.id).status_code == 201
+
+    def test_should_replace_expired_keys(self):
+        user = UserFactory()
+        coupon = CouponFactory(max_redemptions=5, available=True)
+        client = client_for(user)
+
+        assert redeem(client, coupon.id).status_code == 201
+        IdempotencyKey.objects.update(expires_at=IdempotencyKey.objects.get().created_at)
+        response = redeem(client, coupon.id)
+        assert response.status_code == 201
+        assert "Idempotent-Replayed" not in response
+        assert Redemption.objects.filter(user=user).count() == 2
+
+    def test_should_replay_bulk_redemptions(self):
+        user = UserFactory()
+        coupons = [
+            CouponFactory(
+                code=f"LOTE{index}", description="Lote", max_redemptions=5, available=True
+            )
+            for index in range(2)
+        ]
+        client = client_for(user)
+
+        def bulk():
+            return client.post(
+                reverse("redemption-bulk-create"),
+                {"coupons": [coupon.pk for coupon in coupons]},
+                format="json",
+                headers={"Idempotency-Key": "lote-1"},
+            )
+
+        first, replay = bulk(), bulk()
+
+        assert first.status_code == replay.status_code == 200
+        assert replay.data == first.data
+        assert replay["Idempotent-Replayed"] == "true"
+        assert Redemption.objects.filter(user=user).count() == 2
+
+    def test_should_refuse_views_overriding_post(self):
+        with pytest.raises(TypeError, match="create"):
+
+            class View(IdempotencyMixin, APIView):
+                def post(self, request):
+                    return Response()
+
+
+@pytest.mark.slow
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_duplicates_run_once():
+    user = UserFactory()
+    coupon = CouponFactory(max_redemptions=10, available=True)
+    clients = 6
+    barrier = threading.Barrier(clients)
+    responses = []
+
+    def send():
+        try:
+            barrier.wait()
+            responses.append(redeem(client_for(user), coupon.id))
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=send) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [response.status_code for response in responses] == [201] * clients
+    assert sum("Idempotent-Replayed" in response for response in responses) == clients - 1
+    assert Redemption.objects.filter(user=user, coupon=coupon).count() == 1
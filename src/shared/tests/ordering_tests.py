@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from authentication.models import User
+from coupons.models import Coupon, Redemption
+from shared.api.filters import IndexedOrderingFilter, orderable_fields, with_tiebreaker
+
+
+def get_ordering(queryset, query: str, **view_attrs) -> list[str]:
+    request = Request(APIRequestFactory().get("/", {"ordering": query} if query else {}))
+    view = SimpleNamespace(**{"ordering_fields": None, "ordering": None, **view_attrs})
+    return IndexedOrderingFilter().get_ordering(request, queryset, view)
+
+
+class TestsIndexedOrderingFilter:
+    def test_should_list_only_indexed_fields(self):
+        assert orderable_fields(Coupon) == ["id", "code", "created_at"]
+        assert orderable_fields(Redemption) == ["id", "redeemed_at"]
+        assert "email" in orderable_fields(User)
+        assert "first_name" not in orderable_fields(User)
+
+    def test_should_ignore_fields_without_index(self):
+        assert get_ordering(Coupon.objects.all(), "description") == ["-created_at", "-id"]
+        assert get_ordering(Coupon.objects.all(), "max_redemptions,code") == ["code"]
+
+    def test_should_accept_index_prefixes_in_both_directions(self):
+        queryset = Coupon.objects.all()
+        assert get_ordering(queryset, "-created_at,-id") == ["-created_at", "-id"]
+        assert get_ordering(queryset, "created_at,id") == ["created_at", "id"]
+        # Direções mistas não são servidas pelo índice `(-created_at, -id)`.
+        assert get_ordering(queryset, "created_at,-id") == ["created_at", "id"]
+
+    def test_should_add_primary_key_as_tiebreaker(self):
+        assert with_tiebreaker(Redemption, ["-redeemed_at"]) == ["-redeemed_at", "-id"]
+        assert with_tiebreaker(Coupon, ["code"]) == ["code"]
+        assert get_ordering(Redemption.objects.all(), "redeemed_at") == ["redeemed_at", "id"]
+
+    def test_should_restrict_to_view_ordering_fields(self):
+        queryset = Coupon.objects.all()
+        assert get_ordering(queryset, "code", ordering_fields=["created_at"]) == [
+            "-created_at",
+            "-id",
+        ]
+        assert get_ordering(queryset, "", ordering=["code"]) == ["code"]
+
+    def test_should_document_accepted_fields(self):
+        view = SimpleNamespace(ordering_fields=None, queryset=Coupon.objects.all())
+        (parameter,) = IndexedOrderingFilter().get_schema_operation_parameters(view)
+        assert "[ id, code, created_at ]" in parameter["description"]
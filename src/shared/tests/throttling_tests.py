@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from shared.api import throttling
+from shared.api.throttling import TokenBucketThrottle, parse_rate
+
+
+class LoginView:
+    throttle_scope = "login"
+
+
+class RedemptionsView:
+    throttle_scope = "redemptions"
+    throttle_methods = ("POST",)
+
+
+VIEW = LoginView()
+
+
+def request(user=None, ip: str = "10.0.0.1", method: str = "post") -> Request:
+    request = Request(getattr(APIRequestFactory(), method)("/", REMOTE_ADDR=ip))
+    request.user = user or AnonymousUser()
+    return request
+
+
+def attempts(count: int, view=VIEW, **kwargs) -> list[bool]:
+    return [TokenBucketThrottle().allow_request(request(**kwargs), view) for _ in range(count)]
+
+
+def user(pk: int) -> SimpleNamespace:
+    return SimpleNamespace(pk=pk, is_authenticated=True)
+
+
+class TestsTokenBucketThrottle:
+    def test_should_parse_rates(self):
+        assert parse_rate("10/min") == (10, 60)
+        assert parse_rate("5/s") == (5, 1)
+        assert parse_rate("1000/day") == (1000, 86400)
+
+    def test_should_allow_burst_then_wait_for_refill(self, monkeypatch):
+        now = 1_000_000.0
+        monkeypatch.setattr(throttling.time, "time", lambda: now)
+
+        assert attempts(11) == [True] * 10 + [False]
+        throttle = TokenBucketThrottle()
+        assert not throttle.allow_request(request(), VIEW)
+        assert throttle.wait() == pytest.approx(6)
+
+        now += 6  # 10/min: um token a cada 6 segundos
+        assert attempts(2) == [True, False]
+
+    def test_should_keep_one_bucket_per_client(self):
+        assert all(attempts(10, ip="10.0.0.1"))
+        assert attempts(1, ip="10.0.0.1") == [False]
+        assert attempts(1, ip="10.0.0.2") == [True]
+        assert attempts(1, user=user(1)) == [True]
+
+    def test_should_keep_one_bucket_per_endpoint(self):
+        class OtherLoginView(LoginView):
+            pass
+
+        assert all(attempts(10))
+        assert attempts(1) == [False]
+        assert attempts(1, view=OtherLoginView()) == [True]
+
+    def test_should_limit_authenticated_users_per_user_and_ip(self, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"redemptions": "3/min", "redemptions_ip": "5/min"},
+        }
+        view = RedemptionsView()
+
+        assert attempts(4, view=view, user=user(1)) == [True] * 3 + [False]
+        assert attempts(3, view=view, user=user(2)) == [True, True, False]
+        assert attempts(1, view=view, user=user(3), ip="10.0.0.2") == [True]
+
+    def test_should_only_limit_configured_methods(self):
+        view = RedemptionsView()
+        assert all(attempts(200, view=view, user=user(1), method="get"))
+        assert all(attempts(120, view=view, user=user(1)))
+        assert attempts(1, view=view, user=user(1)) == [False]
+
+    def test_should_fall_back_to_local_cache(self, monkeypatch):
+        def unavailable(*args, **kwargs):
+            raise ConnectionError("cache fora do ar")
+
+        warnings = []
+        monkeypatch.setattr(caches["default"], "get_many", unavailable)
+        monkeypatch.setattr(caches["default"], "set_many", unavailable)
+        monkeypatch.setattr(TokenBucketThrottle, "logged_at", None)
+        monkeypatch.setattr(throttling.logging, "warning", warnings.append)
+
+        assert attempts(11) == [True] * 10 + [False]
+        assert len(warnings) == 1
+
+    @pytest.mark.django_db
+    def test_login_should_answer_429_with_retry_after(self):
+        client = APIClient()
+        payload = {"email": "ninguem@senfio.com", "password": "Senha1234"}
+        for _ in range(10):
+            assert (
+                client.post(reverse("token_obtain_pair"), payload, format="json").status_code == 401
+            )
+
+        response = client.post(reverse("token_obtain_pair"), payload, format="json")
+        assert response.status_code == 429
+        assert 0 < int(response["Retry-After"]) <= 6